@@ -0,0 +1,120 @@
+"""Compare canvas-list rendering with and without the trusted-read fast path.
+
+Runs without MongoDB: documents are generated in memory so the numbers isolate
+validation and JSON encoding, which is what TRUSTED_READS removes from /api/canvas.
+
+    python bench_serialization.py --rows 100 1000 5000
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench')
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+import server
+
+def sample_canvas(index: int) -> dict:
+    """A canvas shaped like the seeded ones: a dozen nested lists of sub-models"""
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Vessel Arrival Tracking {index}",
+        "domain": "port",
+        "owner_name": "Port Operations",
+        "owner_email": "port@asyad.om",
+        "date": "2025-01-15",
+        "version": "1.2.0",
+        "description": "Real-time vessel arrival, berthing and departure events for Duqm port",
+        "classification": "source-aligned",
+        "consumers": [
+            {"name": f"Consumer {i}", "domain": "fleet", "role": "analyst", "use_cases": ["planning", "eta"]}
+            for i in range(5)
+        ],
+        "use_cases": [
+            {"name": f"Use case {i}", "description": "Plan heavy transport", "business_objective": "Reduce idle time",
+             "success_metrics": ["idle hours", "on-time departures"]}
+            for i in range(4)
+        ],
+        "output_ports": [
+            {"format": "topic", "protocol": "Stream", "location": f"kafka://port.vessels.{i}", "description": "Events"}
+            for i in range(3)
+        ],
+        "terms": "Internal use only",
+        "data_model": [
+            {"name": f"field_{i}", "data_type": "string", "description": "Attribute", "constraints": ["not null"],
+             "is_pii": False, "is_business_key": i == 0, "is_join_key": i == 1}
+            for i in range(20)
+        ],
+        "quality_checks": [
+            {"check_name": f"check_{i}", "check_type": "completeness", "expression": "count(*) > 0",
+             "threshold": 99.5, "description": "Rows present"}
+            for i in range(6)
+        ],
+        "sla": {"availability": "99.9%", "support_hours": "24x7", "retention_period": "7 years",
+                "backup_frequency": "daily", "response_time": "15 minutes"},
+        "security": {"access_level": "internal", "approval_required": True, "allowed_roles": ["admin", "editor"],
+                     "allowed_domains": ["port", "fleet", "epc"], "pii_handling": "masked"},
+        "input_ports": [
+            {"source_type": "operational_system", "source_name": f"AIS feed {i}", "source_domain": "port",
+             "format": "JSON", "protocol": "REST", "description": "Positions"}
+            for i in range(3)
+        ],
+        "architecture": {"processing_type": "streaming", "framework": "Spark", "storage_type": "topic",
+                         "query_engine": "SQL", "transformation_steps": ["ingest", "clean", "publish"],
+                         "scheduling_tool": "Airflow", "monitoring_tool": "Grafana", "estimated_cost": "$500/month"},
+        "ubiquitous_language": {f"term_{i}": "definition" for i in range(10)},
+        "status": "active",
+        "created_at": datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc),
+        "updated_at": datetime.now(timezone.utc),
+        "follow_up_actions": ["review schema"],
+        "follow_up_date": "2025-03-01"
+    }
+
+def canvas_list_field():
+    for route in server.app.routes:
+        if getattr(route, "path", None) == "/api/canvas" and "GET" in route.methods:
+            return route.secure_cloned_response_field
+    raise RuntimeError("GET /api/canvas is not registered")
+
+async def render_validated(field, docs) -> bytes:
+    """What FastAPI does for response_model=List[DataProductCanvas]: validate, encode, json.dumps"""
+    content = await serialize_response(field=field, response_content=docs)
+    return JSONResponse(content).body
+
+def render_trusted(docs) -> bytes:
+    """What the endpoint does now: trim to the model's fields, fill defaults, encode"""
+    return server.trusted_json(docs, model=server.DataProductCanvas).body
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    field = canvas_list_field()
+    loop = asyncio.new_event_loop()
+    print(f"encoder: {'orjson' if server.orjson else 'stdlib json'}")
+    print(f"{'rows':>8} {'validated ms':>14} {'trusted ms':>12} {'speedup':>9}")
+    for rows in args.rows:
+        docs = [sample_canvas(i) for i in range(rows)]
+        before = best_of(args.repeats, lambda: loop.run_until_complete(render_validated(field, docs)))
+        after = best_of(args.repeats, lambda: render_trusted(docs))
+        print(f"{rows:>8} {before:>14.1f} {after:>12.1f} {before / after:>8.1f}x")
+    loop.close()
+
+if __name__ == "__main__":
+    main()
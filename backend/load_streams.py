@@ -0,0 +1,54 @@
+"""Push synthetic events through a streaming pipeline in-process and report per-stage throughput.
+
+Runs without MongoDB for topics that do not persist, so the numbers measure the
+stage workers and queues themselves on a single event loop (one core).
+
+    python load_streams.py --topic vessel-status-v1 --rate 10000 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'bench')
+
+import server
+
+async def run(topic: str, rate: int, seconds: float):
+    config = next((c for c in server.STREAM_PIPELINES if c.topic == topic), None)
+    if config is None:
+        raise SystemExit(f"Unknown topic {topic}; choose from {[c.topic for c in server.STREAM_PIPELINES]}")
+    if config.persist:
+        raise SystemExit(f"{topic} persists to MongoDB; pick a topic with persist=False for a local run")
+
+    pipeline = server.StreamPipeline(config, server.STREAM_QUEUE_BATCHES, server.STREAM_BATCH_SIZE)
+    pipeline.start()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    sent = await server.generate_stream_load(pipeline, rate, seconds)
+    sink = pipeline.stats[config.stages[-1]]
+    while sink.processed < sent and time.perf_counter() - started < seconds + 30:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    await pipeline.stop()
+
+    print(f"topic {topic}: sent {sent} events in {elapsed:.2f}s "
+          f"({sent / elapsed:,.0f} events/s end to end, {cpu / elapsed:.0%} of one core)")
+    print(f"{'stage':>10} {'processed':>10} {'rejected':>9} {'lag p50 ms':>11} {'lag p95 ms':>11}")
+    for stage in config.stages:
+        snapshot = pipeline.stats[stage].snapshot()
+        print(f"{stage:>10} {snapshot['processed']:>10} {snapshot['rejected']:>9} "
+              f"{snapshot['lag']['p50_ms']:>11} {snapshot['lag']['p95_ms']:>11}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topic", default="vessel-status-v1")
+    parser.add_argument("--rate", type=int, default=10000, help="Target events per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.topic, args.rate, args.seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import asyncio
+import argparse
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from pathlib import Path
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Timestamp fields that used to be written as ISO strings, per collection
+DATETIME_FIELDS = {
+    "users": ["created_at"],
+    "port_vessels": ["last_updated"],
+    "fleet_shipments": ["last_updated"],
+    "epc_sites": ["last_updated"],
+    "data_catalog": ["created_at"],
+    "data_product_canvases": ["created_at", "updated_at"],
+    "event_logs": ["timestamp"],
+    "logistics_routes": ["last_updated"],
+    "domain_journeys": ["last_updated"],
+    "data_contracts": ["created_at", "updated_at"],
+    "quality_metrics": ["measured_at"],
+}
+
+MIGRATION_NAME = "bson_dates"
+
+def parse_timestamp(value: str):
+    """Parse an ISO-8601 string into a UTC datetime, or None if it is not a timestamp"""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+async def migrate_collection(db, collection_name: str, fields: list, batch_size: int) -> int:
+    """Convert string timestamps to BSON dates in _id order, checkpointing after every batch"""
+    checkpoint_id = f"{MIGRATION_NAME}:{collection_name}"
+    checkpoint = await db.migrations.find_one({"_id": checkpoint_id}) or {}
+    if checkpoint.get("completed"):
+        return checkpoint.get("converted", 0)
+
+    last_id = checkpoint.get("last_id")
+    string_fields = {"$or": [{field: {"$type": "string"}} for field in fields]}
+
+    while True:
+        query = string_fields if last_id is None else {"$and": [string_fields, {"_id": {"$gt": last_id}}]}
+        batch = await db[collection_name].find(query, {field: 1 for field in fields}) \
+            .sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            changes = {}
+            for field in fields:
+                if isinstance(doc.get(field), str):
+                    parsed = parse_timestamp(doc[field])
+                    if parsed is not None:
+                        changes[field] = parsed
+            if changes:
+                # Matching the old strings keeps a concurrent write from being overwritten
+                guard = {"_id": doc["_id"], **{field: doc[field] for field in changes}}
+                operations.append(UpdateOne(guard, {"$set": changes}))
+
+        converted = 0
+        if operations:
+            result = await db[collection_name].bulk_write(operations, ordered=False)
+            converted = result.modified_count
+
+        last_id = batch[-1]["_id"]
+        await db.migrations.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)}, "$inc": {"converted": converted}},
+            upsert=True
+        )
+        print(f"  {collection_name}: converted {converted} documents up to _id {last_id}")
+
+    await db.migrations.update_one(
+        {"_id": checkpoint_id},
+        {"$set": {"completed": True, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    checkpoint = await db.migrations.find_one({"_id": checkpoint_id})
+    return checkpoint.get("converted", 0)
+
+async def migrate_dates(db, batch_size: int = 500, restart: bool = False):
+    """Run the ISO string -> BSON date migration over every collection; safe to interrupt and rerun"""
+    if restart:
+        await db.migrations.delete_many({"_id": {"$regex": f"^{MIGRATION_NAME}:"}})
+
+    for collection_name, fields in DATETIME_FIELDS.items():
+        converted = await migrate_collection(db, collection_name, fields, batch_size)
+        print(f"Migrated {collection_name}: {converted} documents converted to native dates")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Convert ISO string timestamps to native BSON dates")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints from earlier runs")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True, tzinfo=timezone.utc)
+    db = client[os.environ['DB_NAME']]
+    print("Migrating timestamps to BSON dates...")
+    await migrate_dates(db, batch_size=args.batch_size, restart=args.restart)
+    print("Date migration completed successfully!")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,6 +4,7 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 from passlib.context import CryptContext
+from migrate_dates import migrate_dates
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -1869,6 +1870,9 @@ async def seed_database():
     await db.interop_standards.insert_many(interop_standards)
     print(f"Created {len(interop_standards)} interoperability standards")
     
+    # Seed documents spell timestamps as ISO strings; store them as native BSON dates
+    await migrate_dates(db, restart=True)
+    
     print("Database seeding completed successfully!")
     client.close()
 
@@ -1,23 +1,56 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure, PyMongoError
+from bson import json_util
 import os
 import logging
+import asyncio
+import json
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, ValidationError
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Annotated, Union, get_args, get_origin
 import uuid
-from datetime import datetime, timezone, timedelta
+import time
+import base64
+import hashlib
+import gzip
+import io
+import random
+import re
+import tarfile
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone, timedelta
 import jwt
+import yaml
 from passlib.context import CryptContext
 
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib encoder
+    orjson = None
+
+# libyaml's emitter when PyYAML was built against it, otherwise the pure-Python one
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Dates are stored as native BSON datetimes and decoded as timezone-aware UTC
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, tzinfo=timezone.utc)
 db = client[os.environ['DB_NAME']]
 
 app = FastAPI()
@@ -27,8 +60,100 @@ SECRET_KEY = os.environ.get('JWT_SECRET', 'datamesh_secret_key_change_in_product
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 480
 
+# EventSource cannot send headers, so streams authenticate with a short-lived token in the query string
+STREAM_TOKEN_SCOPE = "events:stream"
+STREAM_TOKEN_TTL_SECONDS = int(os.environ.get('STREAM_TOKEN_TTL_SECONDS', '60'))
+
+# Verified-claims mode: tokens carry the principal, so requests skip the users lookup
+AUTH_VERIFIED_CLAIMS = os.environ.get('AUTH_VERIFIED_CLAIMS', 'true').lower() == 'true'
+PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', '10000'))
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '300'))
+
+# bcrypt runs on its own thread pool; requests beyond workers + queue limit get a 503
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', '64'))
+
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 1000
+
+# List and detail reads return Mongo documents as-is instead of re-validating them per row
+TRUSTED_READS = os.environ.get('TRUSTED_READS', 'true').lower() == 'true'
+
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+
+# Contract YAML is rendered off the event loop and cached per (contract id, revision)
+YAML_RENDER_WORKERS = int(os.environ.get('YAML_RENDER_WORKERS', '2'))
+CONTRACT_YAML_CACHE_SIZE = int(os.environ.get('CONTRACT_YAML_CACHE_SIZE', '1000'))
+CONTRACT_YAML_CACHE_TTL_SECONDS = int(os.environ.get('CONTRACT_YAML_CACHE_TTL_SECONDS', '3600'))
+
+# Event-log writes are buffered and flushed with insert_many by size or time
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '10000'))
+EVENT_FLUSH_SIZE = int(os.environ.get('EVENT_FLUSH_SIZE', '500'))
+EVENT_FLUSH_INTERVAL_MS = int(os.environ.get('EVENT_FLUSH_INTERVAL_MS', '200'))
+# Events MongoDB keeps refusing are appended to NDJSON files here and written again once it recovers
+EVENT_SPILL_DIR = Path(os.environ.get('EVENT_SPILL_DIR', str(ROOT_DIR / 'spill' / 'event_logs')))
+EVENT_SPILL_REPLAY_SECONDS = float(os.environ.get('EVENT_SPILL_REPLAY_SECONDS', '30'))
+
+# Server-sent event stream: per-subscriber buffer, replay window for Last-Event-ID, keepalive period
+STREAM_SUBSCRIBER_QUEUE = int(os.environ.get('STREAM_SUBSCRIBER_QUEUE', '256'))
+STREAM_REPLAY_SIZE = int(os.environ.get('STREAM_REPLAY_SIZE', '5000'))
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('STREAM_HEARTBEAT_SECONDS', '15'))
+STREAM_MAX_SUBSCRIBERS = int(os.environ.get('STREAM_MAX_SUBSCRIBERS', '10000'))
+
+# Filtered event counts stop at this many matches or this much server time
+EVENT_COUNT_LIMIT = int(os.environ.get('EVENT_COUNT_LIMIT', '10000'))
+EVENT_COUNT_TIMEOUT_MS = int(os.environ.get('EVENT_COUNT_TIMEOUT_MS', '200'))
+
+# Triggered actions run on a bounded worker pool; exhausted retries land in action_dead_letters
+ACTION_WORKERS = int(os.environ.get('ACTION_WORKERS', '8'))
+ACTION_QUEUE_SIZE = int(os.environ.get('ACTION_QUEUE_SIZE', '10000'))
+ACTION_MAX_ATTEMPTS = int(os.environ.get('ACTION_MAX_ATTEMPTS', '4'))
+ACTION_RETRY_BASE_MS = int(os.environ.get('ACTION_RETRY_BASE_MS', '200'))
+ACTION_RETRY_MAX_MS = int(os.environ.get('ACTION_RETRY_MAX_MS', '10000'))
+# How long shutdown waits for running handlers before dead-lettering them with the rest
+ACTION_DRAIN_SECONDS = float(os.environ.get('ACTION_DRAIN_SECONDS', '5'))
+
+# AIS-style position fixes: time-series collection, chunked unordered inserts, in-process latest-position cache
+POSITION_INSERT_CHUNK = int(os.environ.get('POSITION_INSERT_CHUNK', '1000'))
+POSITION_MAX_BODY_BYTES = int(os.environ.get('POSITION_MAX_BODY_BYTES', str(16 * 1024 * 1024)))
+POSITION_RETENTION_DAYS = int(os.environ.get('POSITION_RETENTION_DAYS', '90'))
+POSITION_CACHE_SIZE = int(os.environ.get('POSITION_CACHE_SIZE', '20000'))
+POSITION_CACHE_TTL_SECONDS = int(os.environ.get('POSITION_CACHE_TTL_SECONDS', '300'))
+POSITION_LOOKBACK_HOURS = int(os.environ.get('POSITION_LOOKBACK_HOURS', '24'))
+
+# Streaming pipelines: bounded queues between stages, measured in batches
+STREAM_QUEUE_BATCHES = int(os.environ.get('STREAM_QUEUE_BATCHES', '64'))
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '500'))
+
+# Events older than the retention window move from MongoDB to gzip NDJSON files, one per UTC day; 0 disables
+EVENT_RETENTION_DAYS = int(os.environ.get('EVENT_RETENTION_DAYS', '30'))
+EVENT_ARCHIVE_DIR = Path(os.environ.get('EVENT_ARCHIVE_DIR', str(ROOT_DIR / 'archive' / 'event_logs')))
+EVENT_ARCHIVE_INTERVAL_SECONDS = int(os.environ.get('EVENT_ARCHIVE_INTERVAL_SECONDS', '3600'))
+EVENT_ARCHIVE_BATCH_SIZE = int(os.environ.get('EVENT_ARCHIVE_BATCH_SIZE', '5000'))
+# A day's lease outlives any single archiving pass, and lapses if its worker dies mid-run
+EVENT_ARCHIVE_LEASE_SECONDS = 3600
+
+STATS_CACHE_TTL_SECONDS = float(os.environ.get('STATS_CACHE_TTL_SECONDS', '10'))
+
+DASHBOARD_RECONCILE_SECONDS = int(os.environ.get('DASHBOARD_RECONCILE_SECONDS', '300'))
+
+# Bulk create/upsert endpoints accept at most this many records per call
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', '5000'))
+
+# Contract history stores deltas, with a full snapshot every this many versions to bound reconstruction
+CONTRACT_HISTORY_SNAPSHOT_INTERVAL = int(os.environ.get('CONTRACT_HISTORY_SNAPSHOT_INTERVAL', '20'))
+
+# POSTs carrying an Idempotency-Key replay their first successful response for this long
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '10000'))
+IDEMPOTENCY_MAX_RESPONSE_BYTES = int(os.environ.get('IDEMPOTENCY_MAX_RESPONSE_BYTES', str(1024 * 1024)))
+
+# Refuse to start when a registered hot query would fall back to a collection scan; on by default under CI
+INDEX_STRICT = os.environ.get('INDEX_STRICT', 'true' if os.environ.get('CI') else 'false').lower() == 'true'
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -55,6 +180,10 @@ class Token(BaseModel):
     token_type: str
     user: User
 
+class UserAccessUpdate(BaseModel):
+    domain: Optional[str] = None
+    role: Optional[str] = None
+
 class VesselData(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -66,6 +195,21 @@ class VesselData(BaseModel):
     cargo_type: str
     last_updated: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class PositionFix(BaseModel):
+    """One AIS-style position report"""
+    model_config = ConfigDict(extra="ignore")
+    vessel_id: str = Field(min_length=1)
+    timestamp: datetime
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    speed_knots: Optional[float] = Field(None, ge=0)
+    course: Optional[float] = Field(None, ge=0, lt=360)
+    heading: Optional[float] = Field(None, ge=0, lt=360)
+    nav_status: Optional[str] = None
+
+class VesselWithPosition(VesselData):
+    position: Optional[PositionFix] = None
+
 class ShipmentData(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -223,6 +367,7 @@ class DataProductCanvas(BaseModel):
     status: str = "draft"  # draft, active, deprecated
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: Optional[datetime] = None
+    revision: int = 0
     follow_up_actions: List[str] = []
     follow_up_date: Optional[str] = None
 
@@ -389,6 +534,7 @@ class DataContract(BaseModel):
     expiry_date: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: Optional[datetime] = None
+    revision: int = 0
 
 class DomainJourney(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -400,6 +546,7 @@ class DomainJourney(BaseModel):
     data_products_consumed: int
     journey_started: str
     last_updated: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    revision: int = 0
 
 class QualityMetric(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -485,6 +632,7 @@ class Permit(BaseModel):
     approved_date: Optional[str] = None
     expiry_date: Optional[str] = None
     restrictions: List[str]
+    revision: int = 0
 
 class WeatherForecast(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -509,15 +657,212 @@ class AssemblyArea(BaseModel):
     status: str
     components_stored: List[str]
 
+# ============================================
+# AUTHENTICATION - Verified claims and principal cache
+# ============================================
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live"""
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+    
+    def discard_where(self, predicate) -> int:
+        """Drop every entry whose value matches the predicate, returning how many were dropped"""
+        stale = [key for key, (_, value) in self._entries.items() if predicate(value)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+def latency_summary(samples) -> dict:
+    """p50/p95/max of a window of millisecond samples"""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2], 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max_ms": round(ordered[-1], 2)
+    }
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a bounded thread pool off the event loop"""
+    def __init__(self, context: CryptContext, workers: int, queue_limit: int):
+        self._context = context
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_ms = deque(maxlen=1024)
+        self._run_ms = deque(maxlen=1024)
+    
+    async def _submit(self, fn, *args):
+        if self.in_flight >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        
+        def timed():
+            started = time.perf_counter()
+            return started, fn(*args)
+        
+        self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.in_flight -= 1
+        finished = time.perf_counter()
+        
+        self.completed += 1
+        self._wait_ms.append((started - submitted) * 1000)
+        self._run_ms.append((finished - started) * 1000)
+        return result
+    
+    async def hash(self, password: str) -> str:
+        return await self._submit(self._context.hash, password)
+    
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(self._context.verify, password, hashed)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait": latency_summary(self._wait_ms),
+            "hash_time": latency_summary(self._run_ms)
+        }
+
+password_hasher = PasswordHasher(pwd_context, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+
+# token -> User, so repeat requests skip both JWT decoding and the users lookup
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+# email -> unix time of the last role/domain change; claims issued earlier are not trusted
+principal_revocations: Dict[str, float] = {}
+
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": int(now.timestamp())})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
+def create_stream_token(user: User) -> str:
+    """A token that can only open an event stream, short-lived because it travels in a URL"""
+    now = datetime.now(timezone.utc)
+    claims = {
+        **principal_claims(user),
+        "scope": STREAM_TOKEN_SCOPE,
+        "exp": now + timedelta(seconds=STREAM_TOKEN_TTL_SECONDS),
+        "iat": int(now.timestamp())
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def principal_claims(user: User) -> dict:
+    """Claims embedded in the access token so the principal can be rebuilt without a lookup"""
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "name": user.name,
+        "domain": user.domain,
+        "role": user.role,
+        "created_at": user.created_at.isoformat()
+    }
+
+def user_from_claims(payload: dict) -> Optional[User]:
+    """Rebuild the principal from verified claims, or None if the token must be checked against the database"""
+    if not AUTH_VERIFIED_CLAIMS:
+        return None
+    if any(payload.get(claim) is None for claim in ("uid", "name", "domain", "role")):
+        return None
+    revoked_at = principal_revocations.get(payload["sub"])
+    if revoked_at is not None and payload.get("iat", 0) <= revoked_at:
+        return None
+    return User(
+        id=payload["uid"],
+        email=payload["sub"],
+        name=payload["name"],
+        domain=payload["domain"],
+        role=payload["role"],
+        created_at=payload.get("created_at") or datetime.now(timezone.utc)
+    )
+
+def invalidate_principal(email: str) -> int:
+    """Forget cached principals for a user and stop trusting claims issued before now"""
+    principal_revocations[email] = time.time()
+    return principal_cache.discard_where(lambda user: user.email == email)
+
+async def authenticate_token(token: str, scope: Optional[str] = None) -> User:
+    """Resolve a bearer token to its principal: cache, then verified claims, then the users collection.
+    
+    Scoped tokens (see create_stream_token) are only accepted where that scope is asked for.
+    """
+    if scope is None:
+        cached = principal_cache.get(token)
+        if cached is not None:
+            return cached
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -527,15 +872,288 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("scope") != scope:
+        raise HTTPException(status_code=401, detail="Token not valid for this endpoint")
     
-    user = await db.users.find_one({"email": email}, {"_id": 0})
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
+    user_obj = user_from_claims(payload)
+    if user_obj is None:
+        user = await db.users.find_one({"email": email}, {"_id": 0, "password": 0})
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        
+        user_obj = User(**user)
     
-    if isinstance(user['created_at'], str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
+    # Never cache a principal beyond the lifetime of its token; scoped tokens are not cached at all
+    if scope is None:
+        principal_cache.set(token, user_obj, ttl=payload["exp"] - time.time())
+    return user_obj
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await authenticate_token(credentials.credentials)
+
+async def get_stream_user(
+    access_token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Like get_current_user, but also accepts ?access_token= because EventSource cannot send headers.
     
-    return User(**user)
+    The query parameter only takes a stream token from POST /api/events/stream/token, never an access token,
+    so what ends up in proxy and access logs expires within STREAM_TOKEN_TTL_SECONDS and opens nothing else.
+    """
+    if credentials is not None:
+        return await authenticate_token(credentials.credentials)
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await authenticate_token(access_token, scope=STREAM_TOKEN_SCOPE)
+
+# ============================================
+# SERIALIZATION - Fast path for trusted database reads
+# ============================================
+
+def json_default(value):
+    """Fallback encoder for BSON values the JSON encoders do not know"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def encode_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC)
+    return json.dumps(content, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class TrustedJSONResponse(JSONResponse):
+    """Renders documents we wrote ourselves with orjson, skipping response-model validation"""
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+_REQUIRED = object()
+_document_shapes: Dict[type, list] = {}
+
+def document_shape(model) -> list:
+    """(field, default, nested model, is list) for every field of a model, built once per model"""
+    shape = _document_shapes.get(model)
+    if shape is None:
+        shape = []
+        for name, info in model.model_fields.items():
+            if info.is_required():
+                default = _REQUIRED
+            elif info.default_factory is not None:
+                default = info.default_factory
+            else:
+                default = (lambda value: lambda: value)(info.default)
+            annotation, is_list = unwrap_optional(info.annotation), False
+            if get_origin(annotation) in (list, List) and get_args(annotation):
+                annotation, is_list = unwrap_optional(get_args(annotation)[0]), True
+            shape.append((name, default, annotation if is_model(annotation) else None, is_list))
+        _document_shapes[model] = shape
+    return shape
+
+def conform(doc: dict, model) -> dict:
+    """What response_model would return for a stored document: model fields only, defaults filled, no validation"""
+    shaped = {}
+    for name, default, nested, is_list in document_shape(model):
+        if name in doc:
+            value = doc[name]
+            if nested is not None and value is not None:
+                if is_list and isinstance(value, list):
+                    value = [conform(item, nested) if isinstance(item, dict) else item for item in value]
+                elif isinstance(value, dict):
+                    value = conform(value, nested)
+            shaped[name] = value
+        elif default is not _REQUIRED:
+            shaped[name] = default()
+    return shaped
+
+def model_projection(model) -> dict:
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+def trusted_json(content: Any, response: Optional[Response] = None, model=None):
+    """Return Mongo documents without per-row validation, keeping any headers set on the response.
+    
+    With a model, documents are trimmed to its fields and missing defaults are filled in, so older
+    documents and stray stored fields come out the way the endpoint's response_model describes them.
+    """
+    if not TRUSTED_READS:
+        return content
+    if model is not None:
+        content = [conform(doc, model) for doc in content] if isinstance(content, list) else conform(content, model)
+    headers = dict(response.headers) if response is not None else None
+    return TrustedJSONResponse(content, headers=headers)
+
+# ============================================
+# PAGINATION - Keyset cursors on (sort key, id)
+# ============================================
+
+class PageParams:
+    """limit/after query parameters shared by every list endpoint"""
+    default_limit = PAGE_SIZE_DEFAULT
+    
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX, description="Maximum number of items to return"),
+        after: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header of the previous page")
+    ):
+        self.limit = limit or self.default_limit
+        self.after = after
+
+class EventPageParams(PageParams):
+    default_limit = 50
+
+def encode_cursor(doc: dict, sort_key: str) -> str:
+    """Encode the (sort key, id) position of the last document on a page"""
+    position = json_util.dumps([doc.get(sort_key), doc.get("id")])
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, last_id = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, last_id
+
+def keyset_filter(query: dict, sort_key: str, cursor: str, descending: bool = False) -> dict:
+    """Restrict a query to documents strictly after the cursor position"""
+    value, last_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    if sort_key == "id":
+        after = {"id": {op: last_id}}
+    elif value is None:
+        # Missing and null keys sort first ascending and last descending; comparison operators never match them
+        rest = [] if descending else [{sort_key: {"$ne": None}}]
+        after = {"$or": [{sort_key: None, "id": {op: last_id}}, *rest]}
+    else:
+        rest = [{sort_key: None}] if descending else []
+        after = {"$or": [{sort_key: {op: value}}, {sort_key: value, "id": {op: last_id}}, *rest]}
+    return {"$and": [query, after]} if query else after
+
+async def fetch_page(collection, query: dict, sort_key: str, limit: int, after: Optional[str] = None,
+                     descending: bool = False, projection: Optional[dict] = None) -> tuple:
+    """Fetch one page as an index range scan on (sort key, id); returns (documents, next cursor)"""
+    if after:
+        query = keyset_filter(query, sort_key, after, descending)
+    direction = DESCENDING if descending else ASCENDING
+    sort = [("id", direction)] if sort_key == "id" else [(sort_key, direction), ("id", direction)]
+    
+    docs = await collection.find(query, projection or {"_id": 0}).sort(sort).limit(limit + 1).to_list(limit + 1)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1], sort_key)
+
+async def paginate(response: Response, collection, query: dict, sort_key: str, page: PageParams,
+                   descending: bool = False, model=None) -> list:
+    """Fetch one page for a list endpoint and advertise the next cursor in the X-Next-Cursor header"""
+    projection = model_projection(model) if model is not None else None
+    docs, next_cursor = await fetch_page(collection, query, sort_key, page.limit, page.after, descending, projection)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return docs
+
+# ============================================
+# CHANGE TRACKING - Collection versions and conditional GET
+# ============================================
+
+class CollectionVersions:
+    """Change counters per collection, kept in MongoDB so every worker process validates against the same writes"""
+    def __init__(self):
+        self.not_modified = 0
+        self.full_responses = 0
+        self.bump_failures = 0
+        # Last version this process saw per collection, for the metrics only
+        self._seen: Dict[str, int] = {}
+    
+    async def bump(self, collection_name: str) -> Optional[int]:
+        try:
+            doc = await db.collection_versions.find_one_and_update(
+                {"_id": collection_name}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            # The write itself already happened; failing its request now would invite a duplicate retry
+            self.bump_failures += 1
+            logger.error(f"Could not bump the version of {collection_name}: {e}")
+            return None
+        self._seen[collection_name] = doc["version"]
+        return doc["version"]
+    
+    async def snapshot(self, collection_names) -> tuple:
+        found = {doc["_id"]: doc["version"]
+                 async for doc in db.collection_versions.find({"_id": {"$in": list(collection_names)}})}
+        self._seen.update(found)
+        return tuple(found.get(name, 0) for name in collection_names)
+    
+    async def etag(self, request: Request, collection_names) -> str:
+        versions = await self.snapshot(collection_names)
+        parts = [request.url.path, request.url.query]
+        parts.extend(f"{name}:{version}" for name, version in zip(collection_names, versions))
+        return '"' + hashlib.sha256("|".join(parts).encode()).hexdigest()[:32] + '"'
+    
+    async def invalidate_all(self):
+        """Move every version once at startup, so ETags taken before writes made while the API was down go stale"""
+        await db.collection_versions.update_many({}, {"$inc": {"version": 1}})
+    
+    def stats(self) -> dict:
+        return {
+            "versions": dict(self._seen),
+            "not_modified": self.not_modified,
+            "full_responses": self.full_responses,
+            "bump_failures": self.bump_failures
+        }
+
+collection_versions = CollectionVersions()
+
+async def mark_changed(*collection_names: str):
+    """Record a write so cached representations of these collections go stale"""
+    for name in collection_names:
+        version = await collection_versions.bump(name)
+        if version is not None:
+            event_broker.publish_change(name, version)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+async def not_modified(request: Request, response: Response, *collection_names: str) -> Optional[Response]:
+    """Answer a conditional GET with 304 when none of the collections changed, otherwise tag the response"""
+    etag = await collection_versions.etag(request, collection_names)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        collection_versions.not_modified += 1
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    collection_versions.full_responses += 1
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return None
+
+# ============================================
+# AGGREGATE STATS - Single-pass facets with a short-lived cache
+# ============================================
+
+stats_cache = TTLCache(256, STATS_CACHE_TTL_SECONDS)
+
+async def facet_counts(collection, fields: List[str]) -> tuple:
+    """Count a collection and group it by several fields in one $facet pass; returns (total, {field: {value: count}})"""
+    facets = {"total": [{"$count": "count"}]}
+    for field in fields:
+        facets[field] = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+    result = (await collection.aggregate([{"$facet": facets}]).to_list(1))[0]
+    total = result["total"][0]["count"] if result["total"] else 0
+    grouped = {
+        field: {row["_id"]: row["count"] for row in result[field] if row["_id"] is not None}
+        for field in fields
+    }
+    return total, grouped
+
+async def cached_stats(name: str, collection_names: tuple, compute):
+    """Serve a stats payload from cache until its TTL lapses or one of its collections is written"""
+    # The cache is per process, but its key follows the shared versions, so a write on any worker retires it
+    key = (name, await collection_versions.snapshot(collection_names))
+    stats = stats_cache.get(key)
+    if stats is None:
+        stats = await compute()
+        stats_cache.set(key, stats)
+    return stats
 
 @api_router.get("/")
 async def root():
@@ -547,14 +1165,13 @@ async def register(user_data: UserCreate):
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     user_dict = user_data.model_dump()
     user_dict.pop('password')
     user_obj = User(**user_dict)
     
     doc = user_obj.model_dump()
     doc['password'] = hashed_password
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.users.insert_one(doc)
     return user_obj
@@ -565,29 +1182,51 @@ async def login(login_data: UserLogin):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not pwd_context.verify(login_data.password, user['password']):
+    if not await password_hasher.verify(login_data.password, user['password']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    access_token = create_access_token(data={"sub": user['email'], "domain": user['domain']})
-    
-    if isinstance(user['created_at'], str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
     user_obj = User(**{k: v for k, v in user.items() if k != 'password'})
     
+    access_token = create_access_token(data=principal_claims(user_obj))
+    
     return Token(access_token=access_token, token_type="bearer", user=user_obj)
 
 @api_router.get("/auth/me", response_model=User)
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
-@api_router.get("/port/vessels", response_model=List[VesselData])
-async def get_vessels(current_user: User = Depends(get_current_user)):
-    vessels = await db.port_vessels.find({}, {"_id": 0}).to_list(100)
-    for vessel in vessels:
-        if isinstance(vessel.get('last_updated'), str):
-            vessel['last_updated'] = datetime.fromisoformat(vessel['last_updated'])
-    return vessels
+@api_router.put("/auth/users/{email}/access", response_model=User)
+async def update_user_access(email: str, access: UserAccessUpdate, current_user: User = Depends(get_current_user)):
+    """Change a user's role or domain and revoke the claims carried by their existing tokens"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    changes = access.model_dump(exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    user = await db.users.find_one_and_update(
+        {"email": email},
+        {"$set": changes},
+        projection={"_id": 0, "password": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    invalidate_principal(email)
+    
+    return User(**user)
+
+@api_router.get("/port/vessels", response_model=List[VesselWithPosition])
+async def get_vessels(request: Request, response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    cached = await not_modified(request, response, "port_vessels", "vessel_positions")
+    if cached:
+        return cached
+    
+    vessels = await paginate(response, db.port_vessels, {}, "vessel_id", page, model=VesselWithPosition)
+    await attach_latest_positions(vessels)
+    return trusted_json(vessels, response, VesselWithPosition)
 
 @api_router.post("/port/vessels", response_model=VesselData)
 async def create_vessel(vessel_data: VesselData, current_user: User = Depends(get_current_user)):
@@ -595,8 +1234,12 @@ async def create_vessel(vessel_data: VesselData, current_user: User = Depends(ge
         raise HTTPException(status_code=403, detail="Not authorized")
     
     doc = vessel_data.model_dump()
-    doc['last_updated'] = doc['last_updated'].isoformat()
-    await db.port_vessels.insert_one(doc)
+    try:
+        await db.port_vessels.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Vessel {vessel_data.vessel_id} already exists")
+    await mark_changed("port_vessels")
+    await update_dashboard_counters("port_vessels", after=doc)
     
     await log_event("vessel_update", "port", vessel_data.id, 
                     f"Vessel {vessel_data.vessel_name} status: {vessel_data.status}",
@@ -605,12 +1248,13 @@ async def create_vessel(vessel_data: VesselData, current_user: User = Depends(ge
     return vessel_data
 
 @api_router.get("/fleet/shipments", response_model=List[ShipmentData])
-async def get_shipments(current_user: User = Depends(get_current_user)):
-    shipments = await db.fleet_shipments.find({}, {"_id": 0}).to_list(100)
-    for shipment in shipments:
-        if isinstance(shipment.get('last_updated'), str):
-            shipment['last_updated'] = datetime.fromisoformat(shipment['last_updated'])
-    return shipments
+async def get_shipments(request: Request, response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    cached = await not_modified(request, response, "fleet_shipments")
+    if cached:
+        return cached
+    
+    shipments = await paginate(response, db.fleet_shipments, {}, "shipment_id", page, model=ShipmentData)
+    return trusted_json(shipments, response, ShipmentData)
 
 @api_router.post("/fleet/shipments", response_model=ShipmentData)
 async def create_shipment(shipment_data: ShipmentData, current_user: User = Depends(get_current_user)):
@@ -618,8 +1262,12 @@ async def create_shipment(shipment_data: ShipmentData, current_user: User = Depe
         raise HTTPException(status_code=403, detail="Not authorized")
     
     doc = shipment_data.model_dump()
-    doc['last_updated'] = doc['last_updated'].isoformat()
-    await db.fleet_shipments.insert_one(doc)
+    try:
+        await db.fleet_shipments.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Shipment {shipment_data.shipment_id} already exists")
+    await mark_changed("fleet_shipments")
+    await update_dashboard_counters("fleet_shipments", after=doc)
     
     await log_event("shipment_update", "fleet", shipment_data.id,
                     f"Shipment {shipment_data.shipment_id} status: {shipment_data.status}",
@@ -628,12 +1276,13 @@ async def create_shipment(shipment_data: ShipmentData, current_user: User = Depe
     return shipment_data
 
 @api_router.get("/epc/sites", response_model=List[SiteData])
-async def get_sites(current_user: User = Depends(get_current_user)):
-    sites = await db.epc_sites.find({}, {"_id": 0}).to_list(100)
-    for site in sites:
-        if isinstance(site.get('last_updated'), str):
-            site['last_updated'] = datetime.fromisoformat(site['last_updated'])
-    return sites
+async def get_sites(request: Request, response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    cached = await not_modified(request, response, "epc_sites")
+    if cached:
+        return cached
+    
+    sites = await paginate(response, db.epc_sites, {}, "site_id", page, model=SiteData)
+    return trusted_json(sites, response, SiteData)
 
 @api_router.post("/epc/sites", response_model=SiteData)
 async def create_site(site_data: SiteData, current_user: User = Depends(get_current_user)):
@@ -641,8 +1290,12 @@ async def create_site(site_data: SiteData, current_user: User = Depends(get_curr
         raise HTTPException(status_code=403, detail="Not authorized")
     
     doc = site_data.model_dump()
-    doc['last_updated'] = doc['last_updated'].isoformat()
-    await db.epc_sites.insert_one(doc)
+    try:
+        await db.epc_sites.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Site {site_data.site_id} already exists")
+    await mark_changed("epc_sites")
+    await update_dashboard_counters("epc_sites", after=doc)
     
     await log_event("site_update", "epc", site_data.id,
                     f"Site {site_data.site_name} readiness: {site_data.readiness_status}",
@@ -651,20 +1304,220 @@ async def create_site(site_data: SiteData, current_user: User = Depends(get_curr
     return site_data
 
 @api_router.get("/catalog/products", response_model=List[DataProduct])
-async def get_data_products(current_user: User = Depends(get_current_user)):
-    products = await db.data_catalog.find({}, {"_id": 0}).to_list(100)
-    for product in products:
-        if isinstance(product.get('created_at'), str):
-            product['created_at'] = datetime.fromisoformat(product['created_at'])
-    return products
+async def get_data_products(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    products = await paginate(response, db.data_catalog, {}, "name", page, model=DataProduct)
+    return trusted_json(products, response, DataProduct)
 
 @api_router.post("/catalog/products", response_model=DataProduct)
 async def create_data_product(product_data: DataProduct, current_user: User = Depends(get_current_user)):
     doc = product_data.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.data_catalog.insert_one(doc)
+    await mark_changed("data_catalog")
+    await update_dashboard_counters("data_catalog", after=doc)
     return product_data
 
+# ============================================
+# REVISIONS - Optimistic concurrency for editable documents
+# ============================================
+
+def parse_revision(value: str) -> Optional[int]:
+    """An If-Match value is the revision number, optionally quoted or weak: 3, "3", W/"3"; * matches any"""
+    tag = value.strip()
+    if tag == "*":
+        return None
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"If-Match must be a document revision, got {value!r}")
+
+def expected_revision(request: Request, body_revision: Optional[int]) -> Optional[int]:
+    """The revision a write is conditional on, from If-Match or the request; None means unconditional"""
+    if_match = request.headers.get("if-match")
+    header_revision = parse_revision(if_match) if if_match else None
+    if header_revision is not None and body_revision is not None and header_revision != body_revision:
+        raise HTTPException(status_code=400, detail="If-Match and revision disagree")
+    return header_revision if header_revision is not None else body_revision
+
+def revision_query(query: dict, expected: Optional[int]) -> dict:
+    """Add the compare-and-set precondition; documents written before revisions existed count as revision 0"""
+    if expected is None:
+        return query
+    return {**query, "revision": {"$in": [0, None]} if expected == 0 else expected}
+
+def conflict_status(request: Request) -> int:
+    """A failed If-Match is a failed precondition (412); a stale revision in the request is a conflict (409)"""
+    return 412 if request.headers.get("if-match") else 409
+
+async def revision_conflict(collection, query: dict, expected: Optional[int], not_found: str, status_code: int = 409):
+    """Explain why a conditional find_one_and_update matched nothing: the document is gone, or it moved on"""
+    current = await collection.find_one(query, {"_id": 0, "revision": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    revision = current.get("revision") or 0
+    raise HTTPException(
+        status_code=status_code,
+        detail=f"Revision conflict: expected revision {expected}, current revision is {revision}",
+        headers={"ETag": f'"{revision}"'}
+    )
+
+# ============================================
+# MERGE PATCH - RFC 7396 bodies as targeted $set/$unset
+# ============================================
+
+# Server-managed fields a patch may not touch
+MERGE_PATCH_PROTECTED = {"id", "created_at", "updated_at", "revision"}
+# Times an unconditional patch is recomputed when the document changes between its read and its write
+MERGE_PATCH_ATTEMPTS = 3
+
+_field_adapters: Dict[tuple, TypeAdapter] = {}
+
+def field_adapter(model, name: str) -> TypeAdapter:
+    """Validator for a single model field, constraints included, built once per field"""
+    key = (model, name)
+    if key not in _field_adapters:
+        info = model.model_fields[name]
+        _field_adapters[key] = TypeAdapter(Annotated[info.annotation, info])
+    return _field_adapters[key]
+
+def unwrap_optional(annotation):
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+def is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+def without_nulls(value):
+    """A merge patch applied to a non-object target: nulls inside it mean 'absent'"""
+    if isinstance(value, dict):
+        return {key: without_nulls(item) for key, item in value.items() if item is not None}
+    return value
+
+def safe_mongo_key(key: str) -> bool:
+    return bool(key) and "." not in key and not key.startswith("$")
+
+def merge_patch_operations(model, patch: dict, current: Optional[dict], prefix: str,
+                           sets: dict, unsets: dict, errors: list):
+    """Walk a merge patch against the model, validating only the fields it touches"""
+    for key, value in patch.items():
+        path = prefix + key
+        info = model.model_fields.get(key)
+        if info is None:
+            errors.append({"loc": path.split("."), "msg": "Unknown field"})
+            continue
+        if value is None:
+            if info.is_required():
+                errors.append({"loc": path.split("."), "msg": "Required field cannot be removed"})
+            else:
+                unsets[path] = ""
+            continue
+        
+        existing = (current or {}).get(key)
+        annotation = unwrap_optional(info.annotation)
+        if isinstance(value, dict) and isinstance(existing, dict):
+            if is_model(annotation):
+                merge_patch_operations(annotation, value, existing, path + ".", sets, unsets, errors)
+                continue
+            if get_origin(annotation) is dict and all(safe_mongo_key(k) for k in value):
+                additions = {k: v for k, v in value.items() if v is not None}
+                try:
+                    validated = field_adapter(model, key).validate_python(additions)
+                except ValidationError as e:
+                    errors.extend({"loc": path.split(".") + list(err["loc"]), "msg": err["msg"]} for err in e.errors())
+                    continue
+                for entry, item in validated.items():
+                    sets[f"{path}.{entry}"] = item
+                for entry in value.keys() - additions.keys():
+                    unsets[f"{path}.{entry}"] = ""
+                continue
+        
+        # Scalars, lists and objects with nothing to merge into are replaced wholesale
+        adapter = field_adapter(model, key)
+        try:
+            validated = adapter.validate_python(without_nulls(value))
+        except ValidationError as e:
+            errors.extend({"loc": path.split(".") + list(err["loc"]), "msg": err["msg"]} for err in e.errors())
+            continue
+        sets[path] = adapter.dump_python(validated)
+
+def updated_copy(doc: dict, update: dict) -> dict:
+    """The document an update produces, computed from its before-image instead of read back"""
+    after = dict(doc)
+    
+    def parent(path: str, create: bool):
+        node, parts = after, path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                if not create:
+                    return None, parts[-1]
+                child = {}
+            node[part] = child = dict(child)
+            node = child
+        return node, parts[-1]
+    
+    for path, value in update.get("$set", {}).items():
+        node, leaf = parent(path, True)
+        node[leaf] = value
+    for path in update.get("$unset", {}):
+        node, leaf = parent(path, False)
+        if node is not None:
+            node.pop(leaf, None)
+    for path, amount in update.get("$inc", {}).items():
+        node, leaf = parent(path, True)
+        node[leaf] = (node.get(leaf) or 0) + amount
+    return after
+
+async def apply_merge_patch(collection, model, doc_id: str, patch: dict, not_found: str,
+                            expected: Optional[int] = None) -> tuple:
+    """Apply a JSON merge patch to one document; returns (before, after)
+    
+    The $set/$unset paths are worked out from the fields as read, so the write is conditional on the revision
+    read. If the document moves on in between, an If-Match patch fails with 412 and any other patch is recomputed.
+    """
+    if not patch:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    protected = sorted(MERGE_PATCH_PROTECTED & patch.keys())
+    if protected:
+        raise HTTPException(status_code=400, detail=f"Fields cannot be patched: {', '.join(protected)}")
+    unknown = [key for key in patch if key not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=422, detail=[{"loc": [key], "msg": "Unknown field"} for key in unknown])
+    
+    for _ in range(MERGE_PATCH_ATTEMPTS):
+        # Only the touched top-level fields are needed to decide between merging and replacing
+        fields = {"_id": 0, "id": 1, "revision": 1, **{key: 1 for key in patch}}
+        current = await collection.find_one({"id": doc_id}, fields)
+        if current is None:
+            raise HTTPException(status_code=404, detail=not_found)
+        revision = current.get("revision") or 0
+        if expected is not None and revision != expected:
+            # Patches are only ever conditional through If-Match
+            await revision_conflict(collection, {"id": doc_id}, expected, not_found, 412)
+        
+        sets, unsets, errors = {}, {}, []
+        merge_patch_operations(model, patch, current, "", sets, unsets, errors)
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+        
+        sets["updated_at"] = datetime.now(timezone.utc)
+        update = {"$set": sets, "$inc": {"revision": 1}}
+        if unsets:
+            update["$unset"] = unsets
+        before = await collection.find_one_and_update(
+            revision_query({"id": doc_id}, revision), update, projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is not None:
+            return before, updated_copy(before, update)
+        if expected is not None:
+            await revision_conflict(collection, {"id": doc_id}, expected, not_found, 412)
+    await revision_conflict(collection, {"id": doc_id}, revision, not_found, 409)
+
 # ============================================
 # TAG TEMPLATES API - Based on Google Cloud Data Mesh Demo
 # ============================================
@@ -749,63 +1602,35 @@ async def get_tag_templates(current_user: User = Depends(get_current_user)):
 # ============================================
 
 @api_router.get("/canvas", response_model=List[DataProductCanvas])
-async def get_all_canvases(current_user: User = Depends(get_current_user)):
+async def get_all_canvases(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get all data product canvases"""
-    canvases = await db.data_product_canvases.find({}, {"_id": 0}).to_list(100)
-    for canvas in canvases:
-        if isinstance(canvas.get('created_at'), str):
-            canvas['created_at'] = datetime.fromisoformat(canvas['created_at'])
-        if canvas.get('updated_at') and isinstance(canvas.get('updated_at'), str):
-            canvas['updated_at'] = datetime.fromisoformat(canvas['updated_at'])
-    return canvases
+    canvases = await paginate(response, db.data_product_canvases, {}, "name", page, model=DataProductCanvas)
+    return trusted_json(canvases, response, DataProductCanvas)
 
 @api_router.get("/canvas/stats")
 async def get_canvas_stats(current_user: User = Depends(get_current_user)):
     """Get statistics about data product canvases"""
-    total = await db.data_product_canvases.count_documents({})
-    active = await db.data_product_canvases.count_documents({"status": "active"})
-    draft = await db.data_product_canvases.count_documents({"status": "draft"})
-    deprecated = await db.data_product_canvases.count_documents({"status": "deprecated"})
-    
-    # Count by classification
-    source_aligned = await db.data_product_canvases.count_documents({"classification": "source-aligned"})
-    aggregate = await db.data_product_canvases.count_documents({"classification": "aggregate"})
-    consumer_aligned = await db.data_product_canvases.count_documents({"classification": "consumer-aligned"})
-    
-    # Count by domain
-    port_canvases = await db.data_product_canvases.count_documents({"domain": "port"})
-    fleet_canvases = await db.data_product_canvases.count_documents({"domain": "fleet"})
-    epc_canvases = await db.data_product_canvases.count_documents({"domain": "epc"})
-    logistics_canvases = await db.data_product_canvases.count_documents({"domain": "logistics"})
-    
-    return {
-        "total": total,
-        "by_status": {
-            "active": active,
-            "draft": draft,
-            "deprecated": deprecated
-        },
-        "by_classification": {
-            "source_aligned": source_aligned,
-            "aggregate": aggregate,
-            "consumer_aligned": consumer_aligned
-        },
-        "by_domain": {
-            "port": port_canvases,
-            "fleet": fleet_canvases,
-            "epc": epc_canvases,
-            "logistics": logistics_canvases
+    async def compute():
+        total, grouped = await facet_counts(db.data_product_canvases, ["status", "classification", "domain"])
+        return {
+            "total": total,
+            "by_status": {"active": 0, "draft": 0, "deprecated": 0, **grouped["status"]},
+            "by_classification": {
+                "source_aligned": 0,
+                "aggregate": 0,
+                "consumer_aligned": 0,
+                **{name.replace("-", "_"): count for name, count in grouped["classification"].items()}
+            },
+            "by_domain": grouped["domain"]
         }
-    }
+    
+    return await cached_stats("canvas", ("data_product_canvases",), compute)
 
 @api_router.get("/canvas/domain/{domain_name}")
-async def get_canvases_by_domain(domain_name: str, current_user: User = Depends(get_current_user)):
+async def get_canvases_by_domain(domain_name: str, response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get all canvases for a specific domain"""
-    canvases = await db.data_product_canvases.find({"domain": domain_name}, {"_id": 0}).to_list(100)
-    for canvas in canvases:
-        if isinstance(canvas.get('created_at'), str):
-            canvas['created_at'] = datetime.fromisoformat(canvas['created_at'])
-    return canvases
+    canvases = await paginate(response, db.data_product_canvases, {"domain": domain_name}, "name", page)
+    return trusted_json(canvases, response)
 
 @api_router.get("/canvas/{canvas_id}")
 async def get_canvas(canvas_id: str, current_user: User = Depends(get_current_user)):
@@ -813,20 +1638,14 @@ async def get_canvas(canvas_id: str, current_user: User = Depends(get_current_us
     canvas = await db.data_product_canvases.find_one({"id": canvas_id}, {"_id": 0})
     if not canvas:
         raise HTTPException(status_code=404, detail="Canvas not found")
-    if isinstance(canvas.get('created_at'), str):
-        canvas['created_at'] = datetime.fromisoformat(canvas['created_at'])
-    if canvas.get('updated_at') and isinstance(canvas.get('updated_at'), str):
-        canvas['updated_at'] = datetime.fromisoformat(canvas['updated_at'])
-    return canvas
+    return trusted_json(canvas)
 
 @api_router.post("/canvas", response_model=DataProductCanvas)
 async def create_canvas(canvas_data: DataProductCanvas, current_user: User = Depends(get_current_user)):
     """Create a new data product canvas"""
     doc = canvas_data.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    if doc.get('updated_at'):
-        doc['updated_at'] = doc['updated_at'].isoformat()
     await db.data_product_canvases.insert_one(doc)
+    await mark_changed("data_product_canvases")
     
     await log_event("canvas_created", canvas_data.domain, canvas_data.id,
                     f"Data Product Canvas '{canvas_data.name}' created",
@@ -834,25 +1653,47 @@ async def create_canvas(canvas_data: DataProductCanvas, current_user: User = Dep
     
     return canvas_data
 
+def replacement_update(model: BaseModel) -> dict:
+    """A full-document update that keeps id and created_at and bumps the revision, in place of read + replace_one"""
+    doc = model.model_dump(exclude={"id", "created_at", "revision"})
+    doc["updated_at"] = datetime.now(timezone.utc)
+    return {"$set": doc, "$inc": {"revision": 1}}
+
+def body_revision(model: BaseModel) -> Optional[int]:
+    """The revision a full-document body was based on, if the client sent one"""
+    return model.revision if "revision" in model.model_fields_set else None
+
 @api_router.put("/canvas/{canvas_id}")
-async def update_canvas(canvas_id: str, canvas_data: DataProductCanvas, current_user: User = Depends(get_current_user)):
-    """Update an existing data product canvas"""
-    existing = await db.data_product_canvases.find_one({"id": canvas_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Canvas not found")
-    
-    doc = canvas_data.model_dump()
-    doc['id'] = canvas_id
-    doc['updated_at'] = datetime.now(timezone.utc).isoformat()
-    doc['created_at'] = existing.get('created_at', datetime.now(timezone.utc).isoformat())
-    
-    await db.data_product_canvases.replace_one({"id": canvas_id}, doc)
+async def update_canvas(canvas_id: str, canvas_data: DataProductCanvas, request: Request, current_user: User = Depends(get_current_user)):
+    """Update an existing data product canvas; If-Match or a revision in the body makes it compare-and-set"""
+    expected = expected_revision(request, body_revision(canvas_data))
+    canvas = await db.data_product_canvases.find_one_and_update(
+        revision_query({"id": canvas_id}, expected), replacement_update(canvas_data),
+        projection={"_id": 0, "revision": 1}, return_document=ReturnDocument.AFTER
+    )
+    if canvas is None:
+        await revision_conflict(db.data_product_canvases, {"id": canvas_id}, expected, "Canvas not found",
+                                conflict_status(request))
+    await mark_changed("data_product_canvases")
     
     await log_event("canvas_updated", canvas_data.domain, canvas_id,
                     f"Data Product Canvas '{canvas_data.name}' updated to v{canvas_data.version}",
                     ["notify_consumers", "review_changes"])
     
-    return {"message": "Canvas updated successfully", "id": canvas_id}
+    return {"message": "Canvas updated successfully", "id": canvas_id, "revision": canvas["revision"]}
+
+@api_router.patch("/canvas/{canvas_id}")
+async def patch_canvas(canvas_id: str, patch: Dict[str, Any], request: Request, current_user: User = Depends(get_current_user)):
+    """Partially update a canvas with a JSON merge patch (application/merge-patch+json)"""
+    _, canvas = await apply_merge_patch(db.data_product_canvases, DataProductCanvas, canvas_id, patch, "Canvas not found",
+                                     expected_revision(request, None))
+    await mark_changed("data_product_canvases")
+    
+    await log_event("canvas_updated", canvas["domain"], canvas_id,
+                    f"Data Product Canvas '{canvas['name']}' updated to v{canvas['version']}",
+                    ["notify_consumers", "review_changes"])
+    
+    return trusted_json(canvas)
 
 @api_router.delete("/canvas/{canvas_id}")
 async def delete_canvas(canvas_id: str, current_user: User = Depends(get_current_user)):
@@ -864,21 +1705,14 @@ async def delete_canvas(canvas_id: str, current_user: User = Depends(get_current
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Canvas not found")
     
+    await mark_changed("data_product_canvases")
+    
     return {"message": "Canvas deleted successfully"}
 
-@api_router.get("/canvas/domain/{domain_name}")
-async def get_canvases_by_domain(domain_name: str, current_user: User = Depends(get_current_user)):
-    """Get all canvases for a specific domain"""
-    canvases = await db.data_product_canvases.find({"domain": domain_name}, {"_id": 0}).to_list(100)
-    for canvas in canvases:
-        if isinstance(canvas.get('created_at'), str):
-            canvas['created_at'] = datetime.fromisoformat(canvas['created_at'])
-    return canvases
-
 @api_router.get("/governance/mappings", response_model=List[SemanticMapping])
-async def get_mappings(current_user: User = Depends(get_current_user)):
-    mappings = await db.semantic_mappings.find({}, {"_id": 0}).to_list(100)
-    return mappings
+async def get_mappings(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    mappings = await paginate(response, db.semantic_mappings, {}, "id", page, model=SemanticMapping)
+    return trusted_json(mappings, response, SemanticMapping)
 
 @api_router.post("/governance/mappings", response_model=SemanticMapping)
 async def create_mapping(mapping_data: SemanticMapping, current_user: User = Depends(get_current_user)):
@@ -887,12 +1721,13 @@ async def create_mapping(mapping_data: SemanticMapping, current_user: User = Dep
     
     doc = mapping_data.model_dump()
     await db.semantic_mappings.insert_one(doc)
+    await mark_changed("semantic_mappings")
     return mapping_data
 
 @api_router.get("/governance/policies", response_model=List[AccessPolicy])
-async def get_policies(current_user: User = Depends(get_current_user)):
-    policies = await db.access_policies.find({}, {"_id": 0}).to_list(100)
-    return policies
+async def get_policies(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    policies = await paginate(response, db.access_policies, {}, "id", page, model=AccessPolicy)
+    return trusted_json(policies, response, AccessPolicy)
 
 @api_router.post("/governance/policies", response_model=AccessPolicy)
 async def create_policy(policy_data: AccessPolicy, current_user: User = Depends(get_current_user)):
@@ -901,15 +1736,279 @@ async def create_policy(policy_data: AccessPolicy, current_user: User = Depends(
     
     doc = policy_data.model_dump()
     await db.access_policies.insert_one(doc)
+    await mark_changed("access_policies")
     return policy_data
 
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes (query strings without an offset, json_util cursors) as UTC"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+def event_filters(domain: Optional[str], event_type: Optional[str], resource_id: Optional[str]) -> dict:
+    """Equality filters; each matches the leading field of a (field, timestamp, id) index"""
+    filters = {}
+    if domain:
+        filters["domain"] = domain
+    if event_type:
+        filters["event_type"] = event_type
+    if resource_id:
+        filters["resource_id"] = resource_id
+    return filters
+
+def time_range(since: Optional[datetime], until: Optional[datetime]) -> dict:
+    bounds = {}
+    if since is not None:
+        bounds["$gte"] = since
+    if until is not None:
+        bounds["$lt"] = until
+    return {"timestamp": bounds} if bounds else {}
+
+async def estimate_event_count(query: dict) -> str:
+    """Count of matching events in MongoDB (the hot window): metadata when unfiltered, else capped ("N+")"""
+    if not query:
+        return str(await db.event_logs.estimated_document_count())
+    try:
+        count = await db.event_logs.count_documents(query, limit=EVENT_COUNT_LIMIT + 1, maxTimeMS=EVENT_COUNT_TIMEOUT_MS)
+    except OperationFailure:
+        # Ran out of time budget: report that there are at least a page's worth
+        return f"{EVENT_COUNT_LIMIT}+"
+    return f"{EVENT_COUNT_LIMIT}+" if count > EVENT_COUNT_LIMIT else str(count)
+
 @api_router.get("/events", response_model=List[EventLog])
-async def get_events(current_user: User = Depends(get_current_user)):
-    events = await db.event_logs.find({}, {"_id": 0}).sort("timestamp", -1).to_list(50)
-    for event in events:
-        if isinstance(event.get('timestamp'), str):
-            event['timestamp'] = datetime.fromisoformat(event['timestamp'])
-    return events
+async def get_events(
+    response: Response,
+    domain: Optional[str] = None,
+    event_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Inclusive lower bound on timestamp"),
+    until: Optional[datetime] = Query(None, description="Exclusive upper bound on timestamp"),
+    count: bool = Query(False, description="Add an X-Count-Estimate header for the events still in MongoDB"),
+    page: PageParams = Depends(EventPageParams),
+    current_user: User = Depends(get_current_user)
+):
+    """Query the event log newest first across MongoDB and the archive; filters combine with AND"""
+    since, until = as_utc(since), as_utc(until)
+    if since is not None and until is not None and since > until:
+        raise HTTPException(status_code=400, detail="since must not be after until")
+    
+    filters = event_filters(domain, event_type, resource_id)
+    events, next_cursor = await fetch_event_page(filters, since, until, page.limit, page.after)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if count:
+        response.headers["X-Count-Estimate"] = await estimate_event_count({**filters, **time_range(since, until)})
+    return trusted_json(events, response, EventLog)
+
+# ============================================
+# EVENT SINK - Batched asynchronous event-log writer
+# ============================================
+
+def append_text(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+class EventSink:
+    """Buffers event-log documents on a bounded queue and writes them with insert_many"""
+    def __init__(self, max_queue: int, flush_size: int, flush_interval_ms: int, spill_dir: Path = EVENT_SPILL_DIR,
+                 replay_interval_seconds: float = EVENT_SPILL_REPLAY_SECONDS):
+        self.max_queue = max_queue
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.spill_dir = spill_dir
+        self.replay_interval = replay_interval_seconds
+        # Files left by an earlier run are picked up by the first replay
+        self._next_replay = 0.0
+        self.spilled = 0
+        self.replayed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.backpressure_waits = 0
+        self._flush_ms = deque(maxlen=1024)
+    
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Flush everything still queued, then stop the writer"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+    
+    async def emit(self, doc: dict):
+        if self._queue is None:
+            # Not running (scripts, shutdown): write straight through
+            await self._flush([doc])
+            return
+        if self._queue.full():
+            # Backpressure: the handler waits here until the writer catches up
+            self.backpressure_waits += 1
+        await self._queue.put(doc)
+        self.enqueued += 1
+    
+    async def emit_many(self, docs: List[dict]):
+        if self._queue is None:
+            if docs:
+                await self._flush(docs)
+            return
+        for doc in docs:
+            await self.emit(doc)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.flush_size:
+                try:
+                    doc = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        doc = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if doc is None:
+                    stopping = True
+                    break
+                batch.append(doc)
+            try:
+                await self._flush(batch)
+            except Exception:
+                # The writer must outlive any one batch: if it died, the bounded queue would fill
+                # and every handler awaiting emit() (and stop()) would block forever
+                self.failed += len(batch)
+                logger.exception(f"Event sink could not flush {len(batch)} events")
+            if time.monotonic() >= self._next_replay:
+                try:
+                    await self._replay_spilled()
+                except Exception:
+                    logger.exception("Event sink could not replay spilled events")
+    
+    async def _flush(self, batch: List[dict]):
+        started = time.perf_counter()
+        pending, stored, error = batch, [], None
+        for attempt in range(3):
+            try:
+                await db.event_logs.insert_many(pending, ordered=False)
+                stored.extend(pending)
+                pending = []
+                break
+            except BulkWriteError as e:
+                # insert_many stamps _id on the dicts, so rows that landed come back as E11000 on a
+                # resend; those count as stored and only the other failures are retried
+                retry = {failure["index"] for failure in e.details.get("writeErrors", []) if failure.get("code") != 11000}
+                stored.extend(doc for index, doc in enumerate(pending) if index not in retry)
+                pending = [pending[index] for index in sorted(retry)]
+                error = e
+            except PyMongoError as e:
+                error = e
+            if not pending:
+                break
+            if attempt < 2:
+                await asyncio.sleep(0.1 * 2 ** attempt)
+        if pending and await self._spill(pending, error):
+            self.spilled += len(pending)
+        if not stored:
+            return
+        
+        self.flushes += 1
+        self.written += len(stored)
+        self._flush_ms.append((time.perf_counter() - started) * 1000)
+        await self._publish(stored)
+    
+    def _spill_path(self) -> Path:
+        # One file per process, so workers never interleave partial lines
+        return self.spill_dir / f"events-{os.getpid()}.ndjson"
+    
+    async def _spill(self, docs: List[dict], error: Optional[Exception]) -> bool:
+        """Append events MongoDB would not take to a local NDJSON file; the writer replays them later"""
+        lines = "".join(json_util.dumps(doc) + "\n" for doc in docs)
+        try:
+            await asyncio.to_thread(append_text, self._spill_path(), lines)
+        except OSError as e:
+            self.failed += len(docs)
+            logger.error(f"Dropped {len(docs)} events: insert_many failed ({error}) and so did spilling ({e})")
+            return False
+        # MongoDB just refused these several times; give it a full interval before they are sent again
+        self._next_replay = max(self._next_replay, time.monotonic() + self.replay_interval)
+        logger.error(f"Spilled {len(docs)} events to {self._spill_path()} after failed insert_many: {error}")
+        return True
+    
+    async def _replay_spilled(self):
+        """Write spilled events again; rows that still fail go back to the spill file"""
+        self._next_replay = time.monotonic() + self.replay_interval
+        paths = await asyncio.to_thread(lambda: sorted(self.spill_dir.glob("events-*.ndjson")))
+        for path in paths:
+            # Renaming claims the file, so two workers never replay the same one
+            claimed = path.with_name(f"{path.name}.{os.getpid()}.replaying")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue
+            text = await asyncio.to_thread(claimed.read_text, encoding="utf-8")
+            docs = [json_util.loads(line) for line in text.splitlines() if line.strip()]
+            stored, retry, error = docs, [], None
+            try:
+                await db.event_logs.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # The _id was spilled with the row, so one that did land before comes back as E11000
+                failures = e.details.get("writeErrors", [])
+                failed = {failure["index"]: failure.get("code") for failure in failures}
+                stored = [doc for index, doc in enumerate(docs) if index not in failed]
+                retry = [docs[index] for index, code in sorted(failed.items()) if code != 11000]
+                error = e
+            except PyMongoError as e:
+                stored, retry, error = [], docs, e
+            if retry:
+                await self._spill(retry, error)
+            await asyncio.to_thread(claimed.unlink, missing_ok=True)
+            if stored:
+                self.replayed += len(stored)
+                self.written += len(stored)
+                await self._publish(stored)
+    
+    async def _publish(self, stored: List[dict]):
+        await mark_changed("event_logs")
+        # Pushed only once stored, so a subscriber that refetches /events already sees them
+        for doc in stored:
+            try:
+                event_broker.publish_event(doc)
+                action_dispatcher.submit(doc)
+            except Exception:
+                logger.exception(f"Could not publish event {doc.get('id')}")
+    
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_limit": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "avg_batch_size": round(self.written / self.flushes, 1) if self.flushes else 0.0,
+            "backpressure_waits": self.backpressure_waits,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "flush_latency": latency_summary(self._flush_ms)
+        }
+
+event_sink = EventSink(EVENT_QUEUE_SIZE, EVENT_FLUSH_SIZE, EVENT_FLUSH_INTERVAL_MS)
 
 async def log_event(event_type: str, domain: str, resource_id: str, description: str, triggered_actions: List[str]):
     event = EventLog(
@@ -919,104 +2018,1527 @@ async def log_event(event_type: str, domain: str, resource_id: str, description:
         description=description,
         triggered_actions=triggered_actions
     )
-    doc = event.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    await db.event_logs.insert_one(doc)
+    await event_sink.emit(event.model_dump())
 
-@api_router.get("/dashboard/stats")
-async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
-    vessels_count = await db.port_vessels.count_documents({})
-    shipments_count = await db.fleet_shipments.count_documents({})
-    sites_count = await db.epc_sites.count_documents({})
-    products_count = await db.data_catalog.count_documents({})
-    routes_count = await db.logistics_routes.count_documents({})
-    permits_count = await db.logistics_permits.count_documents({})
-    
-    vessels_in_port = await db.port_vessels.count_documents({"status": "berthed"})
-    shipments_in_transit = await db.fleet_shipments.count_documents({"status": "in_transit"})
-    sites_ready = await db.epc_sites.count_documents({"readiness_status": "ready"})
-    permits_pending = await db.logistics_permits.count_documents({"status": "pending"})
-    
-    return {
-        "total_vessels": vessels_count,
-        "vessels_in_port": vessels_in_port,
-        "total_shipments": shipments_count,
-        "shipments_in_transit": shipments_in_transit,
-        "total_sites": sites_count,
-        "sites_ready": sites_ready,
-        "data_products": products_count,
-        "total_routes": routes_count,
-        "total_permits": permits_count,
-        "permits_pending": permits_pending
-    }
+async def log_events(events: List[EventLog]):
+    """Log a batch of events; they reach event_logs together in the sink's next insert_many"""
+    await event_sink.emit_many([event.model_dump() for event in events])
 
-@api_router.get("/logistics/routes", response_model=List[Route])
-async def get_routes(current_user: User = Depends(get_current_user)):
-    routes = await db.logistics_routes.find({}, {"_id": 0}).to_list(100)
-    for route in routes:
-        if isinstance(route.get('last_updated'), str):
-            route['last_updated'] = datetime.fromisoformat(route['last_updated'])
-    return routes
+# ============================================
+# STREAMING - Server-sent events for the event log and collection changes
+# ============================================
 
-@api_router.post("/logistics/routes", response_model=Route)
-async def create_route(route_data: Route, current_user: User = Depends(get_current_user)):
-    if current_user.role != "admin" and current_user.domain != "logistics":
-        raise HTTPException(status_code=403, detail="Not authorized")
+# Collections whose documents all belong to one operational domain; the rest are mesh-wide
+COLLECTION_DOMAINS = {
+    "port_vessels": "port",
+    "fleet_shipments": "fleet",
+    "epc_sites": "epc",
+    "logistics_routes": "logistics",
+    "logistics_permits": "logistics",
+    "weather_forecasts": "logistics",
+    "assembly_areas": "logistics"
+}
+
+class StreamMessage:
+    """One published message, framed once and shared by every subscriber"""
+    __slots__ = ("seq", "kind", "domain", "collection", "frame")
     
-    doc = route_data.model_dump()
-    doc['last_updated'] = doc['last_updated'].isoformat()
-    await db.logistics_routes.insert_one(doc)
+    def __init__(self, seq: int, event_id: str, kind: str, domain: Optional[str], collection: Optional[str], data: dict):
+        self.seq = seq
+        self.kind = kind
+        self.domain = domain
+        self.collection = collection
+        payload = encode_json(data).decode("utf-8")
+        self.frame = f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n".encode("utf-8")
+
+class StreamSubscriber:
+    __slots__ = ("queue", "kinds", "domains", "collections", "lagged", "closed")
     
-    await log_event("route_created", "logistics", route_data.id,
-                    f"Route {route_data.route_name} created: {route_data.origin} to {route_data.destination}",
-                    ["notify_fleet", "update_permits"])
+    def __init__(self, queue_size: int, kinds: Optional[set], domains: Optional[set], collections: Optional[set]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.kinds = kinds
+        self.domains = domains
+        self.collections = collections
+        self.lagged = False
+        self.closed = False
     
-    return route_data
-
-@api_router.get("/logistics/permits", response_model=List[Permit])
-async def get_permits(current_user: User = Depends(get_current_user)):
-    permits = await db.logistics_permits.find({}, {"_id": 0}).to_list(100)
-    return permits
+    def wants(self, message: StreamMessage) -> bool:
+        if self.kinds is not None and message.kind not in self.kinds:
+            return False
+        # Mesh-wide messages carry no domain and reach every subscriber
+        if self.domains is not None and message.domain is not None and message.domain not in self.domains:
+            return False
+        if self.collections is not None and message.collection is not None and message.collection not in self.collections:
+            return False
+        return True
 
-@api_router.post("/logistics/permits", response_model=Permit)
-async def create_permit(permit_data: Permit, current_user: User = Depends(get_current_user)):
-    doc = permit_data.model_dump()
-    await db.logistics_permits.insert_one(doc)
+class EventBroker:
+    """Fans published messages out to subscriber queues and keeps a replay window for reconnects"""
+    def __init__(self, replay_size: int, queue_size: int, max_subscribers: int):
+        # Ids restart with the process; the epoch tells a reconnecting client its id is from another run
+        self.epoch = uuid.uuid4().hex[:12]
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._seq = 0
+        self._history: deque = deque(maxlen=replay_size)
+        self._subscribers: set = set()
+        self.published = 0
+        self.delivered = 0
+        self.lagged = 0
+        self.resets = 0
     
-    await log_event("permit_requested", "logistics", permit_data.id,
-                    f"Permit {permit_data.permit_number} requested for shipment {permit_data.shipment_id}",
-                    ["notify_authority", "track_status"])
+    def _publish(self, kind: str, domain: Optional[str], collection: Optional[str], data: dict):
+        self._seq += 1
+        message = StreamMessage(self._seq, f"{self.epoch}-{self._seq}", kind, domain, collection, data)
+        self._history.append(message)
+        self.published += 1
+        for subscriber in self._subscribers:
+            if subscriber.lagged or not subscriber.wants(message):
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream; it resumes from the replay window on reconnect
+                subscriber.lagged = True
+                self.lagged += 1
     
-    return permit_data
-
-@api_router.put("/logistics/permits/{permit_id}", response_model=Permit)
-async def update_permit(permit_id: str, status: str, current_user: User = Depends(get_current_user)):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    def publish_event(self, doc: dict):
+        # insert_many has added an ObjectId by now; it is not part of the EventLog shape
+        data = {key: value for key, value in doc.items() if key != "_id"}
+        self._publish("event", doc.get("domain"), None, data)
     
-    permit = await db.logistics_permits.find_one({"id": permit_id}, {"_id": 0})
-    if not permit:
-        raise HTTPException(status_code=404, detail="Permit not found")
+    def publish_notification(self, domain: Optional[str], data: dict):
+        self._publish("notification", domain, None, data)
     
-    await db.logistics_permits.update_one(
-        {"id": permit_id},
-        {"$set": {"status": status, "approved_date": datetime.now(timezone.utc).isoformat() if status == "approved" else None}}
-    )
+    def publish_change(self, collection_name: str, version: int):
+        domain = COLLECTION_DOMAINS.get(collection_name)
+        self._publish("change", domain, collection_name, {
+            "collection": collection_name,
+            "domain": domain,
+            "version": version
+        })
     
-    permit['status'] = status
-    if status == "approved":
-        permit['approved_date'] = datetime.now(timezone.utc).isoformat()
+    def subscribe(self, kinds: Optional[set], domains: Optional[set], collections: Optional[set],
+                  last_event_id: Optional[str]):
+        """Register a subscriber and return it with the backlog it missed, or None as backlog if it must resync"""
+        subscriber = StreamSubscriber(self.queue_size, kinds, domains, collections)
+        # Registering and reading the history happen without an await in between, so nothing is missed or repeated
+        self._subscribers.add(subscriber)
+        if not last_event_id:
+            return subscriber, []
+        epoch, _, seq = last_event_id.partition("-")
+        oldest = self._history[0].seq if self._history else self._seq + 1
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq or int(seq) < oldest - 1:
+            self.resets += 1
+            return subscriber, None
+        return subscriber, [message for message in self._history if message.seq > int(seq) and subscriber.wants(message)]
     
-    await log_event("permit_updated", "logistics", permit_id,
-                    f"Permit {permit['permit_number']} status changed to {status}",
-                    ["notify_shipper", "enable_transport"])
+    @property
+    def last_id(self) -> str:
+        return f"{self.epoch}-{self._seq}"
     
-    return Permit(**permit)
+    def at_capacity(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+    
+    def unsubscribe(self, subscriber: StreamSubscriber):
+        self._subscribers.discard(subscriber)
+    
+    def close(self):
+        """Ask every open stream to finish, e.g. on shutdown"""
+        for subscriber in self._subscribers:
+            subscriber.closed = True
+            try:
+                subscriber.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+    
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "last_id": self.last_id,
+            "replay_window": len(self._history),
+            "published": self.published,
+            "delivered": self.delivered,
+            "lagged_disconnects": self.lagged,
+            "resyncs": self.resets
+        }
+
+event_broker = EventBroker(STREAM_REPLAY_SIZE, STREAM_SUBSCRIBER_QUEUE, STREAM_MAX_SUBSCRIBERS)
+
+def stream_filter(value: Optional[str]) -> Optional[set]:
+    if not value:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()} or None
+
+async def stream_frames(kinds: Optional[set], domains: Optional[set], collections: Optional[set],
+                        last_event_id: Optional[str]):
+    """Yield SSE frames for one subscriber until it disconnects, lags behind or the server shuts down"""
+    # Subscribing here rather than in the handler means a response that never starts leaves nothing registered
+    subscriber, backlog = event_broker.subscribe(kinds, domains, collections, last_event_id)
+    try:
+        yield b"retry: 3000\n\n"
+        if backlog is None:
+            # The missed range is gone (restart or too far behind): the client refetches its state
+            yield f"id: {event_broker.last_id}\nevent: resync\ndata: {{}}\n\n".encode("utf-8")
+            backlog = []
+        for message in backlog:
+            yield message.frame
+        while not subscriber.closed:
+            if subscriber.lagged and subscriber.queue.empty():
+                break
+            try:
+                async with asyncio.timeout(STREAM_HEARTBEAT_SECONDS):
+                    message = await subscriber.queue.get()
+            except TimeoutError:
+                # Comment lines keep proxies from closing an idle connection
+                yield b": keepalive\n\n"
+                continue
+            if message is None:
+                break
+            yield message.frame
+    finally:
+        event_broker.unsubscribe(subscriber)
+
+@api_router.post("/events/stream/token")
+async def issue_stream_token(current_user: User = Depends(get_current_user)):
+    """Exchange the access token for a short-lived token to pass as ?access_token= on /events/stream"""
+    return {"token": create_stream_token(current_user), "expires_in": STREAM_TOKEN_TTL_SECONDS}
+
+@api_router.get("/events/stream")
+async def stream_events(
+    request: Request,
+    kinds: Optional[str] = Query(None, description="Comma-separated: event, change, notification"),
+    domains: Optional[str] = Query(None, description="Comma-separated domains; mesh-wide messages are always sent"),
+    collections: Optional[str] = Query(None, description="Comma-separated collections for change messages"),
+    last_event_id: Optional[str] = Query(None),
+    current_user: User = Depends(get_stream_user)
+):
+    """Push new event-log entries and collection change notices as server-sent events"""
+    if event_broker.at_capacity():
+        raise HTTPException(status_code=503, detail="Too many stream subscribers", headers={"Retry-After": "5"})
+    
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        stream_frames(stream_filter(kinds), stream_filter(domains), stream_filter(collections), resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ============================================
+# ACTIONS - Dispatcher for events' triggered_actions
+# ============================================
+
+class ActionStats:
+    __slots__ = ("completed", "failed_attempts", "retried", "dead_lettered", "_latency_ms", "_completed_at")
+    
+    def __init__(self):
+        self.completed = 0
+        self.failed_attempts = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self._latency_ms = deque(maxlen=1024)
+        self._completed_at = deque(maxlen=4096)
+    
+    def record(self, latency_ms: float):
+        self.completed += 1
+        self._latency_ms.append(latency_ms)
+        self._completed_at.append(time.monotonic())
+    
+    def snapshot(self) -> dict:
+        horizon = time.monotonic() - 60
+        return {
+            "completed": self.completed,
+            "failed_attempts": self.failed_attempts,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "completed_last_minute": sum(1 for at in self._completed_at if at >= horizon),
+            "latency": latency_summary(self._latency_ms)
+        }
+
+class ActionDispatcher:
+    """Runs registered handlers for each stored event's triggered_actions off the request path.
+    
+    Work is queued per action. A worker only takes an item whose action is below its concurrency limit, so a
+    burst of one action never parks the shared workers on that action's limit while other actions wait.
+    """
+    def __init__(self, workers: int, max_queue: int, max_attempts: int, retry_base_ms: int, retry_max_ms: int,
+                 drain_seconds: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base_ms / 1000
+        self.retry_max = retry_max_ms / 1000
+        self.drain_seconds = drain_seconds
+        self._handlers: Dict[str, Callable[[dict], Awaitable[None]]] = {}
+        self._concurrency: Dict[str, int] = {}
+        self._stats: Dict[str, ActionStats] = {}
+        self._queues: Dict[str, deque] = {}
+        self._rotation: deque = deque()
+        self._queued = 0
+        self._running: Dict[str, int] = {}
+        self._current: Dict[int, tuple] = {}
+        self._idle: deque = deque()
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Dict[asyncio.Task, tuple] = {}
+        self._pending: set = set()
+        self._accepting = False
+        self.overflowed = 0
+        self.unhandled: Dict[str, int] = {}
+        self.stopped_dead_lettered = 0
+    
+    def register(self, name: str, concurrency: int = 4):
+        """Decorator registering the handler for an action name, with its own concurrency limit"""
+        def decorator(handler: Callable[[dict], Awaitable[None]]):
+            self._handlers[name] = handler
+            self._concurrency[name] = concurrency
+            return handler
+        return decorator
+    
+    def start(self):
+        self._accepting = True
+        self._tasks = [asyncio.create_task(self._work(slot)) for slot in range(self.workers)]
+    
+    async def stop(self):
+        """Let running handlers finish, then dead-letter whatever is still queued, running or waiting to retry"""
+        if not self._tasks:
+            return
+        self._accepting = False
+        self._wake(everyone=True)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.drain_seconds
+        while self._current and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        
+        leftovers = list(self._current.values())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for task, item in list(self._retries.items()):
+            task.cancel()
+            leftovers.append(item)
+        for action, queue in self._queues.items():
+            leftovers.extend((action, event, attempt) for event, attempt in queue)
+            queue.clear()
+        self._queued = 0
+        self._tasks, self._retries, self._current = [], {}, {}
+        
+        if leftovers:
+            letters = [dead_letter_doc(action, event, attempt - 1, "dispatcher stopped before the action completed")
+                       for action, event, attempt in leftovers]
+            try:
+                await db.action_dead_letters.insert_many(letters, ordered=False)
+                self.stopped_dead_lettered += len(letters)
+            except PyMongoError as e:
+                logger.error(f"Lost {len(letters)} queued actions at shutdown: {e}")
+        # Dead-letter writes already under way are finished, not cancelled
+        await asyncio.gather(*self._pending, return_exceptions=True)
+    
+    def submit(self, event: dict):
+        """Queue every triggered action of a stored event that has a handler; never waits"""
+        if not self._accepting:
+            return
+        for action in event.get("triggered_actions") or []:
+            if action not in self._handlers:
+                # Counted rather than dead-lettered: there is nothing a retry could do for it
+                self.unhandled[action] = self.unhandled.get(action, 0) + 1
+                continue
+            self._enqueue(action, event, 1)
+    
+    def _enqueue(self, action: str, event: dict, attempt: int) -> bool:
+        if self._queued >= self.max_queue:
+            self.overflowed += 1
+            self._spawn(self._dead_letter(action, event, attempt - 1, "dispatch queue full"))
+            return False
+        if action not in self._queues:
+            self._queues[action] = deque()
+            self._rotation.append(action)
+        self._queues[action].append((event, attempt))
+        self._queued += 1
+        self._wake()
+        return True
+    
+    def _wake(self, everyone: bool = False):
+        while self._idle:
+            waiter = self._idle.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                if not everyone:
+                    return
+    
+    def _take(self) -> Optional[tuple]:
+        """Next item, round-robin over actions that have work and a free slot"""
+        if not self._accepting:
+            return None
+        for _ in range(len(self._rotation)):
+            action = self._rotation[0]
+            self._rotation.rotate(-1)
+            queue = self._queues[action]
+            if queue and self._running.get(action, 0) < self._concurrency.get(action, 1):
+                event, attempt = queue.popleft()
+                self._queued -= 1
+                self._running[action] = self._running.get(action, 0) + 1
+                return action, event, attempt
+        return None
+    
+    def _spawn(self, coro) -> asyncio.Task:
+        # Keep a reference so dead-letter writes are not garbage collected
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+    
+    def _stats_for(self, action: str) -> ActionStats:
+        if action not in self._stats:
+            self._stats[action] = ActionStats()
+        return self._stats[action]
+    
+    def retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter, so retries of a failed burst spread out"""
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2 ** (attempt - 1)))
+    
+    async def _work(self, slot: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = self._take()
+            if item is None:
+                waiter = loop.create_future()
+                self._idle.append(waiter)
+                await waiter
+                continue
+            action, event, attempt = item
+            self._current[slot] = item
+            try:
+                await self._run(action, event, attempt)
+            except Exception as e:
+                logger.error(f"Action dispatcher failed on {action}: {e}")
+            finally:
+                self._current.pop(slot, None)
+                self._running[action] -= 1
+                # The freed slot may make a queued item of this action runnable for an idle worker
+                if self._queues[action]:
+                    self._wake()
+    
+    async def _run(self, action: str, event: dict, attempt: int):
+        handler = self._handlers.get(action)
+        stats = self._stats_for(action)
+        if handler is None:
+            stats.dead_lettered += 1
+            await self._dead_letter(action, event, 0, "no handler registered")
+            return
+        started = time.perf_counter()
+        try:
+            await handler(event)
+        except Exception as e:
+            stats.failed_attempts += 1
+            if attempt >= self.max_attempts:
+                stats.dead_lettered += 1
+                await self._dead_letter(action, event, attempt, f"{type(e).__name__}: {e}")
+                return
+            stats.retried += 1
+            # The worker moves on; the retry is requeued once its delay has passed
+            task = asyncio.create_task(self._retry_later(action, event, attempt + 1))
+            self._retries[task] = (action, event, attempt + 1)
+            task.add_done_callback(lambda done: self._retries.pop(done, None))
+            return
+        stats.record((time.perf_counter() - started) * 1000)
+    
+    async def _retry_later(self, action: str, event: dict, attempt: int):
+        await asyncio.sleep(self.retry_delay(attempt - 1))
+        self._enqueue(action, event, attempt)
+    
+    async def _dead_letter(self, action: str, event: dict, attempts: int, error: str):
+        try:
+            await db.action_dead_letters.insert_one(dead_letter_doc(action, event, attempts, error))
+        except PyMongoError as e:
+            logger.error(f"Lost dead letter for {action} on event {event.get('id')}: {e}")
+            return
+        await mark_changed("action_dead_letters")
+    
+    def requeue(self, action: str, event: dict) -> bool:
+        if not self._accepting or self._queued >= self.max_queue:
+            return False
+        return self._enqueue(action, event, 1)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queued,
+            "queue_limit": self.max_queue,
+            "pending_retries": len(self._retries),
+            "overflowed": self.overflowed,
+            "unhandled": dict(sorted(self.unhandled.items())),
+            "dead_lettered_at_shutdown": self.stopped_dead_lettered,
+            "actions": {
+                name: {**stats.snapshot(), "queued": len(self._queues.get(name, ())), "running": self._running.get(name, 0)}
+                for name, stats in sorted(self._stats.items())
+            }
+        }
+
+def dead_letter_doc(action: str, event: dict, attempts: int, error: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "action": action,
+        "event": {key: value for key, value in event.items() if key != "_id"},
+        "attempts": attempts,
+        "error": error,
+        "failed_at": datetime.now(timezone.utc)
+    }
+
+action_dispatcher = ActionDispatcher(ACTION_WORKERS, ACTION_QUEUE_SIZE, ACTION_MAX_ATTEMPTS,
+                                     ACTION_RETRY_BASE_MS, ACTION_RETRY_MAX_MS, ACTION_DRAIN_SECONDS)
+
+def notification(action: str, event: dict, **details) -> dict:
+    return {
+        "action": action,
+        "event_id": event.get("id"),
+        "event_type": event.get("event_type"),
+        "source_domain": event.get("domain"),
+        "resource_id": event.get("resource_id"),
+        "description": event.get("description"),
+        **details
+    }
+
+# action -> domain that should hear about it; None means the event's own domain
+ACTION_TARGETS = {
+    "notify_fleet": "fleet",
+    "notify_site": "epc",
+    "notify_shipper": "fleet",
+    "notify_logistics": "logistics",
+    "notify_authority": "logistics",
+    "notify_governance": "governance",
+    "check_readiness": "epc",
+    "enable_shipping": "port",
+    "enable_transport": "fleet",
+    "update_permits": "logistics",
+    "update_inventory": "logistics",
+    "track_status": None,
+    "update_catalog": "governance",
+    "update_metrics": "governance",
+    "update_policies": "governance",
+    "update_access": "governance",
+    "review_changes": None,
+    "version_update": None
+}
+
+def register_notifier(action: str, target: Optional[str]):
+    @action_dispatcher.register(action)
+    async def notify(event: dict):
+        domain = target or event.get("domain")
+        event_broker.publish_notification(domain, notification(action, event, target_domain=domain))
+
+for action_name, target_domain in ACTION_TARGETS.items():
+    register_notifier(action_name, target_domain)
+
+@action_dispatcher.register("notify_domains")
+async def notify_domains(event: dict):
+    # No domain on the message: every subscriber receives it
+    event_broker.publish_notification(None, notification("notify_domains", event, target_domain=None))
+
+async def resource_consumer_domains(resource_id: str) -> List[str]:
+    """Domains consuming a contract or canvas"""
+    doc = await db.data_contracts.find_one({"id": resource_id}, {"_id": 0, "consumers.domain": 1})
+    if doc is None:
+        doc = await db.data_product_canvases.find_one({"id": resource_id}, {"_id": 0, "consumers.domain": 1})
+    return sorted({consumer["domain"] for consumer in (doc or {}).get("consumers", []) if consumer.get("domain")})
+
+@action_dispatcher.register("notify_consumers")
+async def notify_consumers(event: dict):
+    for domain in await resource_consumer_domains(event["resource_id"]):
+        event_broker.publish_notification(domain, notification("notify_consumers", event, target_domain=domain))
+
+@action_dispatcher.register("notify_provider")
+async def notify_provider(event: dict):
+    contract = await db.data_contracts.find_one({"id": event["resource_id"]}, {"_id": 0, "provider": 1})
+    if contract is None:
+        raise LookupError(f"Contract {event['resource_id']} not found")
+    domain = contract["provider"]["domain"]
+    event_broker.publish_notification(domain, notification("notify_provider", event, target_domain=domain,
+                                                           provider=contract["provider"].get("email")))
+
+@api_router.get("/actions/dead-letters")
+async def get_action_dead_letters(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    """List actions that exhausted their retries, newest first"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    letters = await paginate(response, db.action_dead_letters, {}, "failed_at", page, descending=True)
+    return trusted_json(letters, response)
+
+@api_router.post("/actions/dead-letters/{letter_id}/retry")
+async def retry_action_dead_letter(letter_id: str, current_user: User = Depends(get_current_user)):
+    """Requeue a dead-lettered action with a fresh set of attempts"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    letter = await db.action_dead_letters.find_one_and_delete({"id": letter_id}, projection={"_id": 0})
+    if not letter:
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    if not action_dispatcher.requeue(letter["action"], letter["event"]):
+        await db.action_dead_letters.insert_one(letter)
+        raise HTTPException(status_code=503, detail="Action queue is full", headers={"Retry-After": "5"})
+    await mark_changed("action_dead_letters")
+    return {"message": "Action requeued", "action": letter["action"]}
+
+# ============================================
+# VESSEL POSITIONS - Time-series ingest and latest-position cache
+# ============================================
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in error.errors())
+
+position_fix_adapter = TypeAdapter(PositionFix)
+
+# vessel_id -> newest fix seen; an empty dict records "no fix within the lookback window"
+latest_positions = TTLCache(POSITION_CACHE_SIZE, POSITION_CACHE_TTL_SECONDS)
+
+class PositionIngestStats:
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = 0
+        self.requests = 0
+        self.inserts = 0
+        self._insert_ms = deque(maxlen=1024)
+    
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "inserts": self.inserts,
+            "insert_latency": latency_summary(self._insert_ms),
+            "latest_cache": latest_positions.stats()
+        }
+
+position_ingest_stats = PositionIngestStats()
+
+async def ensure_time_series_collections():
+    """Create vessel_positions as a time-series collection; older servers get a regular one"""
+    try:
+        await db.create_collection(
+            "vessel_positions",
+            timeseries={"timeField": "timestamp", "metaField": "vessel_id", "granularity": "seconds"},
+            expireAfterSeconds=POSITION_RETENTION_DAYS * 86400
+        )
+    except CollectionInvalid:
+        pass  # Already exists
+    except OperationFailure as e:
+        logger.warning(f"vessel_positions created as a regular collection, time-series unsupported: {e}")
+
+def remember_position(fix: dict):
+    current = latest_positions.get(fix["vessel_id"])
+    if not current or fix["timestamp"] > current["timestamp"]:
+        latest_positions.set(fix["vessel_id"], fix)
+
+class PositionBatch:
+    """Validates fixes as they arrive and writes them in unordered chunks, so memory stays bounded"""
+    max_errors = 100
+    
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.pending: List[dict] = []
+        self.received = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: List[dict] = []
+    
+    def reject(self, index: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"index": index, "error": error})
+    
+    async def add(self, item: Any):
+        index = self.received
+        self.received += 1
+        try:
+            fix = position_fix_adapter.validate_python(item)
+        except ValidationError as e:
+            self.reject(index, validation_message(e))
+            return
+        doc = fix.model_dump()
+        doc["timestamp"] = as_utc(doc["timestamp"])
+        self.pending.append((index, doc))
+        if len(self.pending) >= self.chunk_size:
+            await self.flush()
+    
+    async def flush(self):
+        if not self.pending:
+            return
+        chunk, self.pending = self.pending, []
+        # insert_many adds _id to the documents it is given, so the cache keeps its own copies
+        cached = [dict(doc) for _, doc in chunk]
+        started = time.perf_counter()
+        failed = set()
+        try:
+            await db.vessel_positions.insert_many([doc for _, doc in chunk], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed.add(error["index"])
+                self.reject(chunk[error["index"]][0], error.get("errmsg", "write failed"))
+        except PyMongoError as e:
+            # Which rows landed is unknown; report the whole chunk and go on with the rest of the body
+            logger.error(f"Position chunk of {len(chunk)} failed: {e}")
+            for offset, (index, _) in enumerate(chunk):
+                failed.add(offset)
+                self.reject(index, f"write failed: {type(e).__name__}")
+        position_ingest_stats._insert_ms.append((time.perf_counter() - started) * 1000)
+        position_ingest_stats.inserts += 1
+        for offset, fix in enumerate(cached):
+            if offset not in failed:
+                remember_position(fix)
+        self.accepted += len(chunk) - len(failed)
+    
+    def summary(self) -> dict:
+        return {"received": self.received, "accepted": self.accepted, "rejected": self.rejected, "errors": self.errors}
+
+async def read_ndjson(request: Request, batch: PositionBatch, max_line_bytes: int = 65536):
+    """Feed NDJSON lines to the batch as the body streams in"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise HTTPException(status_code=400, detail=f"NDJSON line longer than {max_line_bytes} bytes")
+        for line in lines:
+            await add_ndjson_line(batch, line)
+    await add_ndjson_line(batch, buffer)
+
+async def add_ndjson_line(batch: PositionBatch, line: bytes):
+    if not line.strip():
+        return
+    try:
+        item = json.loads(line)
+    except ValueError:
+        batch.reject(batch.received, "invalid JSON")
+        batch.received += 1
+        return
+    await batch.add(item)
+
+async def attach_latest_positions(vessels: List[dict]):
+    """Add each vessel's newest fix, loading cache misses for the whole page in one aggregation"""
+    positions = {vessel["vessel_id"]: latest_positions.get(vessel["vessel_id"]) for vessel in vessels}
+    missing = [vessel_id for vessel_id, fix in positions.items() if fix is None]
+    if missing:
+        since = datetime.now(timezone.utc) - timedelta(hours=POSITION_LOOKBACK_HOURS)
+        pipeline = [
+            {"$match": {"vessel_id": {"$in": missing}, "timestamp": {"$gte": since}}},
+            {"$sort": {"vessel_id": 1, "timestamp": -1}},
+            {"$group": {"_id": "$vessel_id", "fix": {"$first": "$$ROOT"}}}
+        ]
+        found = {}
+        async for row in db.vessel_positions.aggregate(pipeline):
+            fix = {key: value for key, value in row["fix"].items() if key != "_id"}
+            fix["timestamp"] = as_utc(fix["timestamp"])
+            found[row["_id"]] = fix
+        for vessel_id in missing:
+            fix = found.get(vessel_id, {})
+            latest_positions.set(vessel_id, fix)
+            positions[vessel_id] = fix
+    for vessel in vessels:
+        vessel["position"] = positions.get(vessel["vessel_id"]) or None
+
+@api_router.post("/port/positions")
+async def ingest_positions(request: Request, current_user: User = Depends(get_current_user)):
+    """Ingest position fixes as a JSON array or NDJSON (application/x-ndjson); invalid fixes are reported, not fatal"""
+    if current_user.domain != "port" and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    batch = PositionBatch(POSITION_INSERT_CHUNK)
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        await read_ndjson(request, batch)
+    else:
+        if int(request.headers.get("content-length") or 0) > POSITION_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Use NDJSON for batches this large")
+        body = await request.body()
+        if len(body) > POSITION_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Use NDJSON for batches this large")
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body is not valid JSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of position fixes")
+        for item in items:
+            await batch.add(item)
+    await batch.flush()
+    
+    position_ingest_stats.requests += 1
+    position_ingest_stats.accepted += batch.accepted
+    position_ingest_stats.rejected += batch.rejected
+    if batch.accepted:
+        await mark_changed("vessel_positions")
+    return batch.summary()
+
+@api_router.get("/port/vessels/{vessel_id}/positions", response_model=List[PositionFix])
+async def get_vessel_positions(
+    vessel_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=10000),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a vessel's track, newest first"""
+    query = {"vessel_id": vessel_id, **time_range(as_utc(since), as_utc(until))}
+    fixes = await db.vessel_positions.find(query, {"_id": 0}).sort("timestamp", DESCENDING).limit(limit).to_list(limit)
+    return trusted_json(fixes, model=PositionFix)
+
+# ============================================
+# STREAM PIPELINES - ingest -> validate -> enrich -> sink per streaming data product
+# ============================================
+
+class StreamPipelineConfig(BaseModel):
+    """One streaming data product and the stages its events pass through"""
+    topic: str
+    domain: str
+    description: str
+    event_types: List[str]
+    required_fields: List[str] = ["event_type", "resource_id", "description"]
+    stages: List[str] = ["ingest", "validate", "enrich", "sink"]
+    enrich_fields: Dict[str, Any] = {}
+    persist: bool = False  # sink also writes to the stream_events collection
+    retention: str = "7d"
+    schema_ref: str
+
+STREAM_PIPELINES = [
+    StreamPipelineConfig(
+        topic="vessel-status-v1", domain="port",
+        description="Real-time vessel arrival and departure events",
+        event_types=["vessel_update", "berth_assignment", "vessel_departure"],
+        enrich_fields={"port": "Duqm"},
+        schema_ref="schemas/vessel-event-v1.avro"
+    ),
+    StreamPipelineConfig(
+        topic="shipment-tracking-v1", domain="fleet",
+        description="GPS tracking events for wind turbine shipments",
+        event_types=["shipment_update", "checkpoint_passed", "shipment_delivered"],
+        retention="3d", schema_ref="schemas/shipment-event-v1.avro"
+    ),
+    StreamPipelineConfig(
+        topic="site-readiness-v1", domain="epc",
+        description="Installation site status updates",
+        event_types=["site_update", "installation_started", "capacity_updated"],
+        retention="14d", schema_ref="schemas/site-event-v1.avro"
+    ),
+    StreamPipelineConfig(
+        topic="logistics-alerts-v1", domain="logistics",
+        description="Route alerts and weather warnings",
+        event_types=["route_alert", "weather_warning", "permit_approved"],
+        stages=["ingest", "validate", "sink"], persist=True,
+        retention="30d", schema_ref="schemas/alert-event-v1.avro"
+    )
+]
+
+STREAM_EVENT_TITLES = {
+    "vessel_update": "Vessel Status",
+    "shipment_update": "Shipment Update",
+    "site_update": "Site Status",
+    "route_alert": "Route Alert"
+}
+
+class StageStats:
+    """Throughput, queue depth and lag for one stage"""
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.emitted = 0
+        self.rejected = 0
+        self.queued = 0
+        self._window = deque(maxlen=256)  # (monotonic time, events) per batch
+        self._lag_ms = deque(maxlen=256)
+    
+    def record(self, events_in: int, events_out: int, ingested_at: float):
+        now = time.monotonic()
+        self.processed += events_in
+        self.emitted += events_out
+        self.rejected += events_in - events_out
+        self._window.append((now, events_in))
+        self._lag_ms.append((now - ingested_at) * 1000)
+    
+    def rate(self, seconds: float = 5.0) -> float:
+        horizon = time.monotonic() - seconds
+        return round(sum(count for at, count in self._window if at >= horizon) / seconds, 1)
+    
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "rejected": self.rejected,
+            "events_per_sec": self.rate(),
+            "queue_depth": self.queued,
+            "lag": latency_summary(self._lag_ms)
+        }
+
+class StreamPipeline:
+    """A chain of stage workers connected by bounded queues of event batches"""
+    def __init__(self, config: StreamPipelineConfig, queue_batches: int, batch_size: int):
+        self.config = config
+        self.batch_size = batch_size
+        self.queue_batches = queue_batches
+        self.handlers = {
+            "ingest": self.ingest_batch,
+            "validate": self.validate_batch,
+            "enrich": self.enrich_batch,
+            "sink": self.sink_batch
+        }
+        unknown = [stage for stage in config.stages if stage not in self.handlers]
+        if unknown:
+            raise ValueError(f"{config.topic}: unknown stages {unknown}")
+        self.stats = {stage: StageStats(stage) for stage in config.stages}
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._running: Optional[asyncio.Event] = None
+        self._event_types = set(config.event_types)
+        self._seq = 0
+        self.recent: deque = deque(maxlen=20)
+        self.errors: deque = deque(maxlen=20)
+        self.generator: Optional[asyncio.Task] = None
+    
+    @property
+    def paused(self) -> bool:
+        return self._running is not None and not self._running.is_set()
+    
+    def start(self):
+        self._running = asyncio.Event()
+        self._running.set()
+        self._queues = [asyncio.Queue(maxsize=self.queue_batches) for _ in self.config.stages]
+        self._tasks = [asyncio.create_task(self._work(index)) for index in range(len(self.config.stages))]
+    
+    async def stop(self):
+        for task in self._tasks + ([self.generator] if self.generator else []):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *([self.generator] if self.generator else []), return_exceptions=True)
+        self._tasks = []
+        self.generator = None
+    
+    def pause(self):
+        self._running.clear()
+    
+    def resume(self):
+        self._running.set()
+    
+    def _chunks(self, events: list):
+        for offset in range(0, len(events), self.batch_size):
+            yield events[offset:offset + self.batch_size]
+    
+    def offer(self, events: list) -> bool:
+        """Enqueue without waiting; False when the ingest queue cannot take every batch"""
+        chunks = list(self._chunks(events))
+        if self._queues[0].maxsize - self._queues[0].qsize() < len(chunks):
+            return False
+        for chunk in chunks:
+            self._put_nowait(0, chunk, time.monotonic())
+        return True
+    
+    async def put(self, events: list):
+        """Enqueue, waiting while the ingest queue is full (backpressure for in-process producers)"""
+        for chunk in self._chunks(events):
+            await self._queues[0].put((time.monotonic(), chunk))
+            self.stats[self.config.stages[0]].queued += len(chunk)
+    
+    def _put_nowait(self, index: int, batch: list, ingested_at: float):
+        self._queues[index].put_nowait((ingested_at, batch))
+        self.stats[self.config.stages[index]].queued += len(batch)
+    
+    async def _work(self, index: int):
+        stage = self.config.stages[index]
+        handler = self.handlers[stage]
+        stats = self.stats[stage]
+        queue = self._queues[index]
+        downstream = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        while True:
+            ingested_at, batch = await queue.get()
+            # A paused pipeline keeps its queues; producers back up until resume
+            await self._running.wait()
+            stats.queued -= len(batch)
+            try:
+                output = await handler(batch)
+            except Exception as e:
+                self.errors.appendleft({"stage": stage, "error": f"{type(e).__name__}: {e}",
+                                        "at": datetime.now(timezone.utc).isoformat()})
+                output = []
+            stats.record(len(batch), len(output), ingested_at)
+            if downstream is not None and output:
+                await downstream.put((ingested_at, output))
+                self.stats[self.config.stages[index + 1]].queued += len(output)
+    
+    async def ingest_batch(self, batch: list) -> list:
+        received_at = datetime.now(timezone.utc)
+        events = []
+        for event in batch:
+            if isinstance(event, dict):
+                self._seq += 1
+                events.append({**event, "seq": self._seq, "received_at": received_at})
+        return events
+    
+    async def validate_batch(self, batch: list) -> list:
+        valid = []
+        required = self.config.required_fields
+        for event in batch:
+            missing = [field for field in required if not event.get(field)]
+            if missing:
+                reason = f"missing {', '.join(missing)}"
+            elif event["event_type"] not in self._event_types:
+                reason = f"unknown event_type {event['event_type']}"
+            else:
+                valid.append(event)
+                continue
+            self.errors.appendleft({"stage": "validate", "error": reason, "seq": event.get("seq")})
+        return valid
+    
+    async def enrich_batch(self, batch: list) -> list:
+        extra = {"topic": self.config.topic, "domain": self.config.domain, **self.config.enrich_fields}
+        for event in batch:
+            event.update(extra)
+            event.setdefault("title", STREAM_EVENT_TITLES.get(event["event_type"], event["event_type"]))
+        return batch
+    
+    async def sink_batch(self, batch: list) -> list:
+        if self.config.persist:
+            await db.stream_events.insert_many(
+                [{"id": str(uuid.uuid4()), "topic": self.config.topic, **event} for event in batch], ordered=False
+            )
+        self.recent.extendleft({key: value for key, value in event.items() if key != "_id"} for event in batch[-self.recent.maxlen:])
+        return batch
+    
+    def snapshot(self) -> dict:
+        return {
+            **self.config.model_dump(),
+            "status": "paused" if self.paused else "running",
+            "load_generator": self.generator is not None and not self.generator.done(),
+            "stages": [self.stats[stage].snapshot() for stage in self.config.stages],
+            "events_per_sec": self.stats[self.config.stages[-1]].rate(),
+            "recent_events": list(self.recent),
+            "errors": list(self.errors)
+        }
+
+stream_pipelines: Dict[str, StreamPipeline] = {
+    config.topic: StreamPipeline(config, STREAM_QUEUE_BATCHES, STREAM_BATCH_SIZE) for config in STREAM_PIPELINES
+}
+
+def synthetic_stream_events(config: StreamPipelineConfig, count: int, start: int = 0) -> list:
+    """Events a producer for this topic would send; used by the load generator"""
+    types = config.event_types
+    return [
+        {
+            "event_type": types[(start + i) % len(types)],
+            "resource_id": f"{config.domain.upper()}-{(start + i) % 997:03d}",
+            "description": f"Synthetic {types[(start + i) % len(types)].replace('_', ' ')} #{start + i}"
+        }
+        for i in range(count)
+    ]
+
+async def generate_stream_load(pipeline: StreamPipeline, rate: int, seconds: float, tick: float = 0.01):
+    """Feed the pipeline at a target rate in small ticks, waiting on backpressure instead of dropping"""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sent = 0
+    while True:
+        elapsed = loop.time() - started
+        if elapsed >= seconds:
+            break
+        due = int(rate * min(elapsed + tick, seconds)) - sent
+        if due > 0:
+            await pipeline.put(synthetic_stream_events(pipeline.config, due, sent))
+            sent += due
+        await asyncio.sleep(max(0.0, started + elapsed + tick - loop.time()))
+    remaining = int(rate * seconds) - sent
+    if remaining > 0:
+        await pipeline.put(synthetic_stream_events(pipeline.config, remaining, sent))
+        sent += remaining
+    return sent
+
+def get_stream_pipeline(topic: str) -> StreamPipeline:
+    pipeline = stream_pipelines.get(topic)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Streaming data product not found")
+    return pipeline
+
+@api_router.get("/streams")
+async def get_streams(current_user: User = Depends(get_current_user)):
+    """Get every streaming pipeline with live per-stage metrics and its latest events"""
+    return trusted_json([pipeline.snapshot() for pipeline in stream_pipelines.values()])
+
+@api_router.post("/streams/{topic}/events", status_code=202)
+async def ingest_stream_events(topic: str, events: List[Dict[str, Any]], current_user: User = Depends(get_current_user)):
+    """Hand a batch of events to a pipeline's ingest stage"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    pipeline = get_stream_pipeline(topic)
+    if not pipeline.offer(events):
+        raise HTTPException(status_code=429, detail="Pipeline is backed up", headers={"Retry-After": "1"})
+    return {"accepted": len(events)}
+
+@api_router.post("/streams/{topic}/pause")
+async def pause_stream(topic: str, current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    pipeline = get_stream_pipeline(topic)
+    pipeline.pause()
+    return pipeline.snapshot()
+
+@api_router.post("/streams/{topic}/resume")
+async def resume_stream(topic: str, current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    pipeline = get_stream_pipeline(topic)
+    pipeline.resume()
+    return pipeline.snapshot()
+
+@api_router.post("/streams/{topic}/load", status_code=202)
+async def start_stream_load(
+    topic: str,
+    rate: int = Query(10000, ge=1, le=200000, description="Events per second"),
+    seconds: float = Query(10, gt=0, le=300),
+    current_user: User = Depends(get_current_user)
+):
+    """Run the synthetic load generator against a pipeline"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    pipeline = get_stream_pipeline(topic)
+    if pipeline.generator is not None and not pipeline.generator.done():
+        raise HTTPException(status_code=409, detail="A load generator is already running for this topic")
+    pipeline.generator = asyncio.create_task(generate_stream_load(pipeline, rate, seconds))
+    return {"message": "Load generator started", "topic": topic, "rate": rate, "seconds": seconds}
+
+# ============================================
+# EVENT ARCHIVE - Day-partitioned history below the hot window
+# ============================================
+
+def day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+def archive_key(doc: dict) -> tuple:
+    return (doc["timestamp"], doc["id"])
+
+class DayFileWriter:
+    """Writes one day file from sorted chunks, merging in the rows of the existing file as it goes.
+    
+    Every method does blocking file I/O and is meant for a worker thread. Only the current chunk and one
+    row of the old file are held in memory; the result replaces the old file atomically on finish().
+    """
+    def __init__(self, path: Path, read_rows: Callable[[Path], Any]):
+        self.path = path
+        self.rows = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per writer, so overlapping runs never write into each other's temp file
+        self.partial = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.partial")
+        self._raw = open(self.partial, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self._existing = read_rows(path) if path.exists() else iter(())
+        self._head = next(self._existing, None)
+    
+    def _emit(self, doc: dict):
+        self._gzip.write(encode_json(doc) + b"\n")
+        self.rows += 1
+    
+    def _close_existing(self):
+        if hasattr(self._existing, "close"):
+            self._existing.close()
+    
+    def write(self, docs: List[dict]):
+        """Append a chunk sorted by (timestamp, id)
+        
+        A row already in the old file is replaced by the new one, which makes a rerun after a crash between write
+        and delete harmless.
+        """
+        for doc in docs:
+            key = archive_key(doc)
+            while self._head is not None and archive_key(self._head) < key:
+                self._emit(self._head)
+                self._head = next(self._existing, None)
+            if self._head is not None and archive_key(self._head) == key:
+                self._head = next(self._existing, None)
+            self._emit(doc)
+    
+    def finish(self):
+        while self._head is not None:
+            self._emit(self._head)
+            self._head = next(self._existing, None)
+        self._close_existing()
+        self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self.partial, self.path)
+    
+    def abort(self):
+        self._close_existing()
+        self._gzip.close()
+        self._raw.close()
+        self.partial.unlink(missing_ok=True)
+
+class EventArchive:
+    """Gzip NDJSON files of archived events, one per UTC day; everything before the watermark lives here"""
+    def __init__(self, root: Path, batch_size: int):
+        self.root = root
+        self.batch_size = batch_size
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._days: Optional[List[date]] = None
+        self._scanned_at = 0.0
+        self.runs = 0
+        self.archived = 0
+        self.deleted = 0
+        self.files_read = 0
+        self.last_run: Optional[str] = None
+    
+    def path_for(self, day: date) -> Path:
+        return self.root / f"{day:%Y}" / f"{day:%m}" / f"events-{day.isoformat()}.ndjson.gz"
+    
+    def _scan(self) -> List[date]:
+        return sorted(date.fromisoformat(path.name[len("events-"):-len(".ndjson.gz")])
+                      for path in self.root.glob("*/*/events-*.ndjson.gz"))
+    
+    async def days(self, refresh: bool = False) -> List[date]:
+        # Other workers archive too, so the listing is refreshed every minute; the glob runs on a thread
+        if refresh or self._days is None or time.monotonic() - self._scanned_at > 60:
+            self._days = await asyncio.to_thread(self._scan)
+            self._scanned_at = time.monotonic()
+        return self._days
+    
+    async def watermark(self) -> Optional[datetime]:
+        """Start of the first day after the newest archived one, or None while nothing is archived"""
+        days = await self.days()
+        return day_start(days[-1]) + timedelta(days=1) if days else None
+    
+    def _rows(self, path: Path):
+        """One day's events oldest first, decoded a line at a time"""
+        self.files_read += 1
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    doc = json.loads(line)
+                    doc["timestamp"] = datetime.fromisoformat(doc["timestamp"])
+                    yield doc
+    
+    async def claim_day(self, day: date) -> bool:
+        """Take a lease on a day so two archivers never rewrite the same file at once"""
+        now = datetime.now(timezone.utc)
+        try:
+            await db.event_archive_leases.update_one(
+                {"_id": day.isoformat(), "expires_at": {"$lt": now}},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=EVENT_ARCHIVE_LEASE_SECONDS)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+    
+    async def archive_day(self, day: date) -> int:
+        """Write one day to disk chunk by chunk, then delete exactly the archived events; returns the number deleted"""
+        if not await self.claim_day(day):
+            return 0
+        try:
+            day_range = time_range(day_start(day), day_start(day) + timedelta(days=1))
+            cursor = db.event_logs.find(day_range, {"_id": 0}).sort([("timestamp", ASCENDING), ("id", ASCENDING)]) \
+                .batch_size(self.batch_size)
+            writer, id_chunks, chunk = None, [], []
+            try:
+                async for doc in cursor:
+                    doc["timestamp"] = as_utc(doc["timestamp"])
+                    chunk.append(doc)
+                    if len(chunk) >= self.batch_size:
+                        writer = writer or await asyncio.to_thread(DayFileWriter, self.path_for(day), self._rows)
+                        await asyncio.to_thread(writer.write, chunk)
+                        id_chunks.append([doc["id"] for doc in chunk])
+                        chunk = []
+                if chunk:
+                    writer = writer or await asyncio.to_thread(DayFileWriter, self.path_for(day), self._rows)
+                    await asyncio.to_thread(writer.write, chunk)
+                    id_chunks.append([doc["id"] for doc in chunk])
+                if writer is None:
+                    return 0
+                await asyncio.to_thread(writer.finish)
+            except BaseException:
+                if writer is not None:
+                    await asyncio.to_thread(writer.abort)
+                raise
+            
+            # Only ids are kept past their chunk; MongoDB deletes happen once the file is durable
+            deleted = 0
+            for ids in id_chunks:
+                self.archived += len(ids)
+                result = await db.event_logs.delete_many({"id": {"$in": ids}})
+                deleted += result.deleted_count
+            self.deleted += deleted
+            await self.days(refresh=True)
+            return deleted
+        finally:
+            await db.event_archive_leases.delete_one({"_id": day.isoformat(), "owner": self.owner})
+    
+    async def run(self, retention_days: int) -> int:
+        """Archive every whole day older than the retention window"""
+        cutoff = day_start((datetime.now(timezone.utc) - timedelta(days=retention_days)).date())
+        archived = 0
+        while True:
+            oldest = await db.event_logs.find_one(time_range(None, cutoff), {"_id": 0, "timestamp": 1},
+                                                  sort=[("timestamp", ASCENDING)])
+            if oldest is None:
+                break
+            deleted = await self.archive_day(as_utc(oldest["timestamp"]).date())
+            if not deleted:
+                break
+            archived += deleted
+        self.runs += 1
+        self.last_run = datetime.now(timezone.utc).isoformat()
+        if archived:
+            await mark_changed("event_logs")
+        return archived
+    
+    def _page(self, days: List[date], filters: dict, since: Optional[datetime], until: Optional[datetime],
+              limit: int, after: Optional[tuple]) -> tuple:
+        results = []
+        for day in reversed(days):
+            start = day_start(day)
+            if (until is not None and start >= until) or (after is not None and start > after[0]):
+                continue
+            if since is not None and start + timedelta(days=1) <= since:
+                break
+            # Files are oldest first: stream forward and keep only the newest matches this page can use
+            newest = deque(maxlen=limit + 1 - len(results))
+            for doc in self._rows(self.path_for(day)):
+                if any(doc.get(field) != value for field, value in filters.items()):
+                    continue
+                position = archive_key(doc)
+                if (since is not None and position[0] < since) or (until is not None and position[0] >= until):
+                    continue
+                if after is not None and position >= after:
+                    break
+                newest.append(doc)
+            results.extend(reversed(newest))
+            if len(results) > limit:
+                return results[:limit], True
+        return results, False
+    
+    async def read_page(self, filters: dict, since: Optional[datetime], until: Optional[datetime], limit: int,
+                        after: Optional[str]) -> tuple:
+        """Up to limit archived events newest first after the cursor; returns (documents, more remaining)"""
+        position = None
+        if after:
+            value, last_id = decode_cursor(after)
+            position = (as_utc(value), last_id)
+        days = await self.days()
+        return await asyncio.to_thread(self._page, days, filters, since, until, limit, position)
+    
+    def stats(self) -> dict:
+        days = self._days or []
+        watermark = day_start(days[-1]) + timedelta(days=1) if days else None
+        return {
+            "retention_days": EVENT_RETENTION_DAYS,
+            "archived_days": len(days),
+            "watermark": watermark.isoformat() if watermark else None,
+            "runs": self.runs,
+            "archived": self.archived,
+            "deleted": self.deleted,
+            "files_read": self.files_read,
+            "last_run": self.last_run
+        }
+
+event_archive = EventArchive(EVENT_ARCHIVE_DIR, EVENT_ARCHIVE_BATCH_SIZE)
+
+async def fetch_event_page(filters: dict, since: Optional[datetime], until: Optional[datetime], limit: int,
+                           after: Optional[str]) -> tuple:
+    """One page newest first: MongoDB down to the archive watermark, then the archive files below it"""
+    watermark = await event_archive.watermark()
+    docs, next_cursor = [], None
+    if watermark is None or until is None or until > watermark:
+        hot_since = since if watermark is None or (since is not None and since > watermark) else watermark
+        query = {**filters, **time_range(hot_since, until)}
+        docs, next_cursor = await fetch_page(db.event_logs, query, "timestamp", limit, after, descending=True)
+    if next_cursor or watermark is None or (since is not None and since >= watermark):
+        return docs, next_cursor
+    
+    # MongoDB ran out of matches; carry on from the same position in the archive
+    position = encode_cursor(docs[-1], "timestamp") if docs else after
+    archive_until = watermark if until is None else min(until, watermark)
+    archived, more = await event_archive.read_page(filters, since, archive_until, limit - len(docs), position)
+    docs = docs + archived
+    if more:
+        next_cursor = encode_cursor(docs[-1], "timestamp")
+    return docs, next_cursor
+
+async def run_event_archiver():
+    while True:
+        try:
+            archived = await event_archive.run(EVENT_RETENTION_DAYS)
+            if archived:
+                logger.info(f"Archived {archived} events older than {EVENT_RETENTION_DAYS} days")
+        except (PyMongoError, OSError) as e:
+            logger.error(f"Event archiving failed: {e}")
+        await asyncio.sleep(EVENT_ARCHIVE_INTERVAL_SECONDS)
+
+# ============================================
+# DASHBOARD - Counters materialized on write
+# ============================================
+
+DASHBOARD_STATS_ID = "dashboard"
+
+# counter -> (collection, equality filter); write handlers keep these current with $inc
+DASHBOARD_COUNTERS = {
+    "total_vessels": ("port_vessels", {}),
+    "vessels_in_port": ("port_vessels", {"status": "berthed"}),
+    "total_shipments": ("fleet_shipments", {}),
+    "shipments_in_transit": ("fleet_shipments", {"status": "in_transit"}),
+    "total_sites": ("epc_sites", {}),
+    "sites_ready": ("epc_sites", {"readiness_status": "ready"}),
+    "data_products": ("data_catalog", {}),
+    "total_routes": ("logistics_routes", {}),
+    "total_permits": ("logistics_permits", {}),
+    "permits_pending": ("logistics_permits", {"status": "pending"})
+}
+
+dashboard_reconciliation = {"runs": 0, "corrections": 0, "last_run": None, "last_drift": {}}
+
+def counter_matches(doc: Optional[dict], query: dict) -> bool:
+    return doc is not None and all(doc.get(field) == value for field, value in query.items())
+
+def counter_increments(collection_name: str, changes: List[tuple]) -> dict:
+    """Net counter changes for (before, after) document pairs of one collection (None means absent)"""
+    increments = {}
+    for name, (counter_collection, query) in DASHBOARD_COUNTERS.items():
+        if counter_collection != collection_name:
+            continue
+        delta = sum(int(counter_matches(after, query)) - int(counter_matches(before, query)) for before, after in changes)
+        if delta:
+            increments[name] = delta
+    return increments
+
+async def update_dashboard_counters(collection_name: str, before: Optional[dict] = None, after: Optional[dict] = None,
+                                    changes: Optional[List[tuple]] = None):
+    """Apply the counter changes implied by a document going from `before` to `after`, or by a batch of such pairs"""
+    increments = counter_increments(collection_name, changes if changes is not None else [(before, after)])
+    if increments:
+        await db.dashboard_stats.update_one({"_id": DASHBOARD_STATS_ID}, {"$inc": increments}, upsert=True)
+
+async def reconcile_dashboard_counters(collection_names: Optional[set] = None) -> dict:
+    """Recount counters from their collections and overwrite any drift"""
+    counts = {}
+    for name, (counter_collection, query) in DASHBOARD_COUNTERS.items():
+        if collection_names is None or counter_collection in collection_names:
+            counts[name] = await db[counter_collection].count_documents(query)
+    
+    previous = await db.dashboard_stats.find_one_and_update(
+        {"_id": DASHBOARD_STATS_ID},
+        {"$set": {**counts, "reconciled_at": datetime.now(timezone.utc)}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    ) or {}
+    drift = {name: count - previous.get(name, 0) for name, count in counts.items() if previous.get(name, 0) != count}
+    if drift:
+        # The sources did not change, so only this version moves the stats ETag past stale counts
+        await mark_changed("dashboard_stats")
+    if drift and previous:
+        logger.warning(f"Dashboard counters drifted and were corrected: {drift}")
+        dashboard_reconciliation["corrections"] += 1
+    dashboard_reconciliation["runs"] += 1
+    dashboard_reconciliation["last_run"] = datetime.now(timezone.utc).isoformat()
+    dashboard_reconciliation["last_drift"] = drift
+    return {**previous, **counts}
+
+async def run_dashboard_reconciler():
+    while True:
+        await asyncio.sleep(DASHBOARD_RECONCILE_SECONDS)
+        try:
+            await reconcile_dashboard_counters()
+        except PyMongoError as e:
+            logger.error(f"Dashboard counter reconciliation failed: {e}")
+
+@api_router.get("/dashboard/stats")
+async def get_dashboard_stats(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    cached = await not_modified(request, response, "port_vessels", "fleet_shipments", "epc_sites",
+                          "data_catalog", "logistics_routes", "logistics_permits", "dashboard_stats")
+    if cached:
+        return cached
+    
+    stats = await db.dashboard_stats.find_one({"_id": DASHBOARD_STATS_ID})
+    if stats is None:
+        stats = await reconcile_dashboard_counters()
+    
+    return {name: stats.get(name, 0) for name in DASHBOARD_COUNTERS}
+
+@api_router.get("/logistics/routes", response_model=List[Route])
+async def get_routes(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    routes = await paginate(response, db.logistics_routes, {}, "route_name", page, model=Route)
+    return trusted_json(routes, response, Route)
+
+@api_router.post("/logistics/routes", response_model=Route)
+async def create_route(route_data: Route, current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin" and current_user.domain != "logistics":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    doc = route_data.model_dump()
+    try:
+        await db.logistics_routes.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Route {route_data.route_name} already exists")
+    await mark_changed("logistics_routes")
+    await update_dashboard_counters("logistics_routes", after=doc)
+    
+    await log_event("route_created", "logistics", route_data.id,
+                    f"Route {route_data.route_name} created: {route_data.origin} to {route_data.destination}",
+                    ["notify_fleet", "update_permits"])
+    
+    return route_data
+
+@api_router.get("/logistics/permits", response_model=List[Permit])
+async def get_permits(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    permits = await paginate(response, db.logistics_permits, {}, "permit_number", page, model=Permit)
+    return trusted_json(permits, response, Permit)
+
+@api_router.post("/logistics/permits", response_model=Permit)
+async def create_permit(permit_data: Permit, current_user: User = Depends(get_current_user)):
+    doc = permit_data.model_dump()
+    try:
+        await db.logistics_permits.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Permit {permit_data.permit_number} already exists")
+    await mark_changed("logistics_permits")
+    await update_dashboard_counters("logistics_permits", after=doc)
+    
+    await log_event("permit_requested", "logistics", permit_data.id,
+                    f"Permit {permit_data.permit_number} requested for shipment {permit_data.shipment_id}",
+                    ["notify_authority", "track_status"])
+    
+    return permit_data
+
+@api_router.put("/logistics/permits/{permit_id}", response_model=Permit)
+async def update_permit(permit_id: str, status: str, request: Request, revision: Optional[int] = None,
+                        current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    expected = expected_revision(request, revision)
+    changes = {"status": status, "approved_date": datetime.now(timezone.utc).isoformat() if status == "approved" else None}
+    # The before-image tells the dashboard counters which status the permit left
+    previous = await db.logistics_permits.find_one_and_update(
+        revision_query({"id": permit_id}, expected),
+        {"$set": changes, "$inc": {"revision": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not previous:
+        await revision_conflict(db.logistics_permits, {"id": permit_id}, expected, "Permit not found",
+                                conflict_status(request))
+    await mark_changed("logistics_permits")
+    
+    permit = {**previous, **changes, "revision": (previous.get("revision") or 0) + 1}
+    await update_dashboard_counters("logistics_permits", before=previous, after=permit)
+    
+    await log_event("permit_updated", "logistics", permit_id,
+                    f"Permit {permit['permit_number']} status changed to {status}",
+                    ["notify_shipper", "enable_transport"])
+    
+    return Permit(**permit)
 
 @api_router.get("/logistics/weather", response_model=List[WeatherForecast])
-async def get_weather_forecasts(current_user: User = Depends(get_current_user)):
-    forecasts = await db.weather_forecasts.find({}, {"_id": 0}).to_list(100)
-    return forecasts
+async def get_weather_forecasts(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    forecasts = await paginate(response, db.weather_forecasts, {}, "forecast_date", page, model=WeatherForecast)
+    return trusted_json(forecasts, response, WeatherForecast)
 
 @api_router.post("/logistics/weather", response_model=WeatherForecast)
 async def create_weather_forecast(forecast_data: WeatherForecast, current_user: User = Depends(get_current_user)):
@@ -1025,12 +3547,17 @@ async def create_weather_forecast(forecast_data: WeatherForecast, current_user:
     
     doc = forecast_data.model_dump()
     await db.weather_forecasts.insert_one(doc)
+    await mark_changed("weather_forecasts")
     return forecast_data
 
 @api_router.get("/logistics/assembly-areas", response_model=List[AssemblyArea])
-async def get_assembly_areas(current_user: User = Depends(get_current_user)):
-    areas = await db.assembly_areas.find({}, {"_id": 0}).to_list(100)
-    return areas
+async def get_assembly_areas(request: Request, response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
+    cached = await not_modified(request, response, "assembly_areas")
+    if cached:
+        return cached
+    
+    areas = await paginate(response, db.assembly_areas, {}, "area_name", page, model=AssemblyArea)
+    return trusted_json(areas, response, AssemblyArea)
 
 @api_router.post("/logistics/assembly-areas", response_model=AssemblyArea)
 async def create_assembly_area(area_data: AssemblyArea, current_user: User = Depends(get_current_user)):
@@ -1039,6 +3566,7 @@ async def create_assembly_area(area_data: AssemblyArea, current_user: User = Dep
     
     doc = area_data.model_dump()
     await db.assembly_areas.insert_one(doc)
+    await mark_changed("assembly_areas")
     
     await log_event("assembly_area_registered", "logistics", area_data.id,
                     f"Assembly area {area_data.area_name} registered with capacity {area_data.capacity}",
@@ -1051,13 +3579,10 @@ async def create_assembly_area(area_data: AssemblyArea, current_user: User = Dep
 # ============================================
 
 @api_router.get("/domains/journey", response_model=List[DomainJourney])
-async def get_domain_journeys(current_user: User = Depends(get_current_user)):
+async def get_domain_journeys(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get maturity journey for all domains"""
-    journeys = await db.domain_journeys.find({}, {"_id": 0}).to_list(100)
-    for journey in journeys:
-        if isinstance(journey.get('last_updated'), str):
-            journey['last_updated'] = datetime.fromisoformat(journey['last_updated'])
-    return journeys
+    journeys = await paginate(response, db.domain_journeys, {}, "domain_name", page, model=DomainJourney)
+    return trusted_json(journeys, response, DomainJourney)
 
 @api_router.get("/domains/journey/{domain_name}")
 async def get_domain_journey(domain_name: str, current_user: User = Depends(get_current_user)):
@@ -1065,13 +3590,12 @@ async def get_domain_journey(domain_name: str, current_user: User = Depends(get_
     journey = await db.domain_journeys.find_one({"domain_name": domain_name}, {"_id": 0})
     if not journey:
         raise HTTPException(status_code=404, detail="Domain journey not found")
-    if isinstance(journey.get('last_updated'), str):
-        journey['last_updated'] = datetime.fromisoformat(journey['last_updated'])
     return journey
 
 @api_router.put("/domains/journey/{domain_name}/level")
-async def update_domain_level(domain_name: str, new_level: int, current_user: User = Depends(get_current_user)):
-    """Update domain maturity level"""
+async def update_domain_level(domain_name: str, new_level: int, request: Request, revision: Optional[int] = None,
+                              current_user: User = Depends(get_current_user)):
+    """Update domain maturity level; If-Match or ?revision= makes it compare-and-set"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -1083,37 +3607,34 @@ async def update_domain_level(domain_name: str, new_level: int, current_user: Us
         5: "Data Mesh Leader - Driving data mesh excellence"
     }
     
-    await db.domain_journeys.update_one(
-        {"domain_name": domain_name},
+    expected = expected_revision(request, revision)
+    journey = await db.domain_journeys.find_one_and_update(
+        revision_query({"domain_name": domain_name}, expected),
         {"$set": {
             "current_level": new_level,
             "level_description": level_descriptions.get(new_level, "Unknown level"),
-            "last_updated": datetime.now(timezone.utc).isoformat()
-        }}
+            "last_updated": datetime.now(timezone.utc)
+        }, "$inc": {"revision": 1}},
+        projection={"_id": 0, "revision": 1},
+        return_document=ReturnDocument.AFTER
     )
+    if journey is None:
+        await revision_conflict(db.domain_journeys, {"domain_name": domain_name}, expected, "Domain journey not found",
+                                conflict_status(request))
+    await mark_changed("domain_journeys")
     
     await log_event("domain_level_update", domain_name, domain_name,
                     f"Domain {domain_name} reached maturity level {new_level}",
                     ["notify_governance", "update_metrics"])
     
-    return {"message": f"Domain {domain_name} updated to level {new_level}"}
+    return {"message": f"Domain {domain_name} updated to level {new_level}", "revision": journey["revision"]}
 
 # ============================================
 # DATA AS A PRODUCT PRINCIPLE - Enhanced Data Contracts APIs
 # ============================================
 
-def parse_contract_dates(contract: dict) -> dict:
-    """Parse date strings to datetime objects"""
-    if isinstance(contract.get('created_at'), str):
-        contract['created_at'] = datetime.fromisoformat(contract['created_at'])
-    if isinstance(contract.get('updated_at'), str):
-        contract['updated_at'] = datetime.fromisoformat(contract['updated_at'])
-    return contract
-
 def contract_to_yaml(contract: dict) -> str:
     """Convert contract to YAML format based on Data Contract Specification"""
-    import yaml
-    
     yaml_dict = {
         "dataContractSpecification": "0.9.3",
         "id": contract.get("id"),
@@ -1139,15 +3660,31 @@ def contract_to_yaml(contract: dict) -> str:
     if contract.get("consumers"):
         yaml_dict["consumers"] = contract.get("consumers")
     
-    return yaml.dump(yaml_dict, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    return yaml.dump(yaml_dict, Dumper=YAML_DUMPER, default_flow_style=False, sort_keys=False, allow_unicode=True)
+
+yaml_executor = ThreadPoolExecutor(max_workers=YAML_RENDER_WORKERS, thread_name_prefix="yaml-render")
+# contract id -> (revision, yaml); a write bumps the revision, so a stale entry is never served
+contract_yaml_cache = TTLCache(CONTRACT_YAML_CACHE_SIZE, CONTRACT_YAML_CACHE_TTL_SECONDS)
+
+async def render_contract_yaml(contract: dict) -> str:
+    """YAML for a contract, from the cache or rendered on the YAML thread pool"""
+    revision = contract.get("revision") or 0
+    cached = contract_yaml_cache.get(contract["id"])
+    if cached is not None and cached[0] == revision:
+        return cached[1]
+    rendered = await asyncio.get_running_loop().run_in_executor(yaml_executor, contract_to_yaml, contract)
+    contract_yaml_cache.set(contract["id"], (revision, rendered))
+    return rendered
+
+def invalidate_contract_yaml(*contract_ids: str):
+    for contract_id in contract_ids:
+        contract_yaml_cache.pop(contract_id)
 
 @api_router.get("/contracts")
-async def get_data_contracts(current_user: User = Depends(get_current_user)):
+async def get_data_contracts(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get all data contracts"""
-    contracts = await db.data_contracts.find({}, {"_id": 0}).to_list(100)
-    for contract in contracts:
-        parse_contract_dates(contract)
-    return contracts
+    contracts = await paginate(response, db.data_contracts, {}, "contract_name", page)
+    return trusted_json(contracts, response)
 
 @api_router.get("/contracts/{contract_id}")
 async def get_data_contract(contract_id: str, current_user: User = Depends(get_current_user)):
@@ -1155,7 +3692,7 @@ async def get_data_contract(contract_id: str, current_user: User = Depends(get_c
     contract = await db.data_contracts.find_one({"id": contract_id}, {"_id": 0})
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found")
-    return parse_contract_dates(contract)
+    return trusted_json(contract)
 
 @api_router.get("/contracts/{contract_id}/yaml")
 async def get_data_contract_yaml(contract_id: str, current_user: User = Depends(get_current_user)):
@@ -1164,17 +3701,16 @@ async def get_data_contract_yaml(contract_id: str, current_user: User = Depends(
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found")
     
-    yaml_content = contract_to_yaml(contract)
+    yaml_content = await render_contract_yaml(contract)
     return {"yaml": yaml_content, "contract_id": contract_id}
 
 @api_router.post("/contracts", response_model=DataContract)
 async def create_data_contract(contract_data: DataContract, current_user: User = Depends(get_current_user)):
     """Create a new data contract for a data product"""
     doc = contract_data.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    if doc.get('updated_at'):
-        doc['updated_at'] = doc['updated_at'].isoformat()
     await db.data_contracts.insert_one(doc)
+    await mark_changed("data_contracts")
+    await record_contract_version(None, doc, current_user)
     
     contract_name = contract_data.contract_name if hasattr(contract_data, 'contract_name') else contract_data.data_product_id
     await log_event("contract_created", "governance", contract_data.id,
@@ -1184,24 +3720,43 @@ async def create_data_contract(contract_data: DataContract, current_user: User =
     return contract_data
 
 @api_router.put("/contracts/{contract_id}")
-async def update_data_contract(contract_id: str, contract_data: DataContract, current_user: User = Depends(get_current_user)):
-    """Update an existing data contract"""
-    existing = await db.data_contracts.find_one({"id": contract_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Contract not found")
+async def update_data_contract(contract_id: str, contract_data: DataContract, request: Request, current_user: User = Depends(get_current_user)):
+    """Update an existing data contract; If-Match or a revision in the body makes it compare-and-set"""
+    expected = expected_revision(request, body_revision(contract_data))
+    update = replacement_update(contract_data)
+    # The before-image feeds the version history; the new document follows from it and the update
+    previous = await db.data_contracts.find_one_and_update(
+        revision_query({"id": contract_id}, expected), update,
+        projection={"_id": 0}, return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        await revision_conflict(db.data_contracts, {"id": contract_id}, expected, "Contract not found",
+                                conflict_status(request))
+    await mark_changed("data_contracts")
+    invalidate_contract_yaml(contract_id)
+    contract = updated_copy(previous, update)
+    await record_contract_version(previous, contract, current_user)
     
-    doc = contract_data.model_dump()
-    doc['id'] = contract_id  # Preserve original ID
-    doc['updated_at'] = datetime.now(timezone.utc).isoformat()
-    doc['created_at'] = existing.get('created_at', datetime.now(timezone.utc).isoformat())
+    await log_event("contract_updated", "governance", contract_id,
+                    f"Data contract updated to v{contract_data.version}",
+                    ["notify_consumers", "version_update"])
     
-    await db.data_contracts.replace_one({"id": contract_id}, doc)
+    return trusted_json(contract)
+
+@api_router.patch("/contracts/{contract_id}")
+async def patch_data_contract(contract_id: str, patch: Dict[str, Any], request: Request, current_user: User = Depends(get_current_user)):
+    """Partially update a data contract with a JSON merge patch (application/merge-patch+json)"""
+    previous, contract = await apply_merge_patch(db.data_contracts, DataContract, contract_id, patch, "Contract not found",
+                                                 expected_revision(request, None))
+    await mark_changed("data_contracts")
+    invalidate_contract_yaml(contract_id)
+    await record_contract_version(previous, contract, current_user)
     
     await log_event("contract_updated", "governance", contract_id,
-                    f"Data contract updated to v{contract_data.version}",
+                    f"Data contract updated to v{contract['version']}",
                     ["notify_consumers", "version_update"])
     
-    return doc
+    return trusted_json(contract)
 
 @api_router.delete("/contracts/{contract_id}")
 async def delete_data_contract(contract_id: str, current_user: User = Depends(get_current_user)):
@@ -1209,30 +3764,51 @@ async def delete_data_contract(contract_id: str, current_user: User = Depends(ge
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    result = await db.data_contracts.update_one(
-        {"id": contract_id},
-        {"$set": {"status": "deprecated", "updated_at": datetime.now(timezone.utc).isoformat()}}
+    update = {"$set": {"status": "deprecated", "updated_at": datetime.now(timezone.utc)}, "$inc": {"revision": 1}}
+    previous = await db.data_contracts.find_one_and_update(
+        {"id": contract_id}, update, projection={"_id": 0}, return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Contract not found")
     
+    await mark_changed("data_contracts")
+    invalidate_contract_yaml(contract_id)
+    await record_contract_version(previous, updated_copy(previous, update), current_user)
+    
     return {"message": f"Contract {contract_id} has been deprecated"}
 
+def consumer_identity(email: str, team: str) -> dict:
+    """A consumer is registered once per (email, team) on a contract"""
+    return {"email": email, "team": team}
+
+def consumer_push(contract_id: str, consumer: dict) -> tuple:
+    """Filter and update that append a consumer only if its (email, team) is not already registered"""
+    identity = consumer_identity(consumer["email"], consumer["team"])
+    return (
+        {"id": contract_id, "consumers": {"$not": {"$elemMatch": identity}}},
+        {"$push": {"consumers": consumer}, "$set": {"updated_at": datetime.now(timezone.utc)}, "$inc": {"revision": 1}}
+    )
+
+def consumer_pull(contract_id: str, email: str, team: str) -> tuple:
+    identity = consumer_identity(email, team)
+    return (
+        {"id": contract_id, "consumers": {"$elemMatch": identity}},
+        {"$pull": {"consumers": identity}, "$set": {"updated_at": datetime.now(timezone.utc)}, "$inc": {"revision": 1}}
+    )
+
 @api_router.post("/contracts/{contract_id}/consumers")
 async def add_contract_consumer(contract_id: str, consumer: ContractConsumer, current_user: User = Depends(get_current_user)):
     """Add a consumer to a data contract"""
-    contract = await db.data_contracts.find_one({"id": contract_id})
-    if not contract:
-        raise HTTPException(status_code=404, detail="Contract not found")
-    
-    consumers = contract.get("consumers", [])
-    consumers.append(consumer.model_dump())
-    
-    await db.data_contracts.update_one(
-        {"id": contract_id},
-        {"$set": {"consumers": consumers, "updated_at": datetime.now(timezone.utc).isoformat()}}
-    )
+    # One conditional $push: concurrent registrations cannot overwrite each other or register twice
+    query, update = consumer_push(contract_id, consumer.model_dump())
+    result = await db.data_contracts.update_one(query, update)
+    if result.matched_count == 0:
+        if await db.data_contracts.count_documents({"id": contract_id}, limit=1) == 0:
+            raise HTTPException(status_code=404, detail="Contract not found")
+        raise HTTPException(status_code=409, detail=f"{consumer.email} ({consumer.team}) is already a consumer of this contract")
+    await mark_changed("data_contracts")
+    invalidate_contract_yaml(contract_id)
     
     await log_event("consumer_added", "governance", contract_id,
                     f"Consumer {consumer.name} added to contract",
@@ -1240,118 +3816,453 @@ async def add_contract_consumer(contract_id: str, consumer: ContractConsumer, cu
     
     return {"message": f"Consumer {consumer.name} added to contract"}
 
+class ConsumerChange(BaseModel):
+    """One item of a bulk onboarding request: add a consumer, or remove one by (email, team)"""
+    op: str = Field(pattern="^(add|remove)$")
+    contract_id: str
+    consumer: Optional[ContractConsumer] = None
+    email: Optional[str] = None
+    team: Optional[str] = None
+
+consumer_change_adapter = TypeAdapter(ConsumerChange)
+
+@api_router.post("/contracts/consumers/bulk")
+async def bulk_change_contract_consumers(items: List[Any], current_user: User = Depends(get_current_user)):
+    """Add and remove consumers across contracts in one unordered bulk_write, with per-item results"""
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    
+    results: List[dict] = [{"index": index} for index in range(len(items))]
+    operations, planned, seen = [], [], {}
+    for index, item in enumerate(items):
+        try:
+            change = consumer_change_adapter.validate_python(item)
+        except ValidationError as e:
+            results[index].update(status="invalid", error=validation_message(e))
+            continue
+        if change.op == "add":
+            if change.consumer is None:
+                results[index].update(status="invalid", error="consumer is required for add")
+                continue
+            email, team = change.consumer.email, change.consumer.team
+        else:
+            email = change.email or (change.consumer.email if change.consumer else None)
+            team = change.team or (change.consumer.team if change.consumer else None)
+            if not email or not team:
+                results[index].update(status="invalid", error="email and team are required for remove")
+                continue
+        results[index].update(op=change.op, contract_id=change.contract_id, email=email, team=team)
+        # Unordered writes may run in any order, so one batch may touch a consumer only once
+        target = (change.contract_id, email, team)
+        if target in seen:
+            results[index].update(status="invalid", error=f"Consumer already changed by item {seen[target]}")
+            continue
+        seen[target] = index
+        
+        planned.append((index, change, email, team))
+    
+    existing = set()
+    if planned:
+        contract_ids = sorted({change.contract_id for _, change, _, _ in planned})
+        async for contract in db.data_contracts.find({"id": {"$in": contract_ids}}, {"_id": 0, "id": 1}):
+            existing.add(contract["id"])
+    
+    written = []
+    for index, change, email, team in planned:
+        if change.contract_id not in existing:
+            results[index]["status"] = "contract_not_found"
+            continue
+        if change.op == "add":
+            query, update = consumer_push(change.contract_id, change.consumer.model_dump())
+        else:
+            query, update = consumer_pull(change.contract_id, email, team)
+        # With upsert, a precondition that fails on an existing contract turns into an insert that collides
+        # with the unique id index; that E11000 at the item's index is how the batch reports a no-op
+        operations.append(UpdateOne(query, update, upsert=True))
+        written.append((index, change))
+    
+    failed, stubs = {}, {}
+    if operations:
+        try:
+            result = await db.data_contracts.bulk_write(operations, ordered=False)
+            stubs = dict(result.upserted_ids)
+        except BulkWriteError as e:
+            stubs = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+            failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        if stubs:
+            # Only possible if a contract vanished after the existence check; never leave the stub behind
+            await db.data_contracts.delete_many({"_id": {"$in": list(stubs.values())}})
+    
+    touched = {}
+    for position, (index, change) in enumerate(written):
+        error = failed.get(position)
+        if position in stubs:
+            results[index]["status"] = "contract_not_found"
+        elif error is None:
+            results[index]["status"] = "registered" if change.op == "add" else "removed"
+            touched.setdefault(change.contract_id, []).append(change)
+        elif error.get("code") == 11000:
+            results[index]["status"] = "already_registered" if change.op == "add" else "not_found"
+        else:
+            results[index].update(status="error", error=error.get("errmsg", "write failed"))
+    
+    applied = sum(len(changes) for changes in touched.values())
+    if applied:
+        await mark_changed("data_contracts")
+        invalidate_contract_yaml(*touched)
+        await log_events([
+            EventLog(
+                event_type="consumers_updated", domain="governance", resource_id=contract_id,
+                description=f"Consumer registrations updated: {sum(c.op == 'add' for c in changes)} added, "
+                            f"{sum(c.op == 'remove' for c in changes)} removed",
+                triggered_actions=["update_access", "notify_provider"]
+            )
+            for contract_id, changes in touched.items()
+        ])
+    
+    return {"requested": len(items), "applied": applied, "results": results}
+
 @api_router.get("/contracts/stats/summary")
 async def get_contracts_stats(current_user: User = Depends(get_current_user)):
     """Get contract statistics summary"""
-    contracts = await db.data_contracts.find({}, {"_id": 0}).to_list(100)
-    
-    stats = {
-        "total_contracts": len(contracts),
-        "by_status": {"draft": 0, "active": 0, "deprecated": 0},
-        "by_domain": {},
-        "total_consumers": 0,
-        "avg_schema_fields": 0,
-        "with_billing": 0
-    }
+    def array_size(field: str) -> dict:
+        return {"$cond": [{"$isArray": f"${field}"}, {"$size": f"${field}"}, 0]}
     
-    total_fields = 0
-    for contract in contracts:
-        status = contract.get("status", "draft")
-        stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
-        
-        domain = contract.get("dataset", {}).get("domain", "unknown") if isinstance(contract.get("dataset"), dict) else "unknown"
-        stats["by_domain"][domain] = stats["by_domain"].get(domain, 0) + 1
+    async def compute():
+        pipeline = [{"$facet": {
+            "totals": [{"$group": {
+                "_id": None,
+                "contracts": {"$sum": 1},
+                "consumers": {"$sum": array_size("consumers")},
+                "schema_fields": {"$sum": array_size("schema_fields")},
+                "with_billing": {"$sum": {"$cond": [{"$ifNull": ["$billing", False]}, 1, 0]}}
+            }}],
+            "by_status": [{"$group": {"_id": {"$ifNull": ["$status", "draft"]}, "count": {"$sum": 1}}}],
+            "by_domain": [{"$group": {"_id": {"$ifNull": ["$dataset.domain", "unknown"]}, "count": {"$sum": 1}}}]
+        }}]
+        result = (await db.data_contracts.aggregate(pipeline).to_list(1))[0]
+        totals = result["totals"][0] if result["totals"] else {"contracts": 0, "consumers": 0, "schema_fields": 0, "with_billing": 0}
         
-        consumers = contract.get("consumers", [])
-        stats["total_consumers"] += len(consumers)
-        
-        schema_fields = contract.get("schema_fields", [])
-        total_fields += len(schema_fields)
-        
-        if contract.get("billing"):
-            stats["with_billing"] += 1
-    
-    if len(contracts) > 0:
-        stats["avg_schema_fields"] = round(total_fields / len(contracts), 1)
+        return {
+            "total_contracts": totals["contracts"],
+            "by_status": {"draft": 0, "active": 0, "deprecated": 0, **{row["_id"]: row["count"] for row in result["by_status"]}},
+            "by_domain": {row["_id"]: row["count"] for row in result["by_domain"]},
+            "total_consumers": totals["consumers"],
+            "avg_schema_fields": round(totals["schema_fields"] / totals["contracts"], 1) if totals["contracts"] else 0,
+            "with_billing": totals["with_billing"]
+        }
     
-    return stats
+    # Every contract create/update/delete/consumer handler bumps data_contracts, which retires this entry
+    return await cached_stats("contracts", ("data_contracts",), compute)
 
 @api_router.get("/quality/metrics", response_model=List[QualityMetric])
-async def get_quality_metrics(current_user: User = Depends(get_current_user)):
+async def get_quality_metrics(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get quality metrics for all data products"""
-    metrics = await db.quality_metrics.find({}, {"_id": 0}).to_list(100)
-    for metric in metrics:
-        if isinstance(metric.get('measured_at'), str):
-            metric['measured_at'] = datetime.fromisoformat(metric['measured_at'])
-    return metrics
+    metrics = await paginate(response, db.quality_metrics, {}, "data_product_id", page, model=QualityMetric)
+    return trusted_json(metrics, response, QualityMetric)
 
 @api_router.post("/quality/metrics", response_model=QualityMetric)
 async def create_quality_metric(metric_data: QualityMetric, current_user: User = Depends(get_current_user)):
     """Record a new quality metric"""
     doc = metric_data.model_dump()
-    doc['measured_at'] = doc['measured_at'].isoformat()
     await db.quality_metrics.insert_one(doc)
+    await mark_changed("quality_metrics")
     return metric_data
 
 @api_router.get("/lineage", response_model=List[DataLineage])
-async def get_data_lineage(current_user: User = Depends(get_current_user)):
+async def get_data_lineage(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get data lineage information"""
-    lineages = await db.data_lineages.find({}, {"_id": 0}).to_list(100)
-    return lineages
+    lineages = await paginate(response, db.data_lineages, {}, "id", page, model=DataLineage)
+    return trusted_json(lineages, response, DataLineage)
 
 @api_router.post("/lineage", response_model=DataLineage)
 async def create_data_lineage(lineage_data: DataLineage, current_user: User = Depends(get_current_user)):
     """Create a data lineage relationship"""
     doc = lineage_data.model_dump()
     await db.data_lineages.insert_one(doc)
+    await mark_changed("data_lineages")
     return lineage_data
 
+# ============================================
+# CONTRACT HISTORY - Append-only versions and schema compatibility
+# ============================================
+
+# Registrations and bookkeeping change without changing the contract itself
+CONTRACT_HISTORY_EXCLUDED = {"_id", "consumers", "updated_at", "revision"}
+
+# Canonical spellings, so "int" -> "integer" is not reported as a type change
+DATA_TYPE_ALIASES = {
+    "int": "integer", "int32": "integer", "bigint": "long", "int64": "long",
+    "number": "double", "float64": "double", "float32": "float", "numeric": "decimal",
+    "bool": "boolean", "str": "string", "text": "string", "varchar": "string",
+    "datetime": "timestamp", "timestamp_tz": "timestamp"
+}
+
+# (old, new) pairs every reader of the old type can still read
+DATA_TYPE_WIDENINGS = {
+    ("integer", "long"), ("integer", "float"), ("integer", "double"), ("integer", "decimal"),
+    ("long", "double"), ("long", "decimal"), ("float", "double"), ("date", "timestamp")
+}
+
+# Attributes that only describe a field; changing them never breaks a consumer
+SCHEMA_METADATA_ATTRIBUTES = ("description", "business_term", "example", "tags", "classification", "sensitive", "is_pii")
+
+def normalized_type(data_type: Optional[str]) -> str:
+    name = (data_type or "").strip().lower()
+    return DATA_TYPE_ALIASES.get(name, name)
+
+def schema_change(field: str, change: str, breaking: bool, detail: str) -> dict:
+    return {"field": field, "change": change, "breaking": breaking, "detail": detail}
+
+def diff_field(name: str, old: dict, new: dict) -> List[dict]:
+    """Classify the differences between two versions of one schema field"""
+    changes = []
+    old_type, new_type = normalized_type(old.get("data_type")), normalized_type(new.get("data_type"))
+    if old_type != new_type:
+        if (old_type, new_type) in DATA_TYPE_WIDENINGS:
+            changes.append(schema_change(name, "type_widened", False, f"{old_type} -> {new_type}"))
+        else:
+            changes.append(schema_change(name, "type_changed", True, f"{old_type} -> {new_type}"))
+    
+    old_nullable, new_nullable = old.get("nullable", False), new.get("nullable", False)
+    if old_nullable and not new_nullable:
+        changes.append(schema_change(name, "nullable_to_required", True, "nulls are no longer allowed"))
+    elif new_nullable and not old_nullable:
+        changes.append(schema_change(name, "required_to_nullable", False, "nulls are now allowed"))
+    old_required, new_required = old.get("required", True), new.get("required", True)
+    if new_required and not old_required:
+        changes.append(schema_change(name, "optional_to_required", True, "the field must now be present"))
+    elif old_required and not new_required:
+        changes.append(schema_change(name, "required_to_optional", False, "the field may now be absent"))
+    if new.get("unique") and not old.get("unique"):
+        changes.append(schema_change(name, "unique_added", True, "values must now be unique"))
+    
+    if old.get("format") != new.get("format"):
+        if new.get("format") is None:
+            # Dropping a format accepts everything the old one did
+            changes.append(schema_change(name, "format_removed", False, f"{old.get('format')} no longer enforced"))
+        else:
+            changes.append(schema_change(name, "format_changed", True, f"{old.get('format')} -> {new.get('format')}"))
+    old_constraints, new_constraints = set(old.get("constraints") or []), set(new.get("constraints") or [])
+    if new_constraints - old_constraints:
+        changes.append(schema_change(name, "constraints_added", True, ", ".join(sorted(new_constraints - old_constraints))))
+    if old_constraints - new_constraints:
+        changes.append(schema_change(name, "constraints_removed", False, ", ".join(sorted(old_constraints - new_constraints))))
+    
+    metadata = [attribute for attribute in SCHEMA_METADATA_ATTRIBUTES if old.get(attribute) != new.get(attribute)]
+    if metadata:
+        changes.append(schema_change(name, "metadata_changed", False, ", ".join(metadata)))
+    return changes
+
+def diff_schema_fields(old_fields: List[dict], new_fields: List[dict]) -> List[dict]:
+    """Field-by-field compatibility report between two schemas, matched by field name in one pass each"""
+    old_by_name = {field["name"]: field for field in old_fields}
+    new_by_name = {field["name"]: field for field in new_fields}
+    changes = []
+    for name, old in old_by_name.items():
+        new = new_by_name.get(name)
+        if new is None:
+            changes.append(schema_change(name, "field_removed", True, f"{old.get('data_type')} field removed"))
+        elif new != old:
+            changes.extend(diff_field(name, old, new))
+    for name, new in new_by_name.items():
+        if name not in old_by_name:
+            changes.append(schema_change(name, "field_added", False, f"{new.get('data_type')} field added"))
+    return changes
+
+def contract_content(contract: dict) -> dict:
+    return {key: value for key, value in contract.items() if key not in CONTRACT_HISTORY_EXCLUDED}
+
+def contract_delta(old: dict, new: dict) -> dict:
+    """Top-level changes between two contract versions; schema_fields is diffed per field so one edit stays small"""
+    delta = {"set": {}, "unset": []}
+    for key, value in new.items():
+        if key != "schema_fields" and old.get(key) != value:
+            delta["set"][key] = value
+    delta["unset"] = [key for key in old if key not in new]
+    
+    old_fields = {field["name"]: field for field in old.get("schema_fields", [])}
+    new_fields = new.get("schema_fields", [])
+    upserts = {field["name"]: field for field in new_fields if old_fields.get(field["name"]) != field}
+    names = [field["name"] for field in new_fields]
+    if upserts or names != list(old_fields):
+        delta["schema_fields"] = {"upsert": upserts}
+        # Order is only stored when the field list itself changed, not for in-place edits
+        if names != list(old_fields):
+            delta["schema_fields"]["order"] = names
+    return delta
+
+def apply_contract_delta(content: dict, delta: dict) -> dict:
+    content = {**content, **delta["set"]}
+    for key in delta["unset"]:
+        content.pop(key, None)
+    fields = delta.get("schema_fields")
+    if fields is not None:
+        by_name = {field["name"]: field for field in content.get("schema_fields", [])}
+        by_name.update(fields["upsert"])
+        order = fields.get("order") or [name for name in by_name]
+        content["schema_fields"] = [by_name[name] for name in order]
+    return content
+
+async def record_contract_version(previous: Optional[dict], contract: dict, current_user: User):
+    """Append the new version to the contract's history as a delta, or a snapshot at chain boundaries"""
+    content = contract_content(contract)
+    latest = await db.data_contract_versions.find_one(
+        {"contract_id": contract["id"]}, {"_id": 0, "revision": 1, "chain": 1}, sort=[("revision", DESCENDING)]
+    )
+    entries = []
+    if latest is None and previous is not None:
+        # Contracts written before history existed start their chain from the before-image
+        entries.append(contract_version_entry(previous, contract_content(previous), None, 0, None))
+        latest = {"chain": 0, "revision": previous.get("revision") or 0}
+    
+    # A delta is only replayable on top of the version it was taken against; after unrecorded revisions
+    # (consumer registrations) or a missed write, start a new chain instead
+    contiguous = latest is not None and previous is not None and latest["revision"] == (previous.get("revision") or 0)
+    chain = latest["chain"] + 1 if contiguous and latest["chain"] + 1 < CONTRACT_HISTORY_SNAPSHOT_INTERVAL else 0
+    changes = diff_schema_fields(previous.get("schema_fields", []), contract.get("schema_fields", [])) if previous else []
+    delta = contract_delta(contract_content(previous), content) if previous and chain else None
+    entries.append(contract_version_entry(contract, content, delta, chain, current_user.email, changes))
+    
+    try:
+        await db.data_contract_versions.insert_many(entries, ordered=False)
+    except BulkWriteError as e:
+        # A concurrent writer already recorded the same base version
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+    await mark_changed("data_contract_versions")
+    
+    breaking = [change for change in changes if change["breaking"]]
+    if breaking:
+        policy = (contract.get("terms") or {}).get("breaking_change_policy") or "no policy recorded"
+        await log_event("contract_breaking_change", "governance", contract["id"],
+                        f"Data contract v{contract.get('version')} has {len(breaking)} breaking schema change(s) "
+                        f"({', '.join(sorted({change['field'] for change in breaking}))}); policy: {policy}",
+                        ["notify_consumers", "review_changes"])
+
+def contract_version_entry(contract: dict, content: dict, delta: Optional[dict], chain: int,
+                           author: Optional[str], changes: Optional[List[dict]] = None) -> dict:
+    entry = {
+        "id": str(uuid.uuid4()),
+        "contract_id": contract["id"],
+        "revision": contract.get("revision") or 0,
+        "version": contract.get("version"),
+        "status": contract.get("status"),
+        "recorded_at": datetime.now(timezone.utc),
+        "author": author,
+        "chain": chain,
+        "changes": changes or [],
+        "breaking": any(change["breaking"] for change in changes or [])
+    }
+    if delta is None:
+        entry["snapshot"] = content
+    else:
+        entry["delta"] = delta
+    return entry
+
+async def contract_at_revision(contract_id: str, revision: int) -> dict:
+    """Rebuild a contract version from the nearest snapshot at or before it and the deltas after
+    
+    Revisions that only registered consumers have no entry of their own; they resolve to the nearest recorded
+    revision below them, whose content they share.
+    """
+    base = await db.data_contract_versions.find_one(
+        {"contract_id": contract_id, "revision": {"$lte": revision}, "snapshot": {"$exists": True}},
+        {"_id": 0}, sort=[("revision", DESCENDING)]
+    )
+    if base is None:
+        raise HTTPException(status_code=404, detail=f"Revision {revision} is not in this contract's history")
+    content, recorded = base["snapshot"], base["revision"]
+    async for entry in db.data_contract_versions.find(
+        {"contract_id": contract_id, "revision": {"$gt": base["revision"], "$lte": revision}},
+        {"_id": 0, "revision": 1, "delta": 1, "snapshot": 1}, sort=[("revision", ASCENDING)]
+    ):
+        content = entry["snapshot"] if "snapshot" in entry else apply_contract_delta(content, entry["delta"])
+        recorded = entry["revision"]
+    if recorded != revision:
+        current = await db.data_contracts.find_one({"id": contract_id}, {"_id": 0, "revision": 1})
+        newest = (current.get("revision") or 0) if current else recorded
+        if revision > newest:
+            raise HTTPException(status_code=404, detail=f"Revision {revision} is not in this contract's history")
+    return {**content, "revision": revision, "recorded_revision": recorded}
+
+@api_router.get("/contracts/{contract_id}/versions")
+async def get_contract_versions(contract_id: str, limit: int = Query(50, ge=1, le=500), current_user: User = Depends(get_current_user)):
+    """List a contract's recorded versions, newest first, with the schema changes each one made"""
+    versions = await db.data_contract_versions.find(
+        {"contract_id": contract_id}, {"_id": 0, "snapshot": 0, "delta": 0, "chain": 0}
+    ).sort("revision", DESCENDING).limit(limit).to_list(limit)
+    return trusted_json(versions)
+
+@api_router.get("/contracts/{contract_id}/versions/{revision}")
+async def get_contract_version(contract_id: str, revision: int, current_user: User = Depends(get_current_user)):
+    """The contract as it was at a given revision"""
+    return trusted_json(await contract_at_revision(contract_id, revision))
+
+@api_router.get("/contracts/{contract_id}/diff")
+async def diff_contract_versions(contract_id: str, from_revision: int = Query(..., alias="from"),
+                                 to_revision: Optional[int] = Query(None, alias="to"),
+                                 current_user: User = Depends(get_current_user)):
+    """Compatibility report between two revisions; `to` defaults to the current contract"""
+    old = await contract_at_revision(contract_id, from_revision)
+    if to_revision is None:
+        current = await db.data_contracts.find_one({"id": contract_id}, {"_id": 0})
+        if current is None:
+            raise HTTPException(status_code=404, detail="Contract not found")
+        new = {**contract_content(current), "revision": current.get("revision") or 0}
+    else:
+        new = await contract_at_revision(contract_id, to_revision)
+    
+    changes = diff_schema_fields(old.get("schema_fields", []), new.get("schema_fields", []))
+    changed = sorted(key for key in (old.keys() | new.keys()) - {"schema_fields", "revision", "recorded_revision"}
+                     if old.get(key) != new.get(key))
+    return {
+        "contract_id": contract_id,
+        "from": {"revision": old["revision"], "version": old.get("version")},
+        "to": {"revision": new["revision"], "version": new.get("version")},
+        "breaking": any(change["breaking"] for change in changes),
+        "schema_changes": changes,
+        "changed_sections": changed
+    }
+
 # ============================================
 # SELF-SERVE PLATFORM PRINCIPLE - Platform APIs
 # ============================================
 
 @api_router.get("/platform/capabilities", response_model=List[PlatformCapability])
-async def get_platform_capabilities(current_user: User = Depends(get_current_user)):
+async def get_platform_capabilities(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get all platform capabilities available to domain teams"""
-    capabilities = await db.platform_capabilities.find({}, {"_id": 0}).to_list(100)
-    return capabilities
+    capabilities = await paginate(response, db.platform_capabilities, {}, "name", page, model=PlatformCapability)
+    return trusted_json(capabilities, response, PlatformCapability)
 
 @api_router.get("/platform/stats")
 async def get_platform_stats(current_user: User = Depends(get_current_user)):
     """Get platform usage statistics"""
-    total_products = await db.data_catalog.count_documents({})
-    total_contracts = await db.data_contracts.count_documents({})
-    total_capabilities = await db.platform_capabilities.count_documents({})
-    active_capabilities = await db.platform_capabilities.count_documents({"status": "active"})
-    
-    # Domain stats
-    port_products = await db.data_catalog.count_documents({"domain": "port"})
-    fleet_products = await db.data_catalog.count_documents({"domain": "fleet"})
-    epc_products = await db.data_catalog.count_documents({"domain": "epc"})
-    logistics_products = await db.data_catalog.count_documents({"domain": "logistics"})
-    
-    return {
-        "total_data_products": total_products,
-        "total_contracts": total_contracts,
-        "total_capabilities": total_capabilities,
-        "active_capabilities": active_capabilities,
-        "products_by_domain": {
-            "port": port_products,
-            "fleet": fleet_products,
-            "epc": epc_products,
-            "logistics": logistics_products
+    async def compute():
+        (total_products, products), (total_capabilities, capabilities), total_contracts = await asyncio.gather(
+            facet_counts(db.data_catalog, ["domain"]),
+            facet_counts(db.platform_capabilities, ["status"]),
+            db.data_contracts.count_documents({})
+        )
+        return {
+            "total_data_products": total_products,
+            "total_contracts": total_contracts,
+            "total_capabilities": total_capabilities,
+            "active_capabilities": capabilities["status"].get("active", 0),
+            "products_by_domain": products["domain"]
         }
-    }
+    
+    return await cached_stats("platform", ("data_catalog", "platform_capabilities", "data_contracts"), compute)
 
 # ============================================
 # FEDERATED GOVERNANCE PRINCIPLE - Enhanced Governance APIs
 # ============================================
 
 @api_router.get("/governance/compliance", response_model=List[ComplianceRule])
-async def get_compliance_rules(current_user: User = Depends(get_current_user)):
+async def get_compliance_rules(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get all compliance rules"""
-    rules = await db.compliance_rules.find({}, {"_id": 0}).to_list(100)
-    return rules
+    rules = await paginate(response, db.compliance_rules, {}, "rule_name", page, model=ComplianceRule)
+    return trusted_json(rules, response, ComplianceRule)
 
 @api_router.post("/governance/compliance", response_model=ComplianceRule)
 async def create_compliance_rule(rule_data: ComplianceRule, current_user: User = Depends(get_current_user)):
@@ -1361,6 +4272,7 @@ async def create_compliance_rule(rule_data: ComplianceRule, current_user: User =
     
     doc = rule_data.model_dump()
     await db.compliance_rules.insert_one(doc)
+    await mark_changed("compliance_rules")
     
     await log_event("compliance_rule_created", "governance", rule_data.id,
                     f"Compliance rule '{rule_data.rule_name}' created for standard {rule_data.standard}",
@@ -1369,10 +4281,10 @@ async def create_compliance_rule(rule_data: ComplianceRule, current_user: User =
     return rule_data
 
 @api_router.get("/governance/standards", response_model=List[InteroperabilityStandard])
-async def get_interoperability_standards(current_user: User = Depends(get_current_user)):
+async def get_interoperability_standards(response: Response, page: PageParams = Depends(), current_user: User = Depends(get_current_user)):
     """Get all interoperability standards"""
-    standards = await db.interop_standards.find({}, {"_id": 0}).to_list(100)
-    return standards
+    standards = await paginate(response, db.interop_standards, {}, "name", page, model=InteroperabilityStandard)
+    return trusted_json(standards, response, InteroperabilityStandard)
 
 @api_router.post("/governance/standards", response_model=InteroperabilityStandard)
 async def create_interoperability_standard(standard_data: InteroperabilityStandard, current_user: User = Depends(get_current_user)):
@@ -1382,42 +4294,735 @@ async def create_interoperability_standard(standard_data: InteroperabilityStanda
     
     doc = standard_data.model_dump()
     await db.interop_standards.insert_one(doc)
+    await mark_changed("interop_standards")
     return standard_data
 
 @api_router.get("/governance/dashboard")
 async def get_governance_dashboard(current_user: User = Depends(get_current_user)):
     """Get comprehensive governance dashboard stats"""
-    mappings_count = await db.semantic_mappings.count_documents({})
-    policies_count = await db.access_policies.count_documents({})
-    compliance_count = await db.compliance_rules.count_documents({})
-    standards_count = await db.interop_standards.count_documents({})
+    async def compute():
+        mappings_count, policies_count, (compliance_count, rules), standards_count = await asyncio.gather(
+            db.semantic_mappings.count_documents({}),
+            db.access_policies.count_documents({}),
+            facet_counts(db.compliance_rules, ["status"]),
+            db.interop_standards.count_documents({})
+        )
+        return {
+            "semantic_mappings": mappings_count,
+            "access_policies": policies_count,
+            "compliance_rules": compliance_count,
+            "active_compliance_rules": rules["status"].get("active", 0),
+            "interoperability_standards": standards_count
+        }
     
-    active_rules = await db.compliance_rules.count_documents({"status": "active"})
+    return await cached_stats(
+        "governance", ("semantic_mappings", "access_policies", "compliance_rules", "interop_standards"), compute
+    )
+
+# ============================================
+# BULK LOADS - Upsert batches of domain records by business key
+# ============================================
+
+class BulkResource:
+    """How one domain collection is bulk-loaded: model, business key, who may write and what each record logs"""
+    def __init__(self, collection_name: str, model, key: str, owner_domain: Optional[str], event_type: str,
+                 update_event_type: str, event_domain: str, actions: List[str], describe: Callable[[dict], str],
+                 describe_update: Optional[Callable[[dict], str]] = None):
+        self.collection_name = collection_name
+        self.model = TypeAdapter(model)
+        self.key = key
+        self.owner_domain = owner_domain
+        self.event_type = event_type
+        self.update_event_type = update_event_type
+        self.event_domain = event_domain
+        self.actions = actions
+        self.describe = describe
+        self.describe_update = describe_update or describe
+        # Fields the dashboard counters look at, read as before-images of updated records
+        self.counter_fields = {field for counter_collection, query in DASHBOARD_COUNTERS.values()
+                               if counter_collection == collection_name for field in query}
+
+BULK_RESOURCES = {
+    "vessels": BulkResource(
+        "port_vessels", VesselData, "vessel_id", "port", "vessel_update", "vessel_updated", "port", ["notify_fleet"],
+        lambda doc: f"Vessel {doc['vessel_name']} status: {doc['status']}"
+    ),
+    "shipments": BulkResource(
+        "fleet_shipments", ShipmentData, "shipment_id", "fleet", "shipment_update", "shipment_updated", "fleet",
+        ["notify_site", "check_readiness"],
+        lambda doc: f"Shipment {doc['shipment_id']} status: {doc['status']}"
+    ),
+    "sites": BulkResource(
+        "epc_sites", SiteData, "site_id", "epc", "site_update", "site_updated", "epc", ["notify_fleet", "enable_shipping"],
+        lambda doc: f"Site {doc['site_name']} readiness: {doc['readiness_status']}"
+    ),
+    "routes": BulkResource(
+        "logistics_routes", Route, "route_name", "logistics", "route_created", "route_updated", "logistics",
+        ["notify_fleet", "update_permits"],
+        lambda doc: f"Route {doc['route_name']} created: {doc['origin']} to {doc['destination']}",
+        lambda doc: f"Route {doc['route_name']} updated: {doc['origin']} to {doc['destination']}"
+    ),
+    # Like create_permit, any authenticated user may request permits
+    "permits": BulkResource(
+        "logistics_permits", Permit, "permit_number", None, "permit_requested", "permit_updated", "logistics",
+        ["notify_authority", "track_status"],
+        lambda doc: f"Permit {doc['permit_number']} requested for shipment {doc['shipment_id']}",
+        lambda doc: f"Permit {doc['permit_number']} for shipment {doc['shipment_id']} updated, status {doc['status']}"
+    )
+}
+
+async def bulk_upsert(resource: BulkResource, items: List[Any], current_user: User) -> dict:
+    """Validate every item, upsert the valid ones in one unordered bulk_write, and report per-item results"""
+    if resource.owner_domain and current_user.domain != resource.owner_domain and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    
+    results: List[dict] = [{"index": index} for index in range(len(items))]
+    operations, written, seen = [], [], {}
+    for index, item in enumerate(items):
+        try:
+            doc = resource.model.validate_python(item).model_dump()
+        except ValidationError as e:
+            results[index].update(status="error", error=validation_message(e))
+            continue
+        key = doc[resource.key]
+        results[index][resource.key] = key
+        if key in seen:
+            results[index].update(status="error", error=f"Duplicate {resource.key} in batch (item {seen[key]})")
+            continue
+        seen[key] = index
+        # An existing record keeps its id; everything else is replaced by the incoming values
+        new_id = doc.pop("id")
+        update = {"$set": doc, "$setOnInsert": {"id": new_id}}
+        if doc.pop("revision", None) is not None:
+            update["$inc"] = {"revision": 1}
+        operations.append(UpdateOne({resource.key: key}, update, upsert=True))
+        written.append((index, doc))
+    
+    collection = db[resource.collection_name]
+    before = {}
+    if operations:
+        projection = {"_id": 0, resource.key: 1, **{field: 1 for field in resource.counter_fields}}
+        async for row in collection.find({resource.key: {"$in": list(seen)}}, projection):
+            before[row[resource.key]] = row
+    
+    upserted, failed = set(), {}
+    if operations:
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            upserted = set(result.upserted_ids)
+        except BulkWriteError as e:
+            upserted = {entry["index"] for entry in e.details.get("upserted", [])}
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") == 11000:
+                    # Two upserts of a new key raced; the unique index let the other one insert it
+                    key = written[error["index"]][1][resource.key]
+                    failed[error["index"]] = f"Duplicate {resource.key} {key}: written concurrently, retry the item"
+                else:
+                    failed[error["index"]] = error.get("errmsg", "write failed")
+    
+    ids = {}
+    if len(failed) < len(written):
+        keys = [doc[resource.key] for position, (_, doc) in enumerate(written) if position not in failed]
+        async for row in collection.find({resource.key: {"$in": keys}}, {"_id": 0, resource.key: 1, "id": 1}):
+            ids[row[resource.key]] = row["id"]
+    
+    events, changes = [], []
+    for position, (index, doc) in enumerate(written):
+        if position in failed:
+            results[index].update(status="error", error=failed[position])
+            continue
+        record_id = ids.get(doc[resource.key])
+        if position in upserted:
+            results[index].update(status="created", id=record_id)
+            changes.append((None, doc))
+            event_type, description = resource.event_type, resource.describe(doc)
+        else:
+            results[index].update(status="updated", id=record_id)
+            changes.append((before.get(doc[resource.key]), doc))
+            event_type, description = resource.update_event_type, resource.describe_update(doc)
+        events.append(EventLog(event_type=event_type, domain=resource.event_domain, resource_id=record_id,
+                               description=description, triggered_actions=resource.actions))
+    
+    if events:
+        await mark_changed(resource.collection_name)
+        await update_dashboard_counters(resource.collection_name, changes=changes)
+        await log_events(events)
+    
+    summary = {"created": 0, "updated": 0, "error": 0}
+    for item in results:
+        summary[item["status"]] += 1
+    return {**summary, "results": results}
+
+@api_router.post("/port/vessels/bulk")
+async def bulk_upsert_vessels(items: List[Any], current_user: User = Depends(get_current_user)):
+    """Create or update vessels by vessel_id"""
+    return await bulk_upsert(BULK_RESOURCES["vessels"], items, current_user)
+
+@api_router.post("/fleet/shipments/bulk")
+async def bulk_upsert_shipments(items: List[Any], current_user: User = Depends(get_current_user)):
+    """Create or update shipments by shipment_id"""
+    return await bulk_upsert(BULK_RESOURCES["shipments"], items, current_user)
+
+@api_router.post("/epc/sites/bulk")
+async def bulk_upsert_sites(items: List[Any], current_user: User = Depends(get_current_user)):
+    """Create or update sites by site_id"""
+    return await bulk_upsert(BULK_RESOURCES["sites"], items, current_user)
+
+@api_router.post("/logistics/routes/bulk")
+async def bulk_upsert_routes(items: List[Any], current_user: User = Depends(get_current_user)):
+    """Create or update routes by route_name"""
+    return await bulk_upsert(BULK_RESOURCES["routes"], items, current_user)
+
+@api_router.post("/logistics/permits/bulk")
+async def bulk_upsert_permits(items: List[Any], current_user: User = Depends(get_current_user)):
+    """Create or update permits by permit_number"""
+    return await bulk_upsert(BULK_RESOURCES["permits"], items, current_user)
+
+# ============================================
+# EXPORT - Streaming NDJSON for bulk analytics pulls
+# ============================================
+
+EXPORT_COLLECTIONS = {"port_vessels", "fleet_shipments", "epc_sites", "event_logs"}
+
+async def ndjson_rows(cursor, flush_rows: int):
+    """Serialize a Motor cursor as NDJSON, yielding one chunk per batch so memory stays flat"""
+    lines = []
+    async for doc in cursor:
+        lines.append(json.dumps(doc, default=json_default, separators=(",", ":")))
+        if len(lines) >= flush_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+@api_router.get("/export/{collection_name}")
+async def export_collection(
+    collection_name: str,
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000, description="Documents fetched per cursor batch"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every document of a domain collection as newline-delimited JSON"""
+    if collection_name not in EXPORT_COLLECTIONS:
+        raise HTTPException(status_code=404, detail=f"Collection {collection_name} is not exportable")
+    
+    cursor = db[collection_name].find({}, {"_id": 0}).batch_size(batch_size)
+    return StreamingResponse(
+        ndjson_rows(cursor, batch_size),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="{collection_name}.ndjson"',
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+class ChunkBuffer(io.RawIOBase):
+    """Write-only sink for tarfile's stream mode; drain() hands over what was written since the last call"""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def contract_archive_name(contract: dict) -> str:
+    name = (contract.get("contract_name") or contract.get("data_product_id") or "contract").lower()
+    slug = "".join(ch if ch.isalnum() else "-" for ch in name).strip("-") or "contract"
+    return f"{slug}-{contract['id']}.yaml"
+
+async def contract_yaml_archive(cursor):
+    """Stream contracts as a tar.gz of YAML files, one member per contract, flushing after each"""
+    buffer = ChunkBuffer()
+    archive = tarfile.open(fileobj=buffer, mode="w|gz")
+    async for contract in cursor:
+        content = (await render_contract_yaml(contract)).encode()
+        member = tarfile.TarInfo(contract_archive_name(contract))
+        member.size = len(content)
+        stamp = contract.get("updated_at") or contract.get("created_at")
+        member.mtime = int(as_utc(stamp).timestamp()) if isinstance(stamp, datetime) else int(time.time())
+        archive.addfile(member, io.BytesIO(content))
+        chunk = buffer.drain()
+        if chunk:
+            yield chunk
+    archive.close()
+    yield buffer.drain()
+
+@api_router.get("/export/contracts/yaml")
+async def export_contracts_yaml(
+    status: str = Query("active", description="Contract status to export, or 'all'"),
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000, description="Documents fetched per cursor batch"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every contract with the given status as a tar.gz of Data Contract Specification YAML files"""
+    query = {} if status == "all" else {"status": status}
+    cursor = db.data_contracts.find(query, {"_id": 0}).sort("contract_name", ASCENDING).batch_size(batch_size)
+    return StreamingResponse(
+        contract_yaml_archive(cursor),
+        media_type="application/gzip",
+        headers={
+            "Content-Disposition": f'attachment; filename="data-contracts-{status}.tar.gz"',
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+# ============================================
+# INDEXES - Declarative registry, bootstrap and drift checks
+# ============================================
+
+def unique_id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], unique=True)
+
+def business_key_index(key: str) -> IndexModel:
+    """Unique natural key that bulk loads upsert by"""
+    return IndexModel([(key, ASCENDING)], unique=True)
+
+def page_index(sort_key: str, direction: int = ASCENDING) -> IndexModel:
+    """Index backing keyset pagination on (sort key, id)"""
+    return IndexModel([(sort_key, direction), ("id", direction)])
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        unique_id_index()
+    ],
+    "port_vessels": [unique_id_index(), business_key_index("vessel_id"), page_index("vessel_id"), IndexModel([("status", ASCENDING)])],
+    "fleet_shipments": [unique_id_index(), business_key_index("shipment_id"), page_index("shipment_id"), IndexModel([("status", ASCENDING)])],
+    "epc_sites": [unique_id_index(), business_key_index("site_id"), page_index("site_id"), IndexModel([("readiness_status", ASCENDING)])],
+    "data_catalog": [unique_id_index(), page_index("name"), IndexModel([("domain", ASCENDING)])],
+    "data_product_canvases": [
+        unique_id_index(),
+        page_index("name"),
+        IndexModel([("domain", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("domain", ASCENDING), ("name", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("classification", ASCENDING)])
+    ],
+    "semantic_mappings": [unique_id_index()],
+    "access_policies": [unique_id_index()],
+    "event_logs": [
+        unique_id_index(),
+        page_index("timestamp", DESCENDING),
+        IndexModel([("domain", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("resource_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("event_type", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)])
+    ],
+    "logistics_routes": [unique_id_index(), business_key_index("route_name"), page_index("route_name")],
+    "logistics_permits": [unique_id_index(), business_key_index("permit_number"), page_index("permit_number"), IndexModel([("status", ASCENDING)])],
+    "weather_forecasts": [unique_id_index(), page_index("forecast_date")],
+    "assembly_areas": [unique_id_index(), page_index("area_name")],
+    "domain_journeys": [unique_id_index(), page_index("domain_name")],
+    "data_contracts": [unique_id_index(), page_index("contract_name"), IndexModel([("status", ASCENDING)])],
+    "quality_metrics": [unique_id_index(), page_index("data_product_id")],
+    "data_lineages": [unique_id_index()],
+    "platform_capabilities": [unique_id_index(), page_index("name"), IndexModel([("status", ASCENDING)])],
+    "compliance_rules": [unique_id_index(), page_index("rule_name"), IndexModel([("status", ASCENDING)])],
+    "interop_standards": [unique_id_index(), page_index("name")],
+    "action_dead_letters": [unique_id_index(), page_index("failed_at", DESCENDING)],
+    # Same name and keys as the index MongoDB 6.3+ creates for a time-series metaField/timeField pair
+    "vessel_positions": [IndexModel([("vessel_id", ASCENDING), ("timestamp", ASCENDING)])],
+    "stream_events": [unique_id_index(), IndexModel([("topic", ASCENDING), ("received_at", DESCENDING)])],
+    "data_contract_versions": [
+        unique_id_index(),
+        IndexModel([("contract_id", ASCENDING), ("revision", DESCENDING)], unique=True)
+    ],
+    "idempotency_keys": [IndexModel([("created_at", ASCENDING)], expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS)]
+}
+
+# (collection, filter, sort) for the queries the API runs on every request or poll
+HOT_QUERIES = [
+    ("users", {"email": "probe@example.com"}, None),
+    ("port_vessels", {"status": "berthed"}, None),
+    ("fleet_shipments", {"status": "in_transit"}, None),
+    ("epc_sites", {"readiness_status": "ready"}, None),
+    ("logistics_permits", {"id": "probe"}, None),
+    ("logistics_permits", {"status": "pending"}, None),
+    ("data_product_canvases", {"id": "probe"}, None),
+    ("data_product_canvases", {"domain": "port"}, [("name", ASCENDING), ("id", ASCENDING)]),
+    ("data_contracts", {"id": "probe"}, None),
+    ("domain_journeys", {"domain_name": "port"}, None),
+    ("event_logs", {}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("event_logs", {"domain": "port"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("event_logs", {"resource_id": "probe"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("event_logs", {"event_type": "probe"}, [("timestamp", DESCENDING), ("id", DESCENDING)])
+]
+
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+def index_signature(spec: dict) -> tuple:
+    """Comparable (keys, options) view of an index from either IndexModel.document or index_information()"""
+    keys = tuple((field, int(direction) if isinstance(direction, (int, float)) else direction)
+                 for field, direction in (spec["key"].items() if isinstance(spec["key"], dict) else spec["key"]))
+    options = tuple((option, spec[option]) for option in INDEX_OPTIONS if spec.get(option))
+    return keys, options
+
+async def index_drift(collection_name: str) -> dict:
+    """Compare a collection's indexes with the registry"""
+    existing = await db[collection_name].index_information()
+    missing, conflicting = [], []
+    for model in INDEX_REGISTRY[collection_name]:
+        spec = model.document
+        current = existing.get(spec["name"])
+        if current is None:
+            missing.append(model)
+        elif index_signature(current) != index_signature(spec):
+            conflicting.append(spec["name"])
+    registered = {model.document["name"] for model in INDEX_REGISTRY[collection_name]}
+    unregistered = [name for name in existing if name != "_id_" and name not in registered]
+    return {"missing": missing, "conflicting": conflicting, "unregistered": unregistered}
+
+async def ensure_indexes() -> dict:
+    """Create every missing registered index (idempotent) and report drift"""
+    report = {}
+    for collection_name in INDEX_REGISTRY:
+        drift = await index_drift(collection_name)
+        created, failed = [], []
+        if drift["missing"]:
+            try:
+                created = await db[collection_name].create_indexes(drift["missing"])
+            except OperationFailure as e:
+                failed = [model.document["name"] for model in drift["missing"]]
+                logger.error(f"Could not create indexes {failed} on {collection_name}: {e}")
+        for name in drift["conflicting"]:
+            logger.warning(f"Index {collection_name}.{name} differs from the registry definition")
+        for name in drift["unregistered"]:
+            logger.warning(f"Index {collection_name}.{name} is not declared in the index registry")
+        report[collection_name] = {
+            "created": created,
+            "failed": failed,
+            "conflicting": drift["conflicting"],
+            "unregistered": drift["unregistered"]
+        }
+    return report
+
+def plan_stages(node):
+    """Yield every stage name in an explain() plan tree"""
+    if isinstance(node, dict):
+        if "stage" in node:
+            yield node["stage"]
+        for value in node.values():
+            yield from plan_stages(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from plan_stages(item)
+
+async def find_collection_scans() -> List[dict]:
+    """Explain every registered hot query and return those whose winning plan is a COLLSCAN"""
+    offenders = []
+    for collection_name, query, sort in HOT_QUERIES:
+        cursor = db[collection_name].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        if "COLLSCAN" in plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {})):
+            offenders.append({"collection": collection_name, "filter": query, "sort": sort})
+    return offenders
+
+async def check_hot_queries():
+    """Raise if any registered hot query falls back to a collection scan"""
+    offenders = await find_collection_scans()
+    if offenders:
+        raise RuntimeError(f"Hot queries fall back to COLLSCAN: {offenders}")
+
+@api_router.get("/system/indexes")
+async def get_index_report(current_user: User = Depends(get_current_user)):
+    """Report index drift against the registry and any hot query that scans its collection"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    drift = {}
+    for collection_name in INDEX_REGISTRY:
+        report = await index_drift(collection_name)
+        report["missing"] = [model.document["name"] for model in report["missing"]]
+        drift[collection_name] = report
+    return {"indexes": drift, "collection_scans": await find_collection_scans()}
+
+# ============================================
+# SYSTEM - Operational metrics
+# ============================================
+
+@api_router.get("/system/metrics")
+async def get_system_metrics(current_user: User = Depends(get_current_user)):
+    """Get runtime counters for the API's in-process caches and workers"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
     
     return {
-        "semantic_mappings": mappings_count,
-        "access_policies": policies_count,
-        "compliance_rules": compliance_count,
-        "active_compliance_rules": active_rules,
-        "interoperability_standards": standards_count
+        "principal_cache": principal_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "conditional_get": collection_versions.stats(),
+        "dashboard_reconciliation": dashboard_reconciliation,
+        "stats_cache": stats_cache.stats(),
+        "event_sink": event_sink.stats(),
+        "event_stream": event_broker.stats(),
+        "event_archive": event_archive.stats(),
+        "actions": action_dispatcher.stats(),
+        "vessel_positions": position_ingest_stats.stats(),
+        "idempotency": idempotency_stats.stats(),
+        "contract_yaml": {"dumper": YAML_DUMPER.__name__, "cache": contract_yaml_cache.stats()}
     }
 
+# ============================================
+# IDEMPOTENCY - Replay retried POSTs from an Idempotency-Key
+# ============================================
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# A pending claim older than this belongs to a request that died mid-flight and may be taken over
+IDEMPOTENCY_PENDING_LEASE_SECONDS = 60
+# Login and registration have their own retry semantics and carry no principal to scope a key to
+IDEMPOTENCY_EXCLUDED_PREFIXES = ("/api/auth/",)
+# Ingest endpoints read their bodies incrementally; buffering them for a fingerprint would undo that
+IDEMPOTENCY_STREAMED_PATHS = re.compile(r"^/api/(port/positions|streams/[^/]+/events)$")
+# Recomputed for every response, or owned by the middleware outside this one
+IDEMPOTENCY_SKIPPED_HEADERS = {"content-length", "date", "server"}
+
+# Completed responses by (principal, key); MongoDB holds the same records for other workers and restarts
+idempotent_responses = TTLCache(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS)
+
+class IdempotencyStats:
+    def __init__(self):
+        self.stored = 0
+        self.replayed = 0
+        self.in_progress = 0
+        self.mismatched = 0
+        self.not_stored = 0
+    
+    def stats(self) -> dict:
+        return {
+            "stored": self.stored,
+            "replayed": self.replayed,
+            "in_progress": self.in_progress,
+            "mismatched": self.mismatched,
+            "not_stored": self.not_stored,
+            "cache": idempotent_responses.stats()
+        }
+
+idempotency_stats = IdempotencyStats()
+
+async def idempotency_principal(headers: Headers) -> Optional[str]:
+    """The token's principal; keys are scoped per principal so clients cannot replay each other's responses.
+    
+    Resolved through authenticate_token, so the endpoint's own get_current_user is answered from the cache.
+    """
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return (await authenticate_token(token)).email
+    except HTTPException:
+        return None
+
+def replay_response(record: dict) -> Response:
+    response = Response(content=bytes(record["body"]), status_code=record["status_code"])
+    for name, value in record["headers"]:
+        response.headers.append(name, value)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+def idempotency_error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+async def resolve_idempotency_key(record_id: str, fingerprint: str) -> Optional[Response]:
+    """A response for a key that was already used, or None once this request has claimed the key"""
+    record = idempotent_responses.get(record_id)
+    if record is None:
+        now = datetime.now(timezone.utc)
+        try:
+            await db.idempotency_keys.insert_one({
+                "_id": record_id, "fingerprint": fingerprint, "state": "pending", "created_at": now
+            })
+            return None
+        except DuplicateKeyError:
+            record = await db.idempotency_keys.find_one({"_id": record_id})
+        if record is None:
+            # Expired between the insert and the read; the retry will claim it
+            return idempotency_error(409, "Idempotency-Key is being released, retry the request")
+        if record["state"] == "completed":
+            remaining = IDEMPOTENCY_TTL_SECONDS - (now - as_utc(record["created_at"])).total_seconds()
+            idempotent_responses.set(record_id, record, ttl=remaining)
+        elif record["fingerprint"] == fingerprint and (now - as_utc(record["created_at"])).total_seconds() > IDEMPOTENCY_PENDING_LEASE_SECONDS:
+            stale = await db.idempotency_keys.update_one(
+                {"_id": record_id, "state": "pending", "created_at": record["created_at"]}, {"$set": {"created_at": now}}
+            )
+            if stale.modified_count:
+                return None
+    
+    if record["fingerprint"] != fingerprint:
+        idempotency_stats.mismatched += 1
+        return idempotency_error(422, "Idempotency-Key was already used for a different request")
+    if record["state"] != "completed":
+        idempotency_stats.in_progress += 1
+        return idempotency_error(409, "A request with this Idempotency-Key is still in progress")
+    
+    idempotency_stats.replayed += 1
+    return replay_response(record)
+
+class IdempotentPosts:
+    """Run a keyed POST once per principal; repeats get the stored response before routing or validation.
+    
+    Plain ASGI rather than @app.middleware: every other request, SSE streams and streamed exports included,
+    passes through untouched, and a keyed response is forwarded chunk by chunk while it is recorded.
+    """
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        path = scope["path"]
+        if key is None or path.startswith(IDEMPOTENCY_EXCLUDED_PREFIXES) or IDEMPOTENCY_STREAMED_PATHS.match(path):
+            return await self.app(scope, receive, send)
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            response = idempotency_error(400, f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+            return await response(scope, receive, send)
+        principal = await idempotency_principal(headers)
+        if principal is None:
+            # Unauthenticated requests are rejected by the endpoint; there is nothing to scope the key to
+            return await self.app(scope, receive, send)
+        
+        # The JSON endpoints behind this read the whole body anyway; it is hashed once and handed on as is
+        messages, digest = [], hashlib.sha256(b"\n".join([path.encode(), scope.get("query_string", b""), b""]))
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            digest.update(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        record_id = f"{principal}:{key}"
+        replay = await resolve_idempotency_key(record_id, digest.hexdigest())
+        if replay is not None:
+            return await replay(scope, receive, send)
+        
+        async def replay_body():
+            return messages.pop(0) if messages else await receive()
+        
+        started, chunks, size = {}, [], 0
+        async def record(message):
+            nonlocal size
+            if message["type"] == "http.response.start":
+                started.update(message)
+            elif message["type"] == "http.response.body" and size <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+            await send(message)
+        
+        try:
+            await self.app(scope, replay_body, record)
+        except BaseException:
+            await db.idempotency_keys.delete_one({"_id": record_id, "state": "pending"})
+            raise
+        await self.store(record_id, digest.hexdigest(), started, chunks, size)
+    
+    async def store(self, record_id: str, fingerprint: str, started: dict, chunks: List[bytes], size: int):
+        # Only successes are kept: a failed request may be retried with the same key and should run again
+        status_code = started.get("status", 500)
+        if 200 <= status_code < 300 and size <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+            record = {
+                "_id": record_id, "fingerprint": fingerprint, "state": "completed",
+                "status_code": status_code, "body": b"".join(chunks),
+                "headers": [(name.decode("latin-1"), value.decode("latin-1")) for name, value in started.get("headers", [])
+                            if name.decode("latin-1").lower() not in IDEMPOTENCY_SKIPPED_HEADERS],
+                "created_at": datetime.now(timezone.utc)
+            }
+            await db.idempotency_keys.replace_one({"_id": record_id}, record, upsert=True)
+            idempotent_responses.set(record_id, record)
+            idempotency_stats.stored += 1
+        else:
+            await db.idempotency_keys.delete_one({"_id": record_id, "state": "pending"})
+            idempotency_stats.not_stored += 1
+
 app.include_router(api_router)
 
+app.add_middleware(IdempotentPosts)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Count-Estimate", "Idempotent-Replayed"],
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+class RedactQueryTokens(logging.Filter):
+    """Keep ?access_token= values out of access logs"""
+    pattern = re.compile(r"(access_token=)[^&\s\"]+")
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(self.pattern.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg
+                                for arg in record.args)
+        elif isinstance(record.msg, str):
+            record.msg = self.pattern.sub(r"\1[redacted]", record.msg)
+        return True
+
+logging.getLogger("uvicorn.access").addFilter(RedactQueryTokens())
+
+background_tasks: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def bootstrap_indexes():
+    try:
+        await ensure_time_series_collections()
+        await ensure_indexes()
+        await check_hot_queries()
+    except PyMongoError as e:
+        logger.error(f"Index bootstrap skipped: {e}")
+    except RuntimeError as e:
+        logger.error(str(e))
+        if INDEX_STRICT:
+            raise
+
+@app.on_event("startup")
+async def retire_previous_etags():
+    try:
+        await collection_versions.invalidate_all()
+    except PyMongoError as e:
+        logger.error(f"Could not move collection versions at startup: {e}")
+
+@app.on_event("startup")
+async def start_event_sink():
+    action_dispatcher.start()
+    event_sink.start()
+
+@app.on_event("startup")
+async def start_dashboard_counters():
+    try:
+        await reconcile_dashboard_counters()
+    except PyMongoError as e:
+        logger.error(f"Dashboard counter reconciliation skipped: {e}")
+    background_tasks.append(asyncio.create_task(run_dashboard_reconciler()))
+
+@app.on_event("startup")
+async def start_stream_pipelines():
+    for pipeline in stream_pipelines.values():
+        pipeline.start()
+
+@app.on_event("startup")
+async def start_event_archiver():
+    if EVENT_RETENTION_DAYS > 0:
+        background_tasks.append(asyncio.create_task(run_event_archiver()))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in background_tasks:
+        task.cancel()
+    event_broker.close()
+    await event_sink.stop()
+    await action_dispatcher.stop()
+    for pipeline in stream_pipelines.values():
+        await pipeline.stop()
+    password_hasher.shutdown()
+    yaml_executor.shutdown(wait=False)
     client.close()
@@ -357,8 +357,66 @@ function Dashboard() {
     };
 
     fetchData();
-    const interval = setInterval(fetchData, 30000);
-    return function() { clearInterval(interval); };
+
+    if (typeof EventSource === 'undefined') {
+      const interval = setInterval(fetchData, 30000);
+      return function() { clearInterval(interval); };
+    }
+
+    // Refetch when the server reports a change to anything this page shows; several writes in a burst cause one refetch
+    let refetchTimer = null;
+    const scheduleRefetch = function() {
+      if (refetchTimer) return;
+      refetchTimer = setTimeout(function() {
+        refetchTimer = null;
+        fetchData();
+      }, 500);
+    };
+    // EventSource cannot send headers, so each connection uses a short-lived stream token in the URL.
+    // The browser's own reconnect reuses the URL, so once the stream closes we reopen it with a fresh token
+    // and resume from the last event seen.
+    let stream = null;
+    let reopenTimer = null;
+    let lastEventId = null;
+    let closed = false;
+    const onMessage = function(e) {
+      if (e.lastEventId) lastEventId = e.lastEventId;
+      scheduleRefetch();
+    };
+    const open = async function() {
+      try {
+        const response = await axios.post(API + '/events/stream/token', {}, {
+          headers: { Authorization: 'Bearer ' + token }
+        });
+        if (closed) return;
+        const params = new URLSearchParams({
+          kinds: 'change',
+          collections: 'port_vessels,vessel_positions,fleet_shipments,epc_sites,assembly_areas,data_catalog,logistics_routes,logistics_permits,dashboard_stats',
+          access_token: response.data.token
+        });
+        if (lastEventId) params.set('last_event_id', lastEventId);
+        stream = new EventSource(API + '/events/stream?' + params.toString());
+        stream.addEventListener('change', onMessage);
+        stream.addEventListener('resync', onMessage);
+        stream.onerror = function() {
+          if (stream.readyState === EventSource.CLOSED) {
+            stream = null;
+            reopenTimer = setTimeout(open, 5000);
+          }
+        };
+      } catch (error) {
+        console.error(error);
+        if (!closed) reopenTimer = setTimeout(open, 30000);
+      }
+    };
+    open();
+
+    return function() {
+      closed = true;
+      if (stream) stream.close();
+      if (reopenTimer) clearTimeout(reopenTimer);
+      if (refetchTimer) clearTimeout(refetchTimer);
+    };
   }, []);
 
   if (!user) return null;
@@ -1,14 +1,29 @@
 import React, { useState, useEffect } from 'react';
+import axios from 'axios';
 import Layout from '@/components/Layout';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 import { 
   Activity, Zap, Database, ArrowRight, 
-  Play, Pause, BarChart3, Ship, Truck, Wind, MapPin, Filter, Layers
+  Play, Pause, Ship, Truck, Wind, MapPin, Filter, Layers
 } from 'lucide-react';
 import { toast } from 'sonner';
 
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const API = BACKEND_URL + '/api';
+
+const STAGE_DISPLAY = {
+  ingest: { type: 'ingest', name: 'Ingest Events', icon: Database },
+  validate: { type: 'validate', name: 'Parse & Validate', icon: Filter },
+  enrich: { type: 'enrich', name: 'Enrich Data', icon: Layers },
+  sink: { type: 'persist', name: 'Sink', icon: Database }
+};
+
+function formatRate(value) {
+  return value >= 1000 ? (value / 1000).toFixed(1) + 'k' : String(Math.round(value));
+}
+
 // Pipeline Stage Component
 function PipelineStage({ stage, isLast }) {
   const colorMap = {
@@ -81,11 +96,11 @@ function EventCard({ event }) {
 }
 
 // Streaming Topic Card
-function StreamingTopicCard({ topic }) {
-  const statusColor = topic.status === 'active' ? 'bg-emerald-500' : 'bg-slate-500';
+function StreamingTopicCard({ topic, selected, onSelect }) {
+  const statusColor = topic.status === 'running' ? 'bg-emerald-500' : 'bg-slate-500';
   
   return (
-    <Card className="hover:shadow-lg transition-all">
+    <Card className={'hover:shadow-lg transition-all cursor-pointer' + (selected ? ' ring-2 ring-orange-500' : '')} onClick={onSelect}>
       <CardHeader className="pb-2">
         <div className="flex items-center justify-between">
           <div className="flex items-center gap-2">
@@ -93,7 +108,7 @@ function StreamingTopicCard({ topic }) {
               <Zap className="h-5 w-5 text-orange-600" />
             </div>
             <div>
-              <CardTitle className="text-base font-bold">{topic.name}</CardTitle>
+              <CardTitle className="text-base font-bold">{topic.topic}</CardTitle>
               <CardDescription className="text-xs">{topic.domain} domain</CardDescription>
             </div>
           </div>
@@ -104,12 +119,12 @@ function StreamingTopicCard({ topic }) {
         <p className="text-sm text-slate-600">{topic.description}</p>
         <div className="grid grid-cols-3 gap-2 text-center">
           <div className="p-2 bg-slate-50 rounded-lg">
-            <p className="text-lg font-black text-slate-900">{topic.messages_per_sec}</p>
+            <p className="text-lg font-black text-slate-900">{formatRate(topic.events_per_sec)}</p>
             <p className="text-xs text-slate-500">msgs/sec</p>
           </div>
           <div className="p-2 bg-slate-50 rounded-lg">
-            <p className="text-lg font-black text-slate-900">{topic.subscribers}</p>
-            <p className="text-xs text-slate-500">subscribers</p>
+            <p className="text-lg font-black text-slate-900">{topic.stages.length}</p>
+            <p className="text-xs text-slate-500">stages</p>
           </div>
           <div className="p-2 bg-slate-50 rounded-lg">
             <p className="text-lg font-black text-slate-900">{topic.retention}</p>
@@ -154,24 +169,38 @@ function SubscriptionCard({ subscription }) {
 }
 
 function StreamingProducts() {
-  const [events, setEvents] = useState([]);
-  const [pipelineStatus, setPipelineStatus] = useState('running');
+  const [pipelines, setPipelines] = useState([]);
+  const [selectedTopic, setSelectedTopic] = useState(null);
 
-  const pipelineStages = [
-    { type: 'ingest', name: 'Ingest Events', icon: Database, metrics: '150/s' },
-    { type: 'validate', name: 'Parse & Validate', icon: Filter, metrics: '99.2%' },
-    { type: 'enrich', name: 'Enrich Data', icon: Layers, metrics: '+3 fields' },
-    { type: 'persist', name: 'Persist to BQ', icon: Database, metrics: '147/s' },
-    { type: 'analytics', name: 'Generate Stats', icon: BarChart3, metrics: '5min' },
-    { type: 'publish', name: 'Publish Topic', icon: Zap, metrics: '50/s' }
-  ];
+  useEffect(function() {
+    const token = localStorage.getItem('token');
+    if (!token) return;
 
-  const topics = [
-    { id: 't1', name: 'vessel-status-v1', domain: 'port', description: 'Real-time vessel arrival and departure events', status: 'active', messages_per_sec: 45, subscribers: 3, retention: '7d', schema_ref: 'schemas/vessel-event-v1.avro' },
-    { id: 't2', name: 'shipment-tracking-v1', domain: 'fleet', description: 'GPS tracking events for wind turbine shipments', status: 'active', messages_per_sec: 120, subscribers: 5, retention: '3d', schema_ref: 'schemas/shipment-event-v1.avro' },
-    { id: 't3', name: 'site-readiness-v1', domain: 'epc', description: 'Installation site status updates', status: 'active', messages_per_sec: 8, subscribers: 2, retention: '14d', schema_ref: 'schemas/site-event-v1.avro' },
-    { id: 't4', name: 'logistics-alerts-v1', domain: 'logistics', description: 'Route alerts and weather warnings', status: 'active', messages_per_sec: 15, subscribers: 4, retention: '30d', schema_ref: 'schemas/alert-event-v1.avro' }
-  ];
+    const fetchPipelines = async function() {
+      try {
+        const response = await axios.get(API + '/streams', { headers: { Authorization: 'Bearer ' + token } });
+        setPipelines(response.data);
+      } catch (error) {
+        console.error(error);
+      }
+    };
+
+    // Stage metrics are rates over the last few seconds, so they are sampled rather than pushed
+    fetchPipelines();
+    const interval = setInterval(fetchPipelines, 2000);
+    return function() { clearInterval(interval); };
+  }, []);
+
+  const pipeline = pipelines.find(function(p) { return p.topic === selectedTopic; }) || pipelines[0];
+  const pipelineStatus = pipeline ? pipeline.status : 'running';
+
+  const pipelineStages = pipeline ? pipeline.stages.map(function(stage) {
+    const display = STAGE_DISPLAY[stage.name] || { type: stage.name, name: stage.name, icon: Activity };
+    const metrics = stage.queue_depth > 0
+      ? formatRate(stage.events_per_sec) + '/s · ' + stage.queue_depth + ' queued'
+      : formatRate(stage.events_per_sec) + '/s';
+    return { ...display, metrics: metrics };
+  }) : [];
 
   const subscriptions = [
     { id: 's1', name: 'control-tower-sub', topic: 'vessel-status-v1', consumer: 'Control Tower', ack_deadline: 30, unacked_messages: 12, oldest_unacked: '2s' },
@@ -179,48 +208,31 @@ function StreamingProducts() {
     { id: 's3', name: 'analytics-sub', topic: 'vessel-status-v1', consumer: 'Analytics Engine', ack_deadline: 120, unacked_messages: 0, oldest_unacked: '-' }
   ];
 
-  useEffect(function() {
-    const eventTemplates = [
-      { type: 'vessel_update', title: 'Vessel Status', descs: ['Wind Champion arrived at Berth B-Heavy-01', 'Green Transporter ETA updated', 'Vestas Voyager unloading complete'] },
-      { type: 'shipment_update', title: 'Shipment Update', descs: ['Turbine blades passed checkpoint A-47', 'Convoy ASYAD-002 departed', 'Tower section delivered'] },
-      { type: 'site_update', title: 'Site Status', descs: ['Block A ready for delivery', 'Turbine T-08 installation started', 'Capacity updated'] },
-      { type: 'route_alert', title: 'Route Alert', descs: ['Weather advisory: Wind 45km/h', 'Bridge inspection complete', 'Permit approved'] }
-    ];
-
-    const generateEvent = function() {
-      const idx = Math.floor(Math.random() * eventTemplates.length);
-      const template = eventTemplates[idx];
-      const descIdx = Math.floor(Math.random() * template.descs.length);
-      return {
-        id: 'evt-' + Date.now() + '-' + Math.random(),
-        event_type: template.type,
-        title: template.title,
-        description: template.descs[descIdx],
-        timestamp: new Date().toLocaleTimeString()
-      };
+  const events = pipeline ? pipeline.recent_events.map(function(event) {
+    return {
+      id: event.topic + '-' + event.seq,
+      event_type: event.event_type,
+      title: event.title || event.event_type,
+      description: event.description,
+      timestamp: new Date(event.received_at).toLocaleTimeString()
     };
+  }) : [];
 
-    const initial = [];
-    for (let i = 0; i < 5; i++) { initial.push(generateEvent()); }
-    setEvents(initial);
-
-    const interval = setInterval(function() {
-      if (pipelineStatus === 'running') {
-        setEvents(function(prev) {
-          const newEvents = [generateEvent()];
-          for (let i = 0; i < prev.length && i < 19; i++) { newEvents.push(prev[i]); }
-          return newEvents;
-        });
-      }
-    }, 3000);
-
-    return function() { clearInterval(interval); };
-  }, [pipelineStatus]);
-
-  const togglePipeline = function() {
-    const newStatus = pipelineStatus === 'running' ? 'paused' : 'running';
-    setPipelineStatus(newStatus);
-    toast.success('Pipeline ' + (newStatus === 'running' ? 'started' : 'paused'));
+  const togglePipeline = async function() {
+    if (!pipeline) return;
+    const action = pipelineStatus === 'running' ? 'pause' : 'resume';
+    try {
+      const token = localStorage.getItem('token');
+      const response = await axios.post(API + '/streams/' + pipeline.topic + '/' + action, null, {
+        headers: { Authorization: 'Bearer ' + token }
+      });
+      setPipelines(function(prev) {
+        return prev.map(function(p) { return p.topic === response.data.topic ? response.data : p; });
+      });
+      toast.success('Pipeline ' + (action === 'resume' ? 'started' : 'paused'));
+    } catch (error) {
+      toast.error('Failed to ' + action + ' pipeline');
+    }
   };
 
   const stageElements = [];
@@ -231,8 +243,16 @@ function StreamingProducts() {
   }
 
   const topicCards = [];
-  for (let i = 0; i < topics.length; i++) {
-    topicCards.push(<StreamingTopicCard key={topics[i].id} topic={topics[i]} />);
+  for (let i = 0; i < pipelines.length; i++) {
+    const topic = pipelines[i];
+    topicCards.push(
+      <StreamingTopicCard
+        key={topic.topic}
+        topic={topic}
+        selected={pipeline && topic.topic === pipeline.topic}
+        onSelect={function() { setSelectedTopic(topic.topic); }}
+      />
+    );
   }
 
   const subCards = [];
@@ -285,10 +305,10 @@ function StreamingProducts() {
               <div>
                 <CardTitle className="text-xl font-black uppercase tracking-tight flex items-center gap-2">
                   <Activity className="h-5 w-5 text-emerald-400" />
-                  Product Data Pipeline
+                  Product Data Pipeline{pipeline ? ': ' + pipeline.topic : ''}
                 </CardTitle>
                 <CardDescription className="text-slate-400">
-                  Ingest → Validate → Enrich → Persist → Analyze → Publish
+                  {pipeline ? pipeline.stages.map(function(stage) { return (STAGE_DISPLAY[stage.name] || { name: stage.name }).name; }).join(' → ') : 'Loading pipeline…'}
                 </CardDescription>
               </div>
               <Badge className={pipelineStatus === 'running' ? 'bg-emerald-500 animate-pulse' : 'bg-slate-600'}>
@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+os.environ.setdefault("EVENT_ARCHIVE_DIR", tempfile.mkdtemp(prefix="event-archive-"))
+os.environ.setdefault("EVENT_SPILL_DIR", tempfile.mkdtemp(prefix="event-spill-"))
+# Short flushes, so events written by one test are stored before the next one swaps the database
+os.environ.setdefault("EVENT_FLUSH_INTERVAL_MS", "20")
+# A hot query that scans its collection fails startup, as in CI
+os.environ.setdefault("INDEX_STRICT", "true")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import mongomock.collection
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+import server as server_module
+
+def _find_and_modify_by_id(original):
+    """mongomock answers find_one_and_update(..., projection={"_id": 0}, return_document=AFTER) by re-running the
+    original filter after the update, so a compare-and-set on revision finds nothing; MongoDB returns the updated
+    document. Keep the _id for the re-read and drop it afterwards."""
+    def find_and_modify(self, query, projection=None, *args, **kwargs):
+        if isinstance(projection, dict) and projection.get("_id") == 0:
+            included = {key: value for key, value in projection.items() if key != "_id" and value}
+            doc = original(self, query, {**included, "_id": 1} if included else None, *args, **kwargs)
+            if doc is not None:
+                doc.pop("_id", None)
+            return doc
+        return original(self, query, projection, *args, **kwargs)
+    return find_and_modify
+
+async def _not_in_mongomock():
+    return []
+
+@pytest.fixture(scope="session")
+def server():
+    mock = AsyncMongoMockClient()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(mongomock.collection.Collection, "_find_and_modify",
+                      _find_and_modify_by_id(mongomock.collection.Collection._find_and_modify))
+        patch.setattr(server_module, "client", mock)
+        patch.setattr(server_module, "db", mock["test_bootstrap"])
+        # mongomock has no time-series collections; vessel_positions is created as a regular one on first insert
+        patch.setattr(server_module, "ensure_time_series_collections", _not_in_mongomock)
+        # explain() is not implemented by mongomock; test_index_registry covers the check with a simulated planner
+        patch.setattr(server_module, "check_hot_queries", _not_in_mongomock)
+        patch.setattr(server_module, "find_collection_scans", _not_in_mongomock)
+        yield server_module
+
+@pytest.fixture(scope="session")
+def app_client(server):
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+def drain_event_sink(server):
+    """Let the app's event sink write what earlier requests queued, so it lands in their test's database"""
+    sink = server.event_sink
+    deadline = time.monotonic() + 5
+    while sink._queue is not None and sink._queue.qsize() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The batch being filled is no longer on the queue
+    time.sleep(sink.flush_interval * 3)
+
+@pytest.fixture
+def db(server):
+    """A fresh database per test; the app's workers read server.db on every call"""
+    drain_event_sink(server)
+    server.db = server.client[f"test_{uuid.uuid4().hex}"]
+    return server.db
+
+@pytest.fixture
+def client(app_client, db):
+    """The shared app, logged in as a fresh admin of the port domain"""
+    email = f"admin-{uuid.uuid4().hex[:8]}@example.com"
+    app_client.headers.pop("Authorization", None)
+    app_client.post("/api/auth/register", json={
+        "email": email, "password": "secret", "name": "Admin", "domain": "port", "role": "admin"
+    })
+    token = app_client.post("/api/auth/login", json={"email": email, "password": "secret"}).json()["access_token"]
+    app_client.headers["Authorization"] = f"Bearer {token}"
+    yield app_client
+    app_client.headers.pop("Authorization", None)
@@ -0,0 +1,185 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+class DeadLetters:
+    """action_dead_letters stand-in that keeps what was written"""
+    def __init__(self):
+        self.letters = []
+
+    async def insert_one(self, doc):
+        self.letters.append(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        self.letters.extend(docs)
+
+@pytest.fixture
+def dead_letters(server, db, monkeypatch):
+    collection = DeadLetters()
+    db_view = SimpleNamespace(action_dead_letters=collection, collection_versions=db.collection_versions)
+    monkeypatch.setattr(server, "db", db_view)
+    return collection
+
+def dispatcher(server, workers=2, max_queue=100, max_attempts=3, drain_seconds=0.2):
+    return server.ActionDispatcher(workers, max_queue, max_attempts, retry_base_ms=1, retry_max_ms=5,
+                                   drain_seconds=drain_seconds)
+
+def event(*actions, event_id="e1"):
+    return {"id": event_id, "domain": "port", "triggered_actions": list(actions)}
+
+async def until(condition, timeout=2):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+def test_burst_of_one_action_does_not_block_others(server, dead_letters):
+    async def scenario():
+        actions = dispatcher(server, workers=2)
+        release = asyncio.Event()
+        done = []
+
+        @actions.register("slow", concurrency=1)
+        async def slow(payload):
+            await release.wait()
+
+        @actions.register("fast")
+        async def fast(payload):
+            done.append(payload["id"])
+
+        actions.start()
+        for number in range(5):
+            actions.submit(event("slow", event_id=f"s{number}"))
+        actions.submit(event("fast", event_id="f1"))
+        await until(lambda: done == ["f1"])
+        stats = actions.stats()["actions"]
+        release.set()
+        await until(lambda: actions.stats()["queue_depth"] == 0 and not actions.stats()["actions"]["slow"]["running"])
+        await actions.stop()
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["slow"]["running"] == 1
+    assert stats["slow"]["queued"] == 4
+
+def test_concurrency_limit_is_per_action(server, dead_letters):
+    async def scenario():
+        actions = dispatcher(server, workers=8)
+        running, peak = 0, 0
+
+        @actions.register("limited", concurrency=2)
+        async def limited(payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        actions.start()
+        for number in range(10):
+            actions.submit(event("limited", event_id=str(number)))
+        await until(lambda: actions.stats()["actions"].get("limited", {}).get("completed") == 10)
+        await actions.stop()
+        return peak
+
+    assert asyncio.run(scenario()) == 2
+
+def test_failing_action_is_retried_then_dead_lettered(server, dead_letters):
+    async def scenario():
+        actions = dispatcher(server, max_attempts=3)
+        attempts = []
+
+        @actions.register("broken")
+        async def broken(payload):
+            attempts.append(payload["id"])
+            raise RuntimeError("downstream unavailable")
+
+        actions.start()
+        actions.submit(event("broken"))
+        await until(lambda: dead_letters.letters)
+        stats = actions.stats()["actions"]["broken"]
+        await actions.stop()
+        return attempts, stats
+
+    attempts, stats = asyncio.run(scenario())
+
+    assert attempts == ["e1"] * 3
+    assert (stats["failed_attempts"], stats["retried"], stats["dead_lettered"]) == (3, 2, 1)
+    [letter] = dead_letters.letters
+    assert (letter["action"], letter["attempts"], letter["event"]["id"]) == ("broken", 3, "e1")
+    assert letter["error"] == "RuntimeError: downstream unavailable"
+
+def test_full_queue_dead_letters_the_overflow(server, dead_letters):
+    async def scenario():
+        actions = dispatcher(server, workers=1, max_queue=2)
+        release = asyncio.Event()
+
+        @actions.register("slow", concurrency=1)
+        async def slow(payload):
+            await release.wait()
+
+        actions.start()
+        actions.submit(event("slow", event_id="running"))
+        await until(lambda: actions.stats()["actions"].get("slow", {}).get("running") == 1)
+        for event_id in ("q1", "q2", "over"):
+            actions.submit(event("slow", event_id=event_id))
+        await until(lambda: dead_letters.letters)
+        release.set()
+        await until(lambda: actions.stats()["actions"]["slow"]["completed"] == 3)
+        await actions.stop()
+        return actions.overflowed
+
+    assert asyncio.run(scenario()) == 1
+    assert [(letter["event"]["id"], letter["error"]) for letter in dead_letters.letters] == [
+        ("over", "dispatch queue full")
+    ]
+
+def test_stop_dead_letters_queued_running_and_retrying_actions(server, dead_letters):
+    async def scenario():
+        actions = dispatcher(server, workers=1, drain_seconds=0.05)
+        actions.retry_delay = lambda attempt: 60
+
+        @actions.register("stuck", concurrency=1)
+        async def stuck(payload):
+            await asyncio.Event().wait()
+
+        @actions.register("flaky")
+        async def flaky(payload):
+            raise RuntimeError("try later")
+
+        actions.start()
+        actions.submit(event("flaky", event_id="retrying"))
+        await until(lambda: actions.stats()["pending_retries"] == 1)
+        actions.submit(event("stuck", event_id="running"))
+        actions.submit(event("stuck", event_id="queued"))
+        await until(lambda: actions.stats()["actions"].get("stuck", {}).get("running") == 1)
+        await actions.stop()
+        return actions.stats()
+
+    stats = asyncio.run(scenario())
+
+    stopped = {letter["event"]["id"]: letter for letter in dead_letters.letters}
+    assert set(stopped) == {"retrying", "running", "queued"}
+    assert stopped["retrying"]["attempts"] == 1
+    assert {letter["error"] for letter in stopped.values()} == {"dispatcher stopped before the action completed"}
+    assert (stats["queue_depth"], stats["pending_retries"], stats["dead_lettered_at_shutdown"]) == (0, 0, 3)
+
+def test_unknown_actions_are_counted_not_queued(server, dead_letters):
+    async def scenario():
+        actions = dispatcher(server)
+        actions.start()
+        actions.submit(event("no_such_action"))
+        await actions.stop()
+        return actions.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["unhandled"] == {"no_such_action": 1}
+    assert stats["queue_depth"] == 0
+    assert dead_letters.letters == []
+
+def test_every_triggered_action_has_a_handler(server):
+    assert set(server.ACTION_TARGETS) <= set(server.action_dispatcher._handlers)
+    assert {"update_catalog", "enable_transport", "track_status"} <= set(server.ACTION_TARGETS)
@@ -0,0 +1,72 @@
+import time
+
+def vessel(vessel_id, status="approaching", **fields):
+    return {"vessel_id": vessel_id, "vessel_name": f"Vessel {vessel_id}", "status": status, "cargo_type": "hydrogen",
+            **fields}
+
+def events_of(client, count):
+    """The newest events once the event sink has written at least `count` of them"""
+    for _ in range(50):
+        events = client.get("/api/events").json()
+        if len(events) >= count:
+            return events
+        time.sleep(0.05)
+    raise AssertionError(f"expected {count} events, got {len(events)}")
+
+def test_batch_reports_created_updated_and_errors_per_item(client):
+    existing = client.post("/api/port/vessels", json=vessel("V1")).json()
+
+    response = client.post("/api/port/vessels/bulk", json=[
+        vessel("V2", "berthed"),
+        vessel("V1", "berthed", vessel_name="Renamed"),
+        vessel("V2"),
+        {"vessel_name": "No key"}
+    ])
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["created"], body["updated"], body["error"]) == (1, 1, 2)
+    assert [item["status"] for item in body["results"]] == ["created", "updated", "error", "error"]
+    assert body["results"][1]["id"] == existing["id"]
+    assert "Duplicate vessel_id in batch" in body["results"][2]["error"]
+    assert "vessel_id" in body["results"][3]["error"]
+    vessels = {item["vessel_id"]: item for item in client.get("/api/port/vessels").json()}
+    assert vessels["V1"]["vessel_name"] == "Renamed" and vessels["V1"]["id"] == existing["id"]
+
+def test_counters_follow_created_and_updated_records(client, server):
+    client.post("/api/port/vessels", json=vessel("V1"))
+
+    client.post("/api/port/vessels/bulk", json=[vessel("V2", "berthed"), vessel("V3"), vessel("V1", "berthed")])
+
+    stats = client.get("/api/dashboard/stats").json()
+    assert (stats["total_vessels"], stats["vessels_in_port"]) == (3, 2)
+    client.portal.call(server.reconcile_dashboard_counters)
+    assert server.dashboard_reconciliation["last_drift"] == {}
+
+def test_updates_log_their_own_event_type(client):
+    existing = client.post("/api/port/vessels", json=vessel("V1")).json()
+
+    client.post("/api/port/vessels/bulk", json=[vessel("V2"), vessel("V1", "berthed")])
+
+    events = events_of(client, 3)
+    assert sorted(event["event_type"] for event in events) == ["vessel_update", "vessel_update", "vessel_updated"]
+    assert [event["resource_id"] for event in events if event["event_type"] == "vessel_updated"] == [existing["id"]]
+
+def test_business_key_is_unique(client, server):
+    client.portal.call(server.ensure_indexes)
+    assert client.post("/api/port/vessels", json=vessel("V1")).status_code == 200
+
+    response = client.post("/api/port/vessels", json=vessel("V1"))
+
+    assert response.status_code == 409
+
+def test_other_domains_cannot_bulk_load(client):
+    client.headers.pop("Authorization")
+    client.post("/api/auth/register", json={
+        "email": "fleet@example.com", "password": "secret", "name": "Fleet", "domain": "fleet", "role": "viewer"
+    })
+    token = client.post("/api/auth/login", json={"email": "fleet@example.com", "password": "secret"}).json()["access_token"]
+
+    response = client.post("/api/port/vessels/bulk", json=[vessel("V1")], headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 403
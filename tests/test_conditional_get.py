@@ -0,0 +1,60 @@
+def test_unchanged_collection_answers_304(client):
+    first = client.get("/api/fleet/shipments")
+    etag = first.headers["ETag"]
+
+    second = client.get("/api/fleet/shipments", headers={"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert second.content == b""
+
+def test_write_moves_the_etag(client):
+    etag = client.get("/api/fleet/shipments").headers["ETag"]
+    client.post("/api/fleet/shipments", json={
+        "shipment_id": "S001", "vessel_id": "V1", "component_type": "electrolyser", "status": "in_transit",
+        "destination_site": "Duqm"
+    })
+
+    response = client.get("/api/fleet/shipments", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [shipment["shipment_id"] for shipment in response.json()] == ["S001"]
+
+def test_etag_depends_on_the_query(client):
+    first = client.get("/api/fleet/shipments", params={"limit": 5}).headers["ETag"]
+
+    response = client.get("/api/fleet/shipments", params={"limit": 6}, headers={"If-None-Match": first})
+
+    assert response.status_code == 200
+
+def test_dashboard_stats_revalidate(client):
+    etag = client.get("/api/dashboard/stats").headers["ETag"]
+
+    assert client.get("/api/dashboard/stats", headers={"If-None-Match": etag}).status_code == 304
+    client.post("/api/port/vessels", json={
+        "vessel_id": "V1", "vessel_name": "One", "status": "berthed", "cargo_type": "hydrogen"
+    })
+    response = client.get("/api/dashboard/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["vessels_in_port"] == 1
+
+def test_a_write_in_another_worker_moves_the_etag(client, server):
+    etag = client.get("/api/fleet/shipments").headers["ETag"]
+    # A second process shares nothing with this one but the database
+    other_worker = server.CollectionVersions()
+
+    client.portal.call(other_worker.bump, "fleet_shipments")
+
+    assert client.get("/api/fleet/shipments", headers={"If-None-Match": etag}).status_code == 200
+
+def test_stats_cache_follows_writes_from_other_workers(client, server, monkeypatch):
+    # Every test database starts at version 0, so entries cached by earlier tests would match
+    monkeypatch.setattr(server, "stats_cache", server.TTLCache(16, 60))
+    first = client.get("/api/contracts/stats/summary").json()
+    client.portal.call(server.db.data_contracts.insert_one, {"id": "c1", "status": "active"})
+    assert client.get("/api/contracts/stats/summary").json() == first
+
+    client.portal.call(server.CollectionVersions().bump, "data_contracts")
+
+    assert client.get("/api/contracts/stats/summary").json() != first
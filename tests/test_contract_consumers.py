@@ -0,0 +1,62 @@
+import pytest
+
+from tests.test_contract_history import contract_body, field
+
+def consumer(email, team="Fleet ops"):
+    return {"name": email.split("@")[0], "team": team, "domain": "fleet", "email": email, "use_cases": ["eta"],
+            "approved_date": "2026-10-01", "access_level": "read"}
+
+@pytest.fixture
+def contracts(client, server):
+    client.portal.call(server.ensure_indexes)
+    ids = []
+    for name in ("arrivals", "departures"):
+        body = {**contract_body([field("vessel_id")]), "contract_name": name}
+        ids.append(client.post("/api/contracts", json=body).json()["id"])
+    client.post(f"/api/contracts/{ids[0]}/consumers", json=consumer("known@example.com"))
+    return ids
+
+def consumers_of(client, contract_id):
+    return sorted(item["email"] for item in client.get(f"/api/contracts/{contract_id}").json()["consumers"])
+
+def test_each_item_reports_what_its_own_update_did(client, contracts):
+    first, second = contracts
+
+    response = client.post("/api/contracts/consumers/bulk", json=[
+        {"op": "add", "contract_id": first, "consumer": consumer("new@example.com")},
+        {"op": "add", "contract_id": second, "consumer": consumer("known@example.com")},
+        {"op": "add", "contract_id": first, "consumer": consumer("known@example.com")},
+        {"op": "remove", "contract_id": second, "email": "nobody@example.com", "team": "Fleet ops"},
+        {"op": "remove", "contract_id": "missing", "email": "known@example.com", "team": "Fleet ops"},
+        {"op": "add", "contract_id": first},
+        {"op": "remove", "contract_id": second, "email": "known@example.com", "team": "Fleet ops"}
+    ])
+
+    body = response.json()
+    assert [item["status"] for item in body["results"]] == [
+        "registered", "registered", "already_registered", "not_found", "contract_not_found", "invalid", "invalid"
+    ]
+    assert body["applied"] == 2
+    assert consumers_of(client, first) == ["known@example.com", "new@example.com"]
+    assert consumers_of(client, second) == ["known@example.com"]
+
+def test_removals_and_no_ops_only_touch_changed_contracts(client, contracts):
+    first, second = contracts
+    revisions = [client.get(f"/api/contracts/{contract_id}").json()["revision"] for contract_id in contracts]
+
+    body = client.post("/api/contracts/consumers/bulk", json=[
+        {"op": "remove", "contract_id": first, "email": "known@example.com", "team": "Fleet ops"},
+        {"op": "remove", "contract_id": second, "email": "known@example.com", "team": "Fleet ops"}
+    ]).json()
+
+    assert [item["status"] for item in body["results"]] == ["removed", "not_found"]
+    assert client.get(f"/api/contracts/{first}").json()["revision"] == revisions[0] + 1
+    assert client.get(f"/api/contracts/{second}").json()["revision"] == revisions[1]
+    assert consumers_of(client, first) == []
+
+def test_no_contract_is_created_for_unknown_ids(client, server, contracts):
+    client.post("/api/contracts/consumers/bulk", json=[
+        {"op": "add", "contract_id": "missing", "consumer": consumer("new@example.com")}
+    ])
+
+    assert client.portal.call(server.db.data_contracts.count_documents, {}) == 2
@@ -0,0 +1,116 @@
+import copy
+
+import pytest
+
+def field(name, data_type="string", **attributes):
+    return {"name": name, "data_type": data_type, "description": name, **attributes}
+
+def contract_body(fields):
+    return {
+        "contract_name": "Vessel arrivals", "version": "1.0.0", "status": "active",
+        "provider": {"name": "Port", "email": "port@example.com", "team": "Port data", "domain": "port",
+                     "output_port": "kafka://arrivals"},
+        "dataset": {"name": "arrivals", "description": "Vessel arrivals", "domain": "port", "dataset_type": "source"},
+        "schema_fields": fields,
+        "quality": {"freshness_slo": "15m", "freshness_description": "Near real time", "completeness_threshold": 99,
+                    "accuracy_threshold": 99},
+        "slo": {"availability": "99.9%", "availability_description": "Business hours", "support_hours": "24x7",
+                "response_time_critical": "1h", "response_time_normal": "1d", "incident_notification": "email"},
+        "terms": {"usage_restrictions": [], "allowed_purposes": [], "retention_period": "1y", "licensing": "internal",
+                  "change_notice_period": "30 days", "breaking_change_policy": "Major version bump",
+                  "deprecation_policy": "90 days notice"}
+    }
+
+def classify(server, old, new):
+    return {(change["field"], change["change"]): change["breaking"] for change in server.diff_schema_fields(old, new)}
+
+@pytest.mark.parametrize("old, new, expected", [
+    (field("a"), None, {("a", "field_removed"): True}),
+    (None, field("a"), {("a", "field_added"): False}),
+    (field("a", "int"), field("a", "bigint"), {("a", "type_widened"): False}),
+    (field("a", "long"), field("a", "integer"), {("a", "type_changed"): True}),
+    (field("a", "int"), field("a", "integer"), {}),
+    (field("a", nullable=True), field("a", nullable=False), {("a", "nullable_to_required"): True}),
+    (field("a", nullable=False), field("a", nullable=True), {("a", "required_to_nullable"): False}),
+    (field("a", required=False), field("a", required=True), {("a", "optional_to_required"): True}),
+    (field("a"), field("a", unique=True), {("a", "unique_added"): True}),
+    (field("a", format="email"), field("a", format="uri"), {("a", "format_changed"): True}),
+    (field("a"), field("a", format="email"), {("a", "format_changed"): True}),
+    (field("a", format="email"), field("a", format=None), {("a", "format_removed"): False}),
+    (field("a"), field("a", constraints=["> 0"]), {("a", "constraints_added"): True}),
+    (field("a", constraints=["> 0"]), field("a"), {("a", "constraints_removed"): False}),
+    (field("a"), {**field("a"), "description": "changed", "tags": ["x"]}, {("a", "metadata_changed"): False}),
+])
+def test_schema_changes_are_classified(server, old, new, expected):
+    assert classify(server, [old] if old else [], [new] if new else []) == expected
+
+def test_delta_round_trips_and_stays_small(server):
+    old = contract_body([field(f"f{number}") for number in range(50)])
+    new = copy.deepcopy(old)
+    new["version"] = "1.1.0"
+    new["schema_fields"][10]["data_type"] = "long"
+    del new["schema_fields"][20]
+    new["schema_fields"].insert(0, field("first"))
+    del new["slo"]
+
+    delta = server.contract_delta(old, new)
+
+    assert server.apply_contract_delta(old, delta) == new
+    assert set(delta["schema_fields"]["upsert"]) == {"f10", "first"}
+    assert delta["set"] == {"version": "1.1.0"} and delta["unset"] == ["slo"]
+
+def test_in_place_field_edit_stores_no_order(server):
+    old = contract_body([field("a"), field("b")])
+    new = copy.deepcopy(old)
+    new["schema_fields"][1]["nullable"] = True
+
+    delta = server.contract_delta(old, new)
+
+    assert "order" not in delta["schema_fields"]
+    assert server.apply_contract_delta(old, delta) == new
+
+@pytest.fixture
+def contract(client):
+    response = client.post("/api/contracts", json=contract_body([field("vessel_id"), field("eta", "date")]))
+    assert response.status_code == 200
+    return response.json()
+
+def test_versions_rebuild_each_revision_and_flag_breaking_changes(client, contract):
+    updated = contract_body([field("vessel_id"), field("eta", "timestamp"), field("berth")])
+    client.put(f"/api/contracts/{contract['id']}", json={**updated, "version": "1.1.0"})
+    client.patch(f"/api/contracts/{contract['id']}", json={"schema_fields": [field("vessel_id")], "version": "2.0.0"})
+
+    versions = client.get(f"/api/contracts/{contract['id']}/versions").json()
+    v1 = client.get(f"/api/contracts/{contract['id']}/versions/1").json()
+    diff = client.get(f"/api/contracts/{contract['id']}/diff", params={"from": 0, "to": 2}).json()
+
+    assert [(version["revision"], version["breaking"]) for version in versions] == [(2, True), (1, False), (0, False)]
+    assert [schema_field["name"] for schema_field in v1["schema_fields"]] == ["vessel_id", "eta", "berth"]
+    assert v1["version"] == "1.1.0"
+    assert diff["breaking"] and {change["field"] for change in diff["schema_changes"]} == {"eta"}
+
+def test_consumer_only_revisions_resolve_to_the_recorded_one(client, contract):
+    consumer = {"name": "Fleet", "team": "Fleet ops", "domain": "fleet", "email": "fleet@example.com",
+                "use_cases": ["eta"], "approved_date": "2026-10-01", "access_level": "read"}
+    assert client.post(f"/api/contracts/{contract['id']}/consumers", json=consumer).status_code == 200
+
+    version = client.get(f"/api/contracts/{contract['id']}/versions/1")
+    diff = client.get(f"/api/contracts/{contract['id']}/diff", params={"from": 1})
+
+    assert version.status_code == 200
+    assert version.json()["recorded_revision"] == 0
+    assert diff.status_code == 200 and diff.json()["schema_changes"] == []
+    assert client.get(f"/api/contracts/{contract['id']}/versions/2").status_code == 404
+
+def test_update_after_a_consumer_revision_starts_a_new_snapshot(client, server, contract):
+    consumer = {"name": "Fleet", "team": "Fleet ops", "domain": "fleet", "email": "fleet@example.com",
+                "use_cases": ["eta"], "approved_date": "2026-10-01", "access_level": "read"}
+    client.post(f"/api/contracts/{contract['id']}/consumers", json=consumer)
+    client.patch(f"/api/contracts/{contract['id']}", json={"version": "1.0.1"})
+
+    entries = client.portal.call(lambda: server.db.data_contract_versions.find(
+        {"contract_id": contract["id"]}, {"_id": 0, "revision": 1, "snapshot": 1}
+    ).sort("revision", 1).to_list(None))
+
+    assert [(entry["revision"], "snapshot" in entry) for entry in entries] == [(0, True), (2, True)]
+    assert client.get(f"/api/contracts/{contract['id']}/versions/2").json()["version"] == "1.0.1"
@@ -0,0 +1,87 @@
+import io
+import tarfile
+
+import pytest
+import yaml
+
+from tests.test_contract_history import contract_body, field
+
+@pytest.fixture
+def renders(server, monkeypatch):
+    """Contract ids in the order contract_to_yaml rendered them"""
+    rendered = []
+    original = server.contract_to_yaml
+
+    def counting(contract):
+        rendered.append(contract["id"])
+        return original(contract)
+    monkeypatch.setattr(server, "contract_to_yaml", counting)
+    return rendered
+
+def create_contract(client, name, status="active"):
+    body = {**contract_body([field("vessel_id"), field("eta", "timestamp")]), "contract_name": name, "status": status}
+    response = client.post("/api/contracts", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+def get_yaml(client, contract):
+    response = client.get(f"/api/contracts/{contract['id']}/yaml")
+    assert response.status_code == 200
+    return yaml.safe_load(response.json()["yaml"])
+
+def test_yaml_follows_the_data_contract_specification(client):
+    contract = create_contract(client, "Vessel arrivals")
+
+    document = get_yaml(client, contract)
+
+    assert document["dataContractSpecification"] == "0.9.3"
+    assert document["id"] == contract["id"]
+    assert (document["info"]["title"], document["info"]["version"]) == ("Vessel arrivals", "1.0.0")
+    assert [item["name"] for item in document["schema"]["fields"]] == ["vessel_id", "eta"]
+    assert "billing" not in document
+
+def test_yaml_is_rendered_once_per_revision(client, renders):
+    contract = create_contract(client, "Vessel arrivals")
+
+    first, second = get_yaml(client, contract), get_yaml(client, contract)
+
+    assert first == second
+    assert renders == [contract["id"]]
+
+def test_a_write_renders_the_yaml_again(client, renders):
+    contract = create_contract(client, "Vessel arrivals")
+    get_yaml(client, contract)
+
+    client.patch(f"/api/contracts/{contract['id']}", json={"version": "1.1.0"})
+
+    assert get_yaml(client, contract)["info"]["version"] == "1.1.0"
+    assert renders == [contract["id"]] * 2
+
+def test_unknown_contract_yaml_is_404(client):
+    assert client.get("/api/contracts/missing/yaml").status_code == 404
+
+def export(client, **params):
+    response = client.get("/api/export/contracts/yaml", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz") as archive:
+        return {member.name: yaml.safe_load(archive.extractfile(member).read()) for member in archive.getmembers()}
+
+def test_export_streams_one_yaml_file_per_contract(client):
+    arrivals = create_contract(client, "Vessel arrivals")
+    berths = create_contract(client, "Berth plan")
+    create_contract(client, "Draft feed", status="draft")
+
+    files = export(client)
+
+    assert list(files) == [f"berth-plan-{berths['id']}.yaml", f"vessel-arrivals-{arrivals['id']}.yaml"]
+    assert files[f"vessel-arrivals-{arrivals['id']}.yaml"]["info"]["title"] == "Vessel arrivals"
+
+def test_export_of_all_statuses_shares_the_yaml_cache(client, renders):
+    contracts = [create_contract(client, "Vessel arrivals"), create_contract(client, "Draft feed", status="draft")]
+    get_yaml(client, contracts[0])
+
+    files = export(client, status="all", batch_size=1)
+
+    assert len(files) == 2
+    assert sorted(renders) == sorted(contract["id"] for contract in contracts)
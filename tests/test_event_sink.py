@@ -0,0 +1,124 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+class ScriptedEventLogs:
+    """event_logs stand-in: each insert_many fails as scripted, then stores whatever did not fail"""
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.calls = []
+        self.stored = {}
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append([doc["id"] for doc in docs])
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, Exception):
+            raise failure
+        failed = failure or {}
+        for index, doc in enumerate(docs):
+            if index not in failed:
+                self.stored[doc["id"]] = doc
+        if failed:
+            raise BulkWriteError({"writeErrors": [{"index": index, "code": code, "errmsg": "failed"}
+                                                  for index, code in failed.items()]})
+
+@pytest.fixture
+def event_logs(server, db, monkeypatch):
+    def install(*failures):
+        collection = ScriptedEventLogs(*failures)
+        db_view = SimpleNamespace(event_logs=collection, collection_versions=db.collection_versions)
+        monkeypatch.setattr(server, "db", db_view)
+        return collection
+    return install
+
+def events(*ids):
+    return [{"id": event_id, "event_type": "test", "domain": "port"} for event_id in ids]
+
+def run_sink(server, batches, flush_size=10, spill_dir=None, replay_interval_seconds=60):
+    async def scenario():
+        sink = server.EventSink(max_queue=100, flush_size=flush_size, flush_interval_ms=20,
+                                spill_dir=spill_dir or server.EVENT_SPILL_DIR,
+                                replay_interval_seconds=replay_interval_seconds)
+        sink.start()
+        for batch in batches:
+            await sink.emit_many(batch)
+            await asyncio.sleep(0.05)
+        await sink.stop()
+        return sink
+    return asyncio.run(scenario())
+
+def test_queued_events_are_written_in_batches(server, event_logs):
+    collection = event_logs()
+
+    sink = run_sink(server, [events(*"abcde")], flush_size=2)
+
+    assert list(collection.stored) == list("abcde")
+    assert all(len(call) <= 2 for call in collection.calls)
+    assert (sink.written, sink.failed) == (5, 0)
+
+def test_only_failed_rows_are_retried(server, event_logs):
+    collection = event_logs({1: 91, 3: 11000})
+
+    sink = run_sink(server, [events(*"abcd")])
+
+    # The duplicate key (row 3) already landed; only row 1 is sent again
+    assert collection.calls == [list("abcd"), ["b"]]
+    assert set(collection.stored) == set("abcd") - {"d"}
+    assert (sink.written, sink.failed) == (4, 0)
+
+def test_rows_that_keep_failing_are_spilled_to_disk(server, event_logs, tmp_path):
+    collection = event_logs({0: 91}, {0: 91}, {0: 91})
+
+    sink = run_sink(server, [events("bad", "good")], spill_dir=tmp_path)
+
+    assert collection.calls == [["bad", "good"], ["bad"], ["bad"]]
+    assert list(collection.stored) == ["good"]
+    assert (sink.written, sink.spilled, sink.failed) == (1, 1, 0)
+    [spill_file] = tmp_path.glob("events-*.ndjson")
+    assert [json.loads(line)["id"] for line in spill_file.read_text().splitlines()] == ["bad"]
+
+def test_spilled_rows_are_written_once_mongodb_recovers(server, event_logs, tmp_path):
+    collection = event_logs(AutoReconnect("down"), AutoReconnect("down"), AutoReconnect("down"))
+
+    sink = run_sink(server, [events("a", "b"), events("c")], spill_dir=tmp_path, replay_interval_seconds=0)
+
+    assert set(collection.stored) == {"a", "b", "c"}
+    assert (sink.written, sink.spilled, sink.replayed, sink.failed) == (3, 2, 2, 0)
+    assert list(tmp_path.iterdir()) == []
+
+def test_rows_are_dropped_and_counted_when_spilling_fails(server, event_logs, tmp_path):
+    collection = event_logs({0: 91}, {0: 91}, {0: 91})
+    blocked = tmp_path / "not-a-directory"
+    blocked.write_text("")
+
+    sink = run_sink(server, [events("bad", "good")], spill_dir=blocked)
+
+    assert list(collection.stored) == ["good"]
+    assert (sink.written, sink.spilled, sink.failed) == (1, 0, 1)
+
+def test_transient_errors_retry_the_whole_batch(server, event_logs):
+    collection = event_logs(AutoReconnect("primary stepped down"))
+
+    sink = run_sink(server, [events("a", "b")])
+
+    assert collection.calls == [["a", "b"], ["a", "b"]]
+    assert (sink.written, sink.failed) == (2, 0)
+
+def test_writer_survives_an_unexpected_error(server, event_logs):
+    collection = event_logs(RuntimeError("boom"))
+
+    sink = run_sink(server, [events("lost"), events("kept")])
+
+    assert list(collection.stored) == ["kept"]
+    assert (sink.written, sink.failed) == (1, 1)
+
+def test_emit_writes_through_when_the_sink_is_stopped(server, event_logs):
+    collection = event_logs()
+    sink = server.EventSink(max_queue=10, flush_size=10, flush_interval_ms=20)
+
+    asyncio.run(sink.emit(events("direct")[0]))
+
+    assert list(collection.stored) == ["direct"]
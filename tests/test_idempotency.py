@@ -0,0 +1,80 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+SHIPMENT = {
+    "shipment_id": "S001", "vessel_id": "V1", "component_type": "electrolyser", "status": "in_transit",
+    "destination_site": "Duqm"
+}
+
+def post_shipment(client, key, body=SHIPMENT):
+    return client.post("/api/fleet/shipments", json=body, headers={"Idempotency-Key": key})
+
+def shipment_count(client, server):
+    return client.portal.call(server.db.fleet_shipments.count_documents, {})
+
+def test_retry_replays_the_first_response_without_writing_again(client, server):
+    first = post_shipment(client, "create-s001")
+    retry = post_shipment(client, "create-s001")
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert shipment_count(client, server) == 1
+
+def test_replay_survives_a_cold_cache(client, server):
+    first = post_shipment(client, "create-s001")
+    server.idempotent_responses.clear()
+
+    retry = post_shipment(client, "create-s001")
+
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+def test_reusing_a_key_for_a_different_request_is_rejected(client, server):
+    post_shipment(client, "create-s001")
+
+    response = post_shipment(client, "create-s001", {**SHIPMENT, "status": "delivered"})
+
+    assert response.status_code == 422
+    assert shipment_count(client, server) == 1
+
+def test_failed_requests_are_not_stored(client, server):
+    assert post_shipment(client, "create-s001", {"shipment_id": "S001"}).status_code == 422
+
+    response = post_shipment(client, "create-s001")
+
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+def test_retry_while_the_first_request_runs_conflicts(client, server):
+    body = json.dumps(SHIPMENT).encode()
+    principal = server.jwt.decode(client.headers["Authorization"].split()[1], server.SECRET_KEY,
+                                  algorithms=[server.ALGORITHM])["sub"]
+    fingerprint = hashlib.sha256(b"\n".join([b"/api/fleet/shipments", b"", body])).hexdigest()
+    client.portal.call(server.db.idempotency_keys.insert_one, {
+        "_id": f"{principal}:in-flight", "fingerprint": fingerprint, "state": "pending",
+        "created_at": datetime.now(timezone.utc)
+    })
+
+    response = client.post("/api/fleet/shipments", content=body,
+                           headers={"Idempotency-Key": "in-flight", "Content-Type": "application/json"})
+
+    assert response.status_code == 409
+    assert shipment_count(client, server) == 0
+
+def test_requests_without_a_key_are_not_deduplicated(client, server):
+    client.post("/api/fleet/shipments", json=SHIPMENT)
+    client.post("/api/fleet/shipments", json={**SHIPMENT, "shipment_id": "S002"})
+
+    assert shipment_count(client, server) == 2
+
+def test_streamed_ingest_is_passed_through_unbuffered(client):
+    fix = '{"vessel_id": "V1", "timestamp": "2026-10-01T00:00:00Z", "latitude": 19.6, "longitude": 57.7}\n'
+    headers = {"Idempotency-Key": "positions", "Content-Type": "application/x-ndjson"}
+
+    responses = [client.post("/api/port/positions", content=fix.encode(), headers=headers) for _ in range(2)]
+
+    assert [response.json()["accepted"] for response in responses] == [1, 1]
+    assert all("Idempotent-Replayed" not in response.headers for response in responses)
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+# Imported before the session fixture swaps both for no-ops, since mongomock cannot explain()
+from server import check_hot_queries, find_collection_scans
+
+def index_serves(keys, query, sort):
+    """Whether an index on `keys` answers `query` (equality fields) and `sort` without scanning the collection"""
+    fields = [name for name, _ in keys]
+    equality = list(query)
+    if set(fields[:len(equality)]) != set(equality):
+        return False
+    if not sort:
+        return True
+    rest = keys[len(equality):len(equality) + len(sort)]
+    if [name for name, _ in rest] != [name for name, _ in sort]:
+        return False
+    same = [direction for _, direction in rest] == [direction for _, direction in sort]
+    reversed_ = [-direction for _, direction in rest] == [direction for _, direction in sort]
+    return same or reversed_
+
+class SimulatedPlanner:
+    """A database whose explain() picks an IXSCAN when a registered index serves the query, else a COLLSCAN"""
+    def __init__(self, registry):
+        self.registry = registry
+
+    def __getitem__(self, collection_name):
+        registry = self.registry
+
+        class Cursor:
+            def __init__(self, query):
+                self.query, self.order = query, None
+
+            def limit(self, count):
+                return self
+
+            def sort(self, order):
+                self.order = order
+                return self
+
+            async def explain(self):
+                models = registry.get(collection_name, [])
+                served = any(index_serves(list(model.document["key"].items()), self.query, self.order)
+                             for model in models)
+                leaf = {"stage": "IXSCAN"} if served else {"stage": "COLLSCAN"}
+                return {"queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": {"stage": "FETCH",
+                                                                                           "inputStage": leaf}}}}
+
+        class Collection:
+            def find(self, query):
+                return Cursor(query)
+
+        return Collection()
+
+@pytest.fixture
+def planner(server, monkeypatch):
+    def install(registry):
+        monkeypatch.setattr(server, "db", SimulatedPlanner(registry))
+    return install
+
+def test_every_hot_query_is_served_by_a_registered_index(server, planner):
+    planner(server.INDEX_REGISTRY)
+
+    assert asyncio.run(find_collection_scans()) == []
+
+def test_a_dropped_index_is_reported_as_a_collection_scan(server, planner):
+    registry = dict(server.INDEX_REGISTRY)
+    registry["epc_sites"] = [model for model in registry["epc_sites"]
+                             if "readiness_status" not in model.document["key"]]
+    planner(registry)
+
+    offenders = asyncio.run(find_collection_scans())
+
+    assert offenders == [{"collection": "epc_sites", "filter": {"readiness_status": "ready"}, "sort": None}]
+
+def test_check_hot_queries_raises_on_a_collection_scan(server, planner, monkeypatch):
+    monkeypatch.setattr(server, "find_collection_scans", find_collection_scans)
+    planner({**server.INDEX_REGISTRY, "users": []})
+
+    with pytest.raises(RuntimeError, match="COLLSCAN"):
+        asyncio.run(check_hot_queries())
+
+@pytest.mark.parametrize("plan, scans", [
+    ({"stage": "COLLSCAN"}, True),
+    ({"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}, True),
+    ({"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}, True),
+    ({"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}, False)
+])
+def test_plan_stages_walks_nested_plans(server, plan, scans):
+    assert ("COLLSCAN" in server.plan_stages(plan)) is scans
+
+def test_strict_startup_fails_on_a_collection_scan(server, db, monkeypatch):
+    async def scanning():
+        raise RuntimeError("Hot queries fall back to COLLSCAN")
+    monkeypatch.setattr(server, "check_hot_queries", scanning)
+
+    assert server.INDEX_STRICT
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.bootstrap_indexes())
+
+    monkeypatch.setattr(server, "INDEX_STRICT", False)
+    asyncio.run(server.bootstrap_indexes())
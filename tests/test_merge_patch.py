@@ -0,0 +1,122 @@
+import pytest
+
+from tests.test_contract_history import contract_body, field
+
+BILLING = {"pricing_model": "subscription", "billing_contact": "billing@example.com", "billing_cycle": "monthly",
+           "cost_center": "CC-1"}
+
+class RacingContracts:
+    """Wraps the test database; another writer applies `update` right after the patch has read the contract"""
+    def __init__(self, db, update, times=1):
+        self._db = db
+        self.update = update
+        self.times = times
+
+    def __getattr__(self, name):
+        collection = getattr(self._db, name)
+        if name != "data_contracts":
+            return collection
+        racer = self
+
+        class Contracts:
+            def __getattr__(self, attr):
+                return getattr(collection, attr)
+
+            async def find_one(self, query, *args, **kwargs):
+                doc = await collection.find_one(query, *args, **kwargs)
+                if racer.times and "id" in query:
+                    racer.times -= 1
+                    await collection.update_one(query, {**racer.update, "$inc": {"revision": 1}})
+                return doc
+
+        return Contracts()
+
+@pytest.fixture
+def contract(client):
+    body = {**contract_body([field("vessel_id"), field("eta", "timestamp")]), "description": "Arrivals feed",
+            "billing": BILLING}
+    response = client.post("/api/contracts", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+def patch(client, contract, body, **headers):
+    return client.patch(f"/api/contracts/{contract['id']}", json=body,
+                        headers={"Content-Type": "application/merge-patch+json", **headers})
+
+def stored(client, contract):
+    return client.get(f"/api/contracts/{contract['id']}").json()
+
+def test_null_removes_a_member(client, contract):
+    response = patch(client, contract, {"description": None, "billing": {"cost_center": None}})
+
+    assert response.status_code == 200
+    after = stored(client, contract)
+    assert after.get("description") is None
+    assert after["billing"].get("cost_center") is None
+    assert after["billing"]["pricing_model"] == "subscription"
+
+def test_objects_merge_member_by_member(client, contract):
+    response = patch(client, contract, {"dataset": {"description": "Arrivals and departures"}})
+
+    assert response.status_code == 200
+    dataset = stored(client, contract)["dataset"]
+    assert dataset == {**contract["dataset"], "description": "Arrivals and departures"}
+
+def test_arrays_are_replaced_not_merged(client, contract):
+    response = patch(client, contract, {"schema_fields": [field("vessel_id")],
+                                         "terms": {"allowed_purposes": ["planning"]}})
+
+    assert response.status_code == 200
+    after = stored(client, contract)
+    assert [item["name"] for item in after["schema_fields"]] == ["vessel_id"]
+    assert after["terms"]["allowed_purposes"] == ["planning"]
+    assert after["terms"]["licensing"] == contract["terms"]["licensing"]
+
+def test_required_members_cannot_be_removed(client, contract):
+    response = patch(client, contract, {"dataset": {"name": None}})
+
+    assert response.status_code == 422
+    assert stored(client, contract)["dataset"]["name"] == "arrivals"
+
+def test_patch_moves_the_revision_by_one(client, contract):
+    patch(client, contract, {"version": "1.0.1"})
+
+    assert stored(client, contract)["revision"] == contract.get("revision", 0) + 1
+
+def test_patch_is_recomputed_when_the_contract_changes_under_it(client, server, contract, monkeypatch):
+    monkeypatch.setattr(server, "db", RacingContracts(server.db, {"$set": {"status": "deprecated"}}))
+
+    response = patch(client, contract, {"dataset": {"description": "Recomputed"}})
+
+    assert response.status_code == 200
+    after = stored(client, contract)
+    assert (after["status"], after["dataset"]["description"]) == ("deprecated", "Recomputed")
+    assert after["revision"] == contract.get("revision", 0) + 2
+
+def test_parent_removed_concurrently_is_not_a_server_error(client, server, contract, monkeypatch):
+    monkeypatch.setattr(server, "db", RacingContracts(server.db, {"$set": {"billing": None}}))
+
+    # With billing gone there is nothing to merge into, so the patch is a whole (incomplete) billing object
+    response = patch(client, contract, {"billing": {"cost_center": "CC-2"}})
+
+    assert response.status_code == 422
+    assert stored(client, contract)["billing"] is None
+
+def test_if_match_patch_fails_when_the_contract_changes_under_it(client, server, contract, monkeypatch):
+    revision = contract.get("revision", 0)
+    monkeypatch.setattr(server, "db", RacingContracts(server.db, {"$set": {"status": "deprecated"}}))
+
+    response = patch(client, contract, {"version": "1.0.1"}, **{"If-Match": f'"{revision}"'})
+
+    assert response.status_code == 412
+    assert response.headers["ETag"] == f'"{revision + 1}"'
+    assert stored(client, contract)["version"] == "1.0.0"
+
+def test_a_contract_that_keeps_changing_returns_409(client, server, contract, monkeypatch):
+    attempts = server.MERGE_PATCH_ATTEMPTS
+    monkeypatch.setattr(server, "db", RacingContracts(server.db, {"$set": {"status": "deprecated"}}, times=attempts))
+
+    response = patch(client, contract, {"version": "1.0.1"})
+
+    assert response.status_code == 409
+    assert stored(client, contract)["version"] == "1.0.0"
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+def create_vessels(client, count, prefix="V"):
+    for number in range(count):
+        response = client.post("/api/port/vessels", json={
+            "vessel_id": f"{prefix}{number:03d}", "vessel_name": f"Vessel {number}", "status": "approaching",
+            "cargo_type": "hydrogen"
+        })
+        assert response.status_code == 200
+
+def walk(client, path, **params):
+    """Follow X-Next-Cursor to the end and return every page"""
+    pages, after = [], None
+    while True:
+        response = client.get(path, params={**params, **({"after": after} if after else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        after = response.headers.get("X-Next-Cursor")
+        if not after:
+            return pages
+
+def test_pages_cover_the_collection_once_in_key_order(client):
+    create_vessels(client, 25)
+
+    pages = walk(client, "/api/port/vessels", limit=10)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    ids = [vessel["vessel_id"] for page in pages for vessel in page]
+    assert ids == [f"V{number:03d}" for number in range(25)]
+
+def test_cursor_is_stable_across_inserts_before_it(client):
+    create_vessels(client, 6)
+    first = client.get("/api/port/vessels", params={"limit": 3})
+    create_vessels(client, 2, prefix="A")
+
+    rest = client.get("/api/port/vessels", params={"limit": 10, "after": first.headers["X-Next-Cursor"]})
+
+    assert [vessel["vessel_id"] for vessel in rest.json()] == ["V003", "V004", "V005"]
+    assert "X-Next-Cursor" not in rest.headers
+
+def test_last_page_has_no_cursor(client):
+    create_vessels(client, 3)
+
+    response = client.get("/api/port/vessels", params={"limit": 3})
+
+    assert len(response.json()) == 3
+    assert "X-Next-Cursor" not in response.headers
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/api/port/vessels", params={"after": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+def walk_pages(server, collection, sort_key, descending, limit=2):
+    """Every id fetch_page returns when following its cursors"""
+    async def scenario():
+        ids, after = [], None
+        while True:
+            docs, after = await server.fetch_page(collection, {}, sort_key, limit, after, descending)
+            ids.extend(doc["id"] for doc in docs)
+            if not after:
+                return ids
+    return asyncio.run(scenario())
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_null_and_missing_sort_keys_are_paged_once(server, db, descending):
+    docs = [{"id": "a", "eta": 2}, {"id": "b", "eta": None}, {"id": "c"}, {"id": "d", "eta": 1},
+            {"id": "e", "eta": None}, {"id": "f", "eta": 2}]
+    asyncio.run(db.vessels.insert_many(docs))
+    nulls, dated = ["b", "c", "e"], ["d", "a", "f"]
+    expected = dated[::-1] + nulls[::-1] if descending else nulls + dated
+
+    assert walk_pages(server, db.vessels, "eta", descending) == expected
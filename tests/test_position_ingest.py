@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+class FlakyPositions:
+    """Wraps the test database; the listed insert_many calls on vessel_positions fail with a network error"""
+    def __init__(self, db, failing_calls):
+        self._db = db
+        self.failing_calls = set(failing_calls)
+        self.calls = 0
+
+    def __getattr__(self, name):
+        collection = getattr(self._db, name)
+        if name != "vessel_positions":
+            return collection
+        wrapper = self
+
+        class Positions:
+            def __getattr__(self, attr):
+                return getattr(collection, attr)
+
+            async def insert_many(self, docs, ordered=True):
+                wrapper.calls += 1
+                if wrapper.calls in wrapper.failing_calls:
+                    raise AutoReconnect("connection reset")
+                return await collection.insert_many(docs, ordered=ordered)
+
+        return Positions()
+
+def fix(vessel_id, minute):
+    return {"vessel_id": vessel_id, "timestamp": f"2026-10-01T00:{minute:02d}:00Z", "latitude": 19.6,
+            "longitude": 57.7}
+
+def ndjson(*lines):
+    return "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines).encode()
+
+def post_ndjson(client, body):
+    return client.post("/api/port/positions", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+def stored(client, vessel_id):
+    return client.get(f"/api/port/vessels/{vessel_id}/positions").json()
+
+def test_ndjson_reports_invalid_lines_and_keeps_the_rest(client):
+    body = ndjson(fix("V1", 0), "{not json", {"vessel_id": "V1"}, fix("V1", 1))
+
+    response = post_ndjson(client, body)
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["received"], summary["accepted"], summary["rejected"]) == (4, 2, 2)
+    assert [error["index"] for error in summary["errors"]] == [1, 2]
+    assert len(stored(client, "V1")) == 2
+
+def test_failed_chunk_is_rejected_and_later_chunks_still_land(client, server, monkeypatch):
+    monkeypatch.setattr(server, "POSITION_INSERT_CHUNK", 2)
+    monkeypatch.setattr(server, "db", FlakyPositions(server.db, failing_calls={2}))
+    body = ndjson(*(fix("V1", minute) for minute in range(6)))
+
+    response = post_ndjson(client, body)
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["received"], summary["accepted"], summary["rejected"]) == (6, 4, 2)
+    assert summary["errors"] == [{"index": 2, "error": "write failed: AutoReconnect"},
+                                 {"index": 3, "error": "write failed: AutoReconnect"}]
+    minutes = sorted(position["timestamp"][14:16] for position in stored(client, "V1"))
+    assert minutes == ["00", "01", "04", "05"]
+
+def test_json_array_body_goes_through_the_same_batches(client):
+    response = client.post("/api/port/positions", json=[fix("V2", 0), {"vessel_id": "V2"}])
+
+    assert (response.json()["accepted"], response.json()["rejected"]) == (1, 1)
+
+@pytest.mark.parametrize("body", [b"{}", b"not json"])
+def test_json_body_must_be_an_array(client, body):
+    response = client.post("/api/port/positions", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 400
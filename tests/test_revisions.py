@@ -0,0 +1,58 @@
+import pytest
+
+@pytest.fixture
+def permit(client):
+    response = client.post("/api/logistics/permits", json={
+        "permit_number": "P-001", "permit_type": "transport", "shipment_id": "S001",
+        "issuing_authority": "Ministry of Transport", "status": "pending", "requested_date": "2026-10-01",
+        "restrictions": []
+    })
+    assert response.status_code == 200
+    return response.json()
+
+def set_status(client, permit_id, status, **kwargs):
+    return client.put(f"/api/logistics/permits/{permit_id}", params={"status": status, **kwargs.pop("params", {})}, **kwargs)
+
+def test_every_write_bumps_the_revision(client, permit):
+    assert permit["revision"] == 0
+
+    first = set_status(client, permit["id"], "approved")
+    second = set_status(client, permit["id"], "pending")
+
+    assert (first.json()["revision"], second.json()["revision"]) == (1, 2)
+
+def test_stale_request_revision_conflicts(client, permit):
+    assert set_status(client, permit["id"], "approved", params={"revision": 0}).status_code == 200
+
+    response = set_status(client, permit["id"], "rejected", params={"revision": 0})
+
+    assert response.status_code == 409
+    assert response.headers["ETag"] == '"1"'
+    assert client.get("/api/logistics/permits").json()[0]["status"] == "approved"
+
+def test_stale_if_match_fails_the_precondition(client, permit):
+    set_status(client, permit["id"], "approved")
+
+    response = set_status(client, permit["id"], "rejected", headers={"If-Match": '"0"'})
+
+    assert response.status_code == 412
+    assert response.headers["ETag"] == '"1"'
+
+def test_current_if_match_applies(client, permit):
+    response = set_status(client, permit["id"], "approved", headers={"If-Match": 'W/"0"'})
+
+    assert response.status_code == 200
+    assert response.json()["revision"] == 1
+
+def test_only_one_of_two_writers_with_the_same_revision_wins(client, permit):
+    statuses = [set_status(client, permit["id"], status, headers={"If-Match": "0"}).status_code
+                for status in ("approved", "rejected")]
+
+    assert statuses == [200, 412]
+
+def test_missing_document_is_404_not_a_conflict(client):
+    assert set_status(client, "missing", "approved", headers={"If-Match": "0"}).status_code == 404
+
+@pytest.mark.parametrize("headers, params", [({"If-Match": "abc"}, {}), ({"If-Match": "1"}, {"revision": 2})])
+def test_malformed_or_disagreeing_preconditions_are_rejected(client, permit, headers, params):
+    assert set_status(client, permit["id"], "approved", headers=headers, params=params).status_code == 400